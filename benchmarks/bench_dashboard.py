@@ -0,0 +1,127 @@
+"""
+Per-interaction latency of the Streamlit dashboard.
+
+Drives ``streamlit_app.py`` headlessly with Streamlit's ``AppTest`` and times
+each widget interaction (median of ``--repeat`` runs, caches warm):
+
+- ``full run``: the whole script re-executed, which is what every interaction
+  cost before the map and scenario views became fragments (``AppTest`` always
+  reruns the full script);
+- ``rerun``: what a browser session actually re-executes for that widget -
+  the full run for sidebar filters, only the owning fragment's body for map
+  and scenario controls (fragment bodies are timed by wrapping ``st.fragment``
+  before the app is loaded);
+- ``deck KB``: size of the map spec (layers and their data) sent to the browser.
+
+    python benchmarks/bench_dashboard.py [--repeat 5]
+"""
+
+import argparse
+import functools
+import os
+import statistics
+import time
+from collections import defaultdict
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(PROJECT_ROOT, "streamlit_app.py")
+
+# Seconds spent in each fragment body during the last run
+FRAGMENT_SECONDS = defaultdict(float)
+_fragment = st.fragment
+
+
+def _timed_fragment(func=None, **kwargs):
+    if func is None:
+        return lambda f: _timed_fragment(f, **kwargs)
+
+    @functools.wraps(func)
+    def timed(*args, **kw):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kw)
+        finally:
+            FRAGMENT_SECONDS[func.__name__] += time.perf_counter() - start
+
+    return _fragment(timed, **kwargs)
+
+
+def _widget(elements, label):
+    return next(w for w in elements if w.label == label)
+
+
+# (interaction, scope, action(at, i)); scope "page" is a full rerun, otherwise
+# the fragment that owns the widget. Actions alternate values so each run
+# changes state; i = 0 leaves the map non-empty for the next interaction.
+INTERACTIONS = [
+    ("network filter", "page",
+     lambda at, i: _widget(at.sidebar.selectbox, "🔌 Network Filter").set_value(
+         _widget(at.sidebar.selectbox, "🔌 Network Filter").options[i % 2])),
+    ("min DC fast", "page",
+     lambda at, i: _widget(at.sidebar.slider, "Min DC Fast Chargers").set_value(i % 2)),
+    ("marker size", "map_view",
+     lambda at, i: _widget(at.slider, "Station Marker Size").set_value(150 + 50 * (i % 2))),
+    ("marker style", "map_view",
+     lambda at, i: _widget(at.selectbox, "Marker Style").set_value(
+         ["Color by Capacity", "Green Circles (ChargePoint)"][i % 2])),
+    ("zoom", "map_view",
+     lambda at, i: _widget(at.slider, "Zoom Level").set_value(11 + i % 2)),
+    ("arrival time", "map_view",
+     lambda at, i: _widget(at.slider, "Arrival Time (minutes from now)").set_value(30 + 15 * (i % 2))),
+    ("session length", "scenario_view",
+     lambda at, i: _widget(at.slider, "Session length (minutes)").set_value(60 + 15 * (i % 2))),
+]
+
+
+def _run(at):
+    FRAGMENT_SECONDS.clear()
+    start = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return time.perf_counter() - start
+
+
+def _deck_kb(at):
+    charts = at.get("deck_gl_json_chart")
+    return len(charts[0].proto.json.encode()) / 1024 if charts else 0.0
+
+
+def run_benchmark(repeat: int = 5, timeout: float = 120):
+    """Rows of (interaction, scope, full run ms, rerun ms, deck KB)."""
+    st.fragment = _timed_fragment
+    try:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        initial = _run(at)
+        rows = [("initial load", "page", initial * 1000, initial * 1000, _deck_kb(at))]
+        for name, scope, action in INTERACTIONS:
+            full, scoped = [], []
+            for i in range(1, repeat + 1):
+                action(at, i)
+                seconds = _run(at)
+                full.append(seconds)
+                scoped.append(seconds if scope == "page" else FRAGMENT_SECONDS[scope])
+            rows.append((name, scope, statistics.median(full) * 1000, statistics.median(scoped) * 1000,
+                         _deck_kb(at)))
+            action(at, 0)
+            _run(at)
+        return rows
+    finally:
+        st.fragment = _fragment
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'interaction':<16} {'scope':<14} {'full run ms':>12} {'rerun ms':>10} {'deck KB':>9}")
+    for name, scope, full_ms, scoped_ms, deck_kb in run_benchmark(args.repeat):
+        print(f"{name:<16} {scope:<14} {full_ms:>12.1f} {scoped_ms:>10.1f} {deck_kb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
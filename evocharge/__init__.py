@@ -0,0 +1,4 @@
+"""
+EvoCharge data and analytics modules shared by the notebooks and the
+Streamlit dashboard.
+"""
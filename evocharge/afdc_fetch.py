@@ -0,0 +1,218 @@
+"""
+Tiled, concurrent AFDC station fetcher.
+
+The nearest-stations endpoint returns at most ``PAGE_LIMIT`` (200) stations
+per call, so one wide-radius request silently truncates dense regions. Two
+ways around the cap:
+
+- ``fetch_region`` splits a bounding box into tiles and queries each tile's
+  circumscribed circle. A tile whose response is truncated
+  (``total_results`` above what came back) is split into four and re-queried.
+- ``fetch_pages`` pages through ``all.json`` with ``limit``/``offset`` for
+  state- or nation-wide pulls.
+
+Requests run on a bounded thread pool over one pooled ``requests.Session``
+with urllib3 retry/backoff (honouring ``Retry-After`` on 429) and a shared
+client-side throttle. Results are merged and de-duplicated by station ``id``.
+``base_url`` can point at a local stub server.
+
+Docs:
+- Nearest Stations: https://developer.nrel.gov/docs/transportation/alt-fuel-stations-v1/nearest/
+- All Stations: https://developer.nrel.gov/docs/transportation/alt-fuel-stations-v1/all/
+"""
+
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from evocharge.spatial_index import haversine_km
+
+BASE = "https://developer.nrel.gov/api/alt-fuel-stations/v1"
+PAGE_LIMIT = 200
+MAX_WORKERS = 4
+MAX_SPLIT_DEPTH = 6
+REQUESTS_PER_SECOND = 4.0
+KM_PER_MILE = 1.609344
+
+# E = Available, P = Planned, T = Temporarily unavailable
+VALID_STATUS = ("E", "P", "T")
+
+
+class TruncatedRegionWarning(UserWarning):
+    """Some tiles still hit the page limit at the maximum split depth."""
+
+
+def make_session(max_workers: int = MAX_WORKERS, retries: int = 5,
+                 backoff_factor: float = 1.0) -> requests.Session:
+    """Pooled HTTP session with retry/backoff on rate limits and server errors."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class Throttle:
+    """Spaces requests from all worker threads at least ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate: float = REQUESTS_PER_SECOND):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AFDCClient:
+    """Thin AFDC API client shared by the worker threads."""
+
+    def __init__(self, api_key: str = None, base_url: str = BASE, session: requests.Session = None,
+                 max_workers: int = MAX_WORKERS, rate: float = REQUESTS_PER_SECOND, timeout: float = 45):
+        self.api_key = api_key or os.getenv("AFDC_API_KEY", "DEMO_KEY")
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.session = session or make_session(max_workers)
+        self.throttle = Throttle(rate)
+        self.timeout = timeout
+
+    def get(self, endpoint: str, params: dict) -> dict:
+        self.throttle.wait()
+        r = self.session.get(f"{self.base_url}/{endpoint}",
+                             params={"api_key": self.api_key, **params}, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+
+def station_filters(fuel_type: str = "ELEC", access: str = "public", status: str = "E") -> dict:
+    """Common query parameters; ``status`` is dropped unless it is a valid code."""
+    params = {"fuel_type": fuel_type, "access": access}
+    if status and status in VALID_STATUS:
+        params["status"] = status
+    return params
+
+
+def split_bounds(bounds, n: int = 2):
+    """Split (south, west, north, east) into an ``n`` x ``n`` grid of tiles."""
+    south, west, north, east = bounds
+    dlat, dlon = (north - south) / n, (east - west) / n
+    return [
+        (south + i * dlat, west + j * dlon, south + (i + 1) * dlat, west + (j + 1) * dlon)
+        for i in range(n) for j in range(n)
+    ]
+
+
+def tile_circle(bounds):
+    """Center and circumscribed radius (miles) of a tile."""
+    south, west, north, east = bounds
+    lat, lon = (south + north) / 2.0, (west + east) / 2.0
+    radius_km = float(haversine_km(lat, lon, north, east))
+    return lat, lon, radius_km / KM_PER_MILE
+
+
+def _fetch_tile(client: AFDCClient, bounds, filters: dict):
+    """Query one tile; returns (stations, truncated)."""
+    lat, lon, radius_miles = tile_circle(bounds)
+    payload = client.get("nearest.json", {
+        "latitude": lat,
+        "longitude": lon,
+        "radius": max(radius_miles, 0.1),
+        "limit": PAGE_LIMIT,
+        **filters,
+    })
+    stations = payload.get("fuel_stations", [])
+    total = payload.get("total_results", len(stations))
+    return stations, total > len(stations)
+
+
+def _merge(merged: dict, stations):
+    for s in stations:
+        merged.setdefault(s.get("id"), s)
+
+
+def in_bounds(station: dict, bounds) -> bool:
+    """True if the station's coordinates fall inside (south, west, north, east)."""
+    south, west, north, east = bounds
+    try:
+        lat, lon = float(station.get("latitude")), float(station.get("longitude"))
+    except (TypeError, ValueError):
+        return False
+    return south <= lat <= north and west <= lon <= east
+
+
+def fetch_region(bounds, client: AFDCClient = None, tiles_per_side: int = 2,
+                 max_depth: int = MAX_SPLIT_DEPTH, **filter_kwargs):
+    """All stations in ``bounds`` (south, west, north, east), de-duplicated by id.
+
+    Tiles are fetched concurrently; truncated tiles are split into four and
+    re-queried, up to ``max_depth`` levels (after which the partial result is
+    kept and a ``TruncatedRegionWarning`` is issued). Each tile is queried as
+    its enclosing circle, so the merged records are clipped back to ``bounds``.
+    """
+    client = client or AFDCClient()
+    filters = station_filters(**filter_kwargs)
+    merged = {}
+    truncated_tiles = 0
+
+    with ThreadPoolExecutor(max_workers=client.max_workers) as pool:
+        pending = {
+            pool.submit(_fetch_tile, client, tile, filters): (tile, 0)
+            for tile in split_bounds(bounds, tiles_per_side)
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                tile, depth = pending.pop(future)
+                stations, truncated = future.result()
+                if truncated and depth < max_depth:
+                    for child in split_bounds(tile, 2):
+                        pending[pool.submit(_fetch_tile, client, child, filters)] = (child, depth + 1)
+                    continue
+                truncated_tiles += truncated
+                _merge(merged, stations)
+
+    if truncated_tiles:
+        warnings.warn(f"{truncated_tiles} tiles still truncated at depth {max_depth}",
+                      TruncatedRegionWarning, stacklevel=2)
+    return [s for s in merged.values() if in_bounds(s, bounds)]
+
+
+def fetch_pages(client: AFDCClient = None, page_size: int = PAGE_LIMIT, **params):
+    """Page through ``all.json`` concurrently; extra ``params`` (e.g. state="CA")
+    are passed through alongside the station filters."""
+    client = client or AFDCClient()
+    filter_kwargs = {k: params.pop(k) for k in ("fuel_type", "access", "status") if k in params}
+    query = {**station_filters(**filter_kwargs), **params}
+
+    first = client.get("all.json", {**query, "limit": page_size, "offset": 0})
+    merged = {}
+    _merge(merged, first.get("fuel_stations", []))
+    total = first.get("total_results", 0)
+
+    offsets = range(page_size, total, page_size)
+    with ThreadPoolExecutor(max_workers=client.max_workers) as pool:
+        pages = pool.map(
+            lambda offset: client.get("all.json", {**query, "limit": page_size, "offset": offset}),
+            offsets,
+        )
+        for page in pages:
+            _merge(merged, page.get("fuel_stations", []))
+    return list(merged.values())
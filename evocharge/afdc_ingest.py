@@ -0,0 +1,100 @@
+"""
+Batch normalization of AFDC station payloads.
+
+Turns the ``fuel_stations`` list returned by the AFDC API into the flat
+station table written to ``afdc_stations_raw.csv`` / ``afdc_stations_top50.csv``.
+Everything is column-at-a-time so state- or nation-wide pulls (tens of
+thousands of records) cost the same handful of pandas operations as the
+200-row San Diego pull.
+
+Docs:
+- All Stations: https://developer.nrel.gov/docs/transportation/alt-fuel-stations-v1/all/
+"""
+
+import os
+
+import pandas as pd
+
+# Known fields we care about (present in nearest/all responses)
+AFDC_FIELDS = [
+    "id", "station_name", "ev_network", "city", "state", "zip", "street_address",
+    "latitude", "longitude", "ev_connector_types", "ev_dc_fast_num",
+    "ev_level1_evse_num", "ev_level2_evse_num", "ev_pricing", "access_days_time",
+    "access_code", "facility_type", "date_last_confirmed", "updated_at", "open_date", "geocode_status",
+]
+PORT_COUNT_FIELDS = ["ev_dc_fast_num", "ev_level1_evse_num", "ev_level2_evse_num"]
+
+# Initial top-50 proxy score weights
+W_DC = 1.0
+W_L2 = 0.25
+
+
+def normalize_stations(stations) -> pd.DataFrame:
+    """Flatten a batch of AFDC station records into one DataFrame.
+
+    Returns one row per record with exactly the ``AFDC_FIELDS`` columns;
+    connector lists are comma-joined and port counts are numeric (NaN when
+    the station has none of that type).
+    """
+    if not stations:
+        return pd.DataFrame(columns=AFDC_FIELDS)
+
+    # Building from the record list with a fixed column set is one C-level
+    # pass; pd.json_normalize walks every nested value and is ~15x slower.
+    df = pd.DataFrame(list(stations), columns=AFDC_FIELDS)
+
+    connectors = df["ev_connector_types"]
+    is_list = connectors.map(type).eq(list)
+    if is_list.any():
+        df.loc[is_list, "ev_connector_types"] = connectors[is_list].str.join(",")
+
+    for col in PORT_COUNT_FIELDS + ["latitude", "longitude"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+def compute_capacity_proxy(df: pd.DataFrame, w_dc: float = W_DC, w_l2: float = W_L2) -> pd.Series:
+    """Capacity proxy score: weighted DC fast + Level 2 port counts."""
+    dc = pd.to_numeric(df["ev_dc_fast_num"], errors="coerce").fillna(0)
+    l2 = pd.to_numeric(df["ev_level2_evse_num"], errors="coerce").fillna(0)
+    return w_dc * dc + w_l2 * l2
+
+
+def exclude_tesla(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop stations whose network name contains "Tesla".
+
+    AFDC records carry ``ev_network`` as a human-readable name, not the
+    network key, so the exclusion is name based.
+    """
+    is_tesla = df["ev_network"].str.contains("tesla", case=False, na=False)
+    return df.loc[~is_tesla].reset_index(drop=True)
+
+
+def top_stations(df: pd.DataFrame, n: int = 50) -> pd.DataFrame:
+    """The ``n`` stations with the highest capacity proxy."""
+    if "capacity_proxy" not in df.columns:
+        df = df.assign(capacity_proxy=compute_capacity_proxy(df))
+    return df.sort_values("capacity_proxy", ascending=False).head(n).reset_index(drop=True)
+
+
+def ingest(stations, exclude_tesla_networks: bool = True):
+    """Normalize, de-duplicate by AFDC id and score a station payload.
+
+    Returns ``(df_all, df_top)``: every station with its ``capacity_proxy``
+    and the top-50 by that score.
+    """
+    df = normalize_stations(stations).drop_duplicates(subset=["id"]).reset_index(drop=True)
+    if exclude_tesla_networks:
+        df = exclude_tesla(df)
+    df["capacity_proxy"] = compute_capacity_proxy(df)
+    return df, top_stations(df)
+
+
+def write_outputs(df_all: pd.DataFrame, df_top: pd.DataFrame, out_dir: str = "."):
+    """Write ``afdc_stations_raw.csv`` (no score column) and ``afdc_stations_top50.csv``."""
+    os.makedirs(out_dir, exist_ok=True)
+    raw_path = os.path.join(out_dir, "afdc_stations_raw.csv")
+    top_path = os.path.join(out_dir, "afdc_stations_top50.csv")
+    df_all.drop(columns=["capacity_proxy"], errors="ignore").to_csv(raw_path, index=False)
+    df_top.to_csv(top_path, index=False)
+    return raw_path, top_path
@@ -0,0 +1,158 @@
+"""
+Incremental AFDC station sync keyed on ``updated_at``.
+
+Keeps a local station store (Arrow snapshot) plus a JSON sync state holding
+the high-water mark, i.e. the newest ``updated_at`` seen so far. A sync run:
+
+1. asks ``last-updated.json`` when the AFDC dataset last changed and stops
+   right there if nothing changed since the high-water mark (the common case
+   for an hourly refresh);
+2. otherwise fetches the current station listing for the region;
+3. upserts only records that are new, have ``updated_at`` past the
+   high-water mark or differ field-by-field from the stored row
+   (``evocharge.snapshot_diff``), and tombstones stations that disappeared from the listing
+   (``deleted_at`` is set, the row is kept so deletions are recorded).
+
+AFDC has no "changed since" filter on the station endpoints, so step 2 still
+lists the region; what the sync saves is rewriting and re-deriving the
+unchanged rows, and the whole pull when the dataset has not moved.
+
+Hourly state-wide refresh:
+    python -m evocharge.afdc_sync --state CA --out-dir data/afdc
+"""
+
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from evocharge.afdc_fetch import AFDCClient, fetch_pages
+from evocharge.afdc_ingest import AFDC_FIELDS, normalize_stations
+from evocharge.snapshot_diff import diff_snapshots
+from evocharge.station_store import read_snapshot, write_snapshot
+
+STORE_FILE = "afdc_store.arrow"
+STATE_FILE = "afdc_sync_state.json"
+
+
+def _timestamps(values) -> pd.Series:
+    return pd.to_datetime(values, utc=True, errors="coerce")
+
+
+def empty_store() -> pd.DataFrame:
+    return pd.DataFrame(columns=AFDC_FIELDS + ["deleted_at"])
+
+
+def load_store(out_dir: str):
+    """Return ``(store, state)``; both are empty on the first sync."""
+    store_path = os.path.join(out_dir, STORE_FILE)
+    state_path = os.path.join(out_dir, STATE_FILE)
+    store = read_snapshot(store_path) if os.path.exists(store_path) else empty_store()
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+    return store, state
+
+
+def save_store(out_dir: str, store: pd.DataFrame, state: dict):
+    os.makedirs(out_dir, exist_ok=True)
+    write_snapshot(store, os.path.join(out_dir, STORE_FILE))
+    with open(os.path.join(out_dir, STATE_FILE), "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def apply_changes(store: pd.DataFrame, fetched: pd.DataFrame, high_water_mark=None, synced_at=None):
+    """Upsert changed records of ``fetched`` into ``store`` and tombstone deletions.
+
+    ``fetched`` is the full current listing (normalized). Returns
+    ``(new_store, summary)`` where summary counts added / updated / deleted
+    stations, counts changed fields and carries the new high-water mark.
+    """
+    synced_at = synced_at or pd.Timestamp.now(tz="UTC").isoformat()
+    hwm = _timestamps(pd.Series([high_water_mark])).iloc[0]
+    fetched = fetched.drop_duplicates(subset=["id"])
+
+    updated_at = _timestamps(fetched["updated_at"])
+    known = fetched["id"].isin(store["id"])
+    tombstoned = fetched["id"].isin(store.loc[store["deleted_at"].notna(), "id"])
+    newer = updated_at > hwm if pd.notna(hwm) else pd.Series(True, index=fetched.index)
+
+    # Field-level diff against the stored rows also catches edits that did not
+    # bump updated_at, and records which fields changed
+    diff = diff_snapshots(store, fetched, compare=[c for c in AFDC_FIELDS if c != "id"])
+    edited = fetched["id"].astype(str).isin(diff.modified["key"])
+    changed = fetched.loc[~known | newer | edited | tombstoned].assign(deleted_at=None)
+
+    live = store["deleted_at"].isna()
+    gone = live & ~store["id"].isin(fetched["id"])
+    store = store.copy()
+    store.loc[gone, "deleted_at"] = synced_at
+
+    kept = store.loc[~store["id"].isin(changed["id"])]
+    new_store = pd.concat([kept, changed], ignore_index=True) if len(kept) else changed.reset_index(drop=True)
+
+    new_hwm = updated_at.max()
+    if pd.notna(hwm) and (pd.isna(new_hwm) or hwm > new_hwm):
+        new_hwm = hwm
+    summary = {
+        "added": int((~known).sum()),
+        "updated": int((known & (newer | edited) & ~tombstoned).sum()),
+        "restored": int(tombstoned.sum()),
+        "deleted": int(gone.sum()),
+        "changed_fields": diff.summary()["changed_columns"],
+        "high_water_mark": new_hwm.isoformat() if pd.notna(new_hwm) else None,
+        "last_sync": synced_at,
+    }
+    return new_store, summary
+
+
+def dataset_last_updated(client: AFDCClient):
+    """Timestamp of the last AFDC dataset update, or None if unavailable."""
+    try:
+        payload = client.get("last-updated.json", {})
+    except Exception:
+        return None
+    return _timestamps(pd.Series([payload.get("last_updated")])).iloc[0]
+
+
+def sync(out_dir: str, fetch, client: AFDCClient = None, force: bool = False) -> dict:
+    """Run one incremental sync into ``out_dir``.
+
+    ``fetch`` is a zero-argument callable returning the current list of raw
+    AFDC station records for the region, e.g.
+    ``lambda: fetch_pages(client, state="CA")``.
+    """
+    store, state = load_store(out_dir)
+    hwm = state.get("high_water_mark")
+
+    if client is not None and hwm and not force:
+        last_updated = dataset_last_updated(client)
+        if last_updated is not None and last_updated <= _timestamps(pd.Series([hwm])).iloc[0]:
+            return {"added": 0, "updated": 0, "restored": 0, "deleted": 0, "changed_fields": {},
+                    "high_water_mark": hwm, "last_sync": state.get("last_sync"), "skipped": True}
+
+    fetched = normalize_stations(fetch())
+    store, summary = apply_changes(store, fetched, hwm)
+    state.update(summary)
+    state["stations"] = int(store["deleted_at"].isna().sum())
+    save_store(out_dir, store, state)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental AFDC station sync")
+    parser.add_argument("--state", default="CA", help="two-letter state to sync")
+    parser.add_argument("--out-dir", default=os.path.join("data", "afdc"))
+    parser.add_argument("--force", action="store_true", help="ignore the last-updated check")
+    args = parser.parse_args(argv)
+
+    client = AFDCClient()
+    summary = sync(args.out_dir, lambda: fetch_pages(client, state=args.state),
+                   client=client, force=args.force)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
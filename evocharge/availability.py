@@ -0,0 +1,77 @@
+"""
+Station availability at arrival time, scored for many stations in one call.
+
+The per-port busy probability ``p_busy(t)`` comes from the charging sessions:
+the mean expected concurrency per session station for each weekly slot
+(``OccupancyTimeline.profile``), smoothed over neighbouring slots because the
+sample is small. Treating ports as independent, a station with ``n`` ports
+has at least one free port with probability ``1 - p_busy(t) ** n``.
+
+``AvailabilityModel.predict`` evaluates that for every station and every
+requested arrival time as one ``(times x stations)`` matrix operation,
+``1 - exp(outer(log p_busy, ports))``, so 10K stations score in well under a
+millisecond; the model itself is a small per-slot array and is built once per
+process (the dashboard keeps it in ``st.cache_resource``).
+"""
+
+import numpy as np
+import pandas as pd
+
+from evocharge.occupancy import BIN_MINUTES, OccupancyTimeline, to_minutes, week_slot
+from evocharge.session_analytics import SESSIONS_CSV
+
+TIMEZONE = "America/Los_Angeles"
+SMOOTHING_MINUTES = 60
+MAX_BUSY = 0.98
+
+
+def arrival_time(eta_minutes, now=None, tz: str = TIMEZONE) -> pd.Timestamp:
+    """Local (naive) wall-clock time ``eta_minutes`` from ``now``."""
+    now = pd.Timestamp.now(tz=tz) if now is None else pd.Timestamp(now)
+    if now.tzinfo is not None:
+        now = now.tz_convert(tz).tz_localize(None)
+    return now + pd.Timedelta(minutes=float(eta_minutes))
+
+
+class AvailabilityModel:
+    """Per-slot busy probability of a single port over the week."""
+
+    def __init__(self, p_busy: np.ndarray, bin_minutes: int = BIN_MINUTES):
+        self.bin_minutes = bin_minutes
+        self.p_busy = np.clip(np.asarray(p_busy, dtype=float), 0.0, MAX_BUSY)
+        with np.errstate(divide="ignore"):
+            self._log_p = np.log(self.p_busy)
+
+    @classmethod
+    def from_timeline(cls, timeline: OccupancyTimeline, smoothing_minutes: int = SMOOTHING_MINUTES):
+        p_busy = timeline.profile.mean(axis=0) if len(timeline.stations) else np.zeros(timeline.profile.shape[1])
+        width = max(int(smoothing_minutes // timeline.bin_minutes), 1)
+        if width > 1:
+            # Circular moving average: the week wraps from Sunday to Monday
+            padded = np.concatenate([p_busy[-width:], p_busy, p_busy[:width]])
+            kernel = np.ones(2 * width + 1) / (2 * width + 1)
+            p_busy = np.convolve(padded, kernel, mode="same")[width:-width]
+        return cls(p_busy, timeline.bin_minutes)
+
+    @classmethod
+    def from_sessions(cls, path: str = SESSIONS_CSV, **kwargs):
+        return cls.from_timeline(OccupancyTimeline.from_csv(path), **kwargs)
+
+    def busy_probability(self, times) -> np.ndarray:
+        """Single-port busy probability at each of ``times``."""
+        return self.p_busy[week_slot(to_minutes(times), self.bin_minutes)]
+
+    def predict(self, ports, times) -> np.ndarray:
+        """Probability that at least one port is free on arrival.
+
+        ``ports`` has one entry per station. A scalar ``times`` returns one
+        value per station; a sequence of ``m`` times returns an
+        ``(m, stations)`` matrix. Stations without ports score 0.
+        """
+        ports = np.asarray(ports, dtype=float)
+        log_p = self._log_p[week_slot(to_minutes(times), self.bin_minutes)]
+        with np.errstate(invalid="ignore"):
+            busy = np.exp(np.multiply.outer(log_p, ports))
+        busy = np.where(ports > 0, np.nan_to_num(busy, nan=1.0), 1.0)
+        available = 1.0 - busy
+        return available[0] if np.ndim(times) == 0 else available
@@ -0,0 +1,126 @@
+"""
+Bitmap indexes over the station table for filters and Quick Stats.
+
+``StationBitmaps`` is built once per dataset and holds, as ``np.packbits``
+bitmaps (one bit per station, ``n / 8`` bytes each):
+
+- one bitmap per value of the low-cardinality columns in ``BITMAP_COLUMNS``
+  (network, access code, facility type, when present);
+- one per charger class (``dc_only``, ``l2_only``, ``both``, ``none``);
+- threshold bitmaps ``count >= k`` for every distinct port count ``k`` of
+  the DC fast / Level 2 columns (a ``searchsorted`` over the sorted distinct
+  counts picks the bitmap for any requested minimum).
+
+A filter is then a few bitwise ANDs over ``n / 8`` bytes, and Quick Stats are
+popcounts of ``filter & bitmap``: for 65K stations each operation touches 8 KB,
+so filtering and stats take microseconds. ``mask`` unpacks a bitmap into the
+boolean station mask the rest of the dashboard uses.
+"""
+
+import numpy as np
+import pandas as pd
+
+BITMAP_COLUMNS = ["ev_network", "access_code", "facility_type"]
+THRESHOLD_COLUMNS = ["ev_dc_fast_num", "ev_level2_evse_num"]
+CHARGER_CLASSES = ["dc_only", "l2_only", "both", "none"]
+
+if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+    _bit_counts = np.bitwise_count
+else:
+    _BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _bit_counts(bitmap):
+        return _BYTE_BITS[bitmap]
+
+
+def popcount(bitmap, axis=None):
+    """Number of set bits (per row of a stacked bitmap with ``axis=-1``)."""
+    counts = _bit_counts(bitmap).sum(axis=axis, dtype=np.int64)
+    return int(counts) if axis is None else counts
+
+
+def _value_bitmaps(values: pd.Series):
+    """Sorted distinct values and a stacked bitmap per value (missing values get none)."""
+    codes, uniques = pd.factorize(values, sort=True)
+    return uniques.tolist(), np.packbits(codes[None, :] == np.arange(len(uniques))[:, None], axis=1)
+
+
+class StationBitmaps:
+    """Packed bitmaps per category value, charger class and port-count threshold."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.n = len(df)
+        self.all = np.packbits(np.ones(self.n, dtype=bool))
+        self.none = np.zeros_like(self.all)
+
+        # column -> (values, stacked bitmaps); ``values`` maps each value to its row
+        self.stacked = {col: _value_bitmaps(df[col]) for col in BITMAP_COLUMNS if col in df.columns}
+        dc = df["ev_dc_fast_num"].to_numpy() > 0
+        l2 = df["ev_level2_evse_num"].to_numpy() > 0
+        self.stacked["charger_class"] = (CHARGER_CLASSES, np.packbits(
+            np.vstack([dc & ~l2, ~dc & l2, dc & l2, ~dc & ~l2]), axis=1))
+        self.values = {col: dict(zip(labels, bits)) for col, (labels, bits) in self.stacked.items()}
+
+        # Sorted distinct counts and the ">= count" bitmap of each
+        self.thresholds = {}
+        for col in THRESHOLD_COLUMNS:
+            counts = df[col].to_numpy()
+            distinct = np.unique(counts)
+            self.thresholds[col] = (distinct, np.packbits(counts[None, :] >= distinct[:, None], axis=1))
+
+    def __len__(self):
+        return self.n
+
+    def options(self, column: str) -> list:
+        """Indexed values of ``column`` (sorted; empty if the column is absent)."""
+        return list(self.values.get(column, {}))
+
+    def bitmap(self, column: str, values) -> np.ndarray:
+        """Stations whose ``column`` is any of ``values`` (one value or a list)."""
+        index = self.values.get(column, {})
+        if isinstance(values, str) or not hasattr(values, "__iter__"):
+            values = [values]
+        bits = self.none.copy()
+        for value in values:
+            if value in index:
+                bits |= index[value]
+        return bits
+
+    def at_least(self, column: str, k) -> np.ndarray:
+        """Stations with ``column >= k``."""
+        distinct, bits = self.thresholds[column]
+        j = np.searchsorted(distinct, k, side="left")
+        return bits[j] if j < len(distinct) else self.none
+
+    def select(self, min_counts: dict = None, **values) -> np.ndarray:
+        """AND of ``column >= k`` for ``min_counts`` and ``column in values``.
+
+        ``None`` (or an empty list) leaves a column unfiltered, e.g.
+        ``select({"ev_dc_fast_num": 2}, ev_network="ChargePoint Network")``.
+        """
+        bits = self.all.copy()
+        for column, k in (min_counts or {}).items():
+            if k:
+                bits &= self.at_least(column, k)
+        for column, value in values.items():
+            if value is not None and not (isinstance(value, (list, tuple)) and not value):
+                bits &= self.bitmap(column, value)
+        return bits
+
+    def mask(self, bits: np.ndarray) -> np.ndarray:
+        """Boolean station mask of a bitmap."""
+        return np.unpackbits(bits, count=self.n).astype(bool)
+
+    def count(self, bits: np.ndarray) -> int:
+        return popcount(bits)
+
+    def value_counts(self, column: str, bits: np.ndarray) -> pd.Series:
+        """Stations per ``column`` value within ``bits`` (non-zero, largest first)."""
+        labels, stacked = self.stacked.get(column, ([], np.empty((0, len(self.none)), dtype=np.uint8)))
+        counts = pd.Series(popcount(stacked & bits, axis=-1), index=pd.Index(labels, dtype=object), dtype="int64")
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+    def charger_counts(self, bits: np.ndarray) -> dict:
+        """Stations per charger class within ``bits``."""
+        labels, stacked = self.stacked["charger_class"]
+        return dict(zip(labels, popcount(stacked & bits, axis=-1).tolist()))
@@ -0,0 +1,88 @@
+"""
+Zoom-dependent clustering of station markers.
+
+Each zoom level gets a square grid whose cell size is ``CLUSTER_CELL_PX``
+screen pixels at that zoom. Cell sizes halve with every zoom step and share
+the same origin, so a cell at zoom ``z`` is exactly the union of four cells at
+``z + 1`` and the levels form a hierarchy. The per-station cell assignment is
+precomputed once per dataset; aggregating a level for the current filter mask
+is then a single ``np.unique`` plus a few ``np.bincount`` calls.
+"""
+
+import numpy as np
+import pandas as pd
+
+from evocharge.spatial_index import TILE_SIZE_PX
+
+MIN_ZOOM = 9
+MAX_ZOOM = 15
+CLUSTER_CELL_PX = 48
+
+
+def cell_size_deg(zoom: int, cell_px: int = CLUSTER_CELL_PX) -> float:
+    """Grid cell size in degrees for ``zoom``."""
+    return cell_px * 360.0 / (TILE_SIZE_PX * 2.0 ** zoom)
+
+
+def grid_cells(lat, lon, zoom: int, cell_px: int = CLUSTER_CELL_PX):
+    """Integer (row, col) of the zoom-level grid cell for each coordinate."""
+    size = cell_size_deg(zoom, cell_px)
+    rows = np.floor((np.asarray(lat, dtype=np.float64) + 90.0) / size).astype(np.int64)
+    cols = np.floor((np.asarray(lon, dtype=np.float64) + 180.0) / size).astype(np.int64)
+    return rows, cols
+
+
+class ClusterPyramid:
+    """Station clusters for every zoom level between ``min_zoom`` and ``max_zoom``."""
+
+    def __init__(self, df: pd.DataFrame, min_zoom: int = MIN_ZOOM, max_zoom: int = MAX_ZOOM,
+                 cell_px: int = CLUSTER_CELL_PX):
+        self.min_zoom, self.max_zoom = min_zoom, max_zoom
+        self.lat = df["latitude"].to_numpy(dtype=np.float64)
+        self.lon = df["longitude"].to_numpy(dtype=np.float64)
+        self.dc_ports = df["ev_dc_fast_num"].to_numpy(dtype=np.float64)
+        self.l2_ports = df["ev_level2_evse_num"].to_numpy(dtype=np.float64)
+        self.capacity = df["capacity_proxy"].to_numpy(dtype=np.float64)
+        # Object dtype: cluster summaries replace labels that may be categorical
+        self.labels = df[["station_name", "ev_network", "street_address"]].astype(object).reset_index(drop=True)
+
+        # Finest level from coordinates, coarser levels by halving the cell
+        # indices so every cluster nests inside its parent.
+        rows, cols = grid_cells(self.lat, self.lon, max_zoom, cell_px)
+        self._cell_ids = {}
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            shift = max_zoom - zoom
+            self._cell_ids[zoom] = ((rows >> shift) << 32) | (cols >> shift)
+
+    def level(self, zoom: int, mask=None) -> pd.DataFrame:
+        """Clusters at ``zoom`` over the stations selected by ``mask``."""
+        zoom = int(min(max(zoom, self.min_zoom), self.max_zoom))
+        idx = np.arange(len(self.lat)) if mask is None else np.flatnonzero(mask)
+        keys, first, inverse, counts = np.unique(
+            self._cell_ids[zoom][idx], return_index=True, return_inverse=True, return_counts=True
+        )
+        n = len(keys)
+
+        def total(values):
+            return np.bincount(inverse, weights=values[idx], minlength=n)
+
+        clusters = pd.DataFrame({
+            "latitude": total(self.lat) / counts,
+            "longitude": total(self.lon) / counts,
+            "station_count": counts,
+            "ev_dc_fast_num": total(self.dc_ports).astype(int),
+            "ev_level2_evse_num": total(self.l2_ports).astype(int),
+            "dc_fast_stations": np.bincount(inverse, weights=(self.dc_ports[idx] > 0), minlength=n).astype(int),
+            "capacity_proxy": total(self.capacity),
+        })
+        clusters["total_ports"] = clusters["ev_dc_fast_num"] + clusters["ev_level2_evse_num"]
+        # Row of one member station (the only one for singletons)
+        clusters["station"] = idx[first]
+
+        # Singletons keep their station's labels; real clusters get a summary
+        labels = self.labels.iloc[idx[first]].reset_index(drop=True)
+        single = counts == 1
+        clusters["station_name"] = labels["station_name"].where(single, pd.Series(counts).astype(str) + " stations")
+        clusters["ev_network"] = labels["ev_network"].where(single, "Multiple stations")
+        clusters["street_address"] = labels["street_address"].where(single, "")
+        return clusters
@@ -0,0 +1,96 @@
+"""
+Connector types as a per-station integer bitmask.
+
+``ev_connector_types`` arrives as free text: comma-joined from
+``normalize_stations`` ("CHADEMO,J1772COMBO") and space-separated in the
+Kaggle exports ("CHADEMO J1772 J1772COMBO"). ``connector_mask`` parses it once
+at ingest into a ``uint16`` column with one bit per entry of the fixed
+``CONNECTOR_TYPES`` vocabulary (unknown tokens set the ``OTHER_BIT``), so a
+connector filter such as "has CCS and NACS" is one vectorized
+``mask & required == required`` instead of a string scan per row.
+
+Each distinct connector string is parsed once (``parse_connectors`` is
+memoized and the column is factorized first); bit positions are fixed, so
+masks stay comparable across datasets and snapshots.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# AFDC connector codes in bit order (bit i = CONNECTOR_TYPES[i]); append only
+CONNECTOR_TYPES = ["NEMA1450", "NEMA515", "NEMA520", "J1772", "J1772COMBO", "CHADEMO", "TESLA"]
+CONNECTOR_LABELS = {
+    "NEMA1450": "NEMA 14-50",
+    "NEMA515": "NEMA 5-15",
+    "NEMA520": "NEMA 5-20",
+    "J1772": "J1772 (Level 2)",
+    "J1772COMBO": "CCS",
+    "CHADEMO": "CHAdeMO",
+    "TESLA": "NACS (Tesla)",
+}
+CONNECTOR_BITS = {name: 1 << i for i, name in enumerate(CONNECTOR_TYPES)}
+OTHER_BIT = 1 << 15
+
+# Source columns (AFDC / Kaggle naming) and the derived mask column
+CONNECTOR_COLUMNS = ["ev_connector_types", "EV Connector Types"]
+MASK_COLUMN = "connector_mask"
+
+_SEPARATORS = re.compile(r"[\s,;]+")
+
+
+@lru_cache(maxsize=None)
+def parse_connectors(value: str) -> int:
+    """Bitmask of one connector string (comma- or space-separated codes)."""
+    bits = 0
+    for token in _SEPARATORS.split(value.upper()):
+        if token:
+            bits |= CONNECTOR_BITS.get(token, OTHER_BIT)
+    return bits
+
+
+def connector_mask(values) -> np.ndarray:
+    """``uint16`` connector bitmask per row (0 where the value is missing)."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    lookup = np.array([parse_connectors(str(v)) for v in uniques] + [0], dtype=np.uint16)
+    return lookup[codes]  # code -1 (missing) picks the trailing 0
+
+
+def connector_bits(names) -> int:
+    """Bitmask of connector codes (e.g. ``["J1772COMBO", "TESLA"]``)."""
+    bits = 0
+    for name in names:
+        bits |= CONNECTOR_BITS[name]
+    return bits
+
+
+def has_all(masks, names) -> np.ndarray:
+    """Rows offering every connector in ``names`` (all rows if ``names`` is empty)."""
+    required = np.uint16(connector_bits(names))
+    masks = np.asarray(masks, dtype=np.uint16)
+    return (masks & required) == required
+
+
+def has_any(masks, names) -> np.ndarray:
+    """Rows offering at least one connector in ``names``."""
+    return (np.asarray(masks, dtype=np.uint16) & np.uint16(connector_bits(names))) != 0
+
+
+def present_types(masks) -> list:
+    """Connector codes that occur in ``masks``, in vocabulary order."""
+    seen = int(np.bitwise_or.reduce(np.asarray(masks, dtype=np.uint16), initial=0))
+    return [name for name in CONNECTOR_TYPES if seen & CONNECTOR_BITS[name]]
+
+
+def connector_names(mask: int) -> list:
+    """Connector codes set in one station's mask."""
+    return [name for name in CONNECTOR_TYPES if int(mask) & CONNECTOR_BITS[name]]
+
+
+def add_connector_mask(df: pd.DataFrame) -> pd.DataFrame:
+    """Set ``MASK_COLUMN`` from whichever connector column ``df`` has (in place)."""
+    source = next((c for c in CONNECTOR_COLUMNS if c in df.columns), None)
+    df[MASK_COLUMN] = connector_mask(df[source]) if source else np.zeros(len(df), dtype=np.uint16)
+    return df
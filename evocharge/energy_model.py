@@ -0,0 +1,239 @@
+"""
+Energy-consumption (``energy_kWh``) inference from the saved model artifacts.
+
+The artifacts live in ``app/models/`` (see DESIGN.md):
+
+- ``energy_predictor.pkl``: fitted regressor;
+- ``scaler.pkl``: fitted feature scaler;
+- ``feature_names.pkl``: feature order the model was trained with.
+
+``EnergyPredictor`` loads them lazily, once, under a lock (``load_async``
+warms it in a background thread so the first Streamlit rerun does not pay the
+unpickling), checks that every trained feature can be built, and predicts a
+whole DataFrame of sessions with one ``scaler.transform`` + ``model.predict``.
+``MicroBatcher`` collects single interactive requests from many threads for a
+few milliseconds and answers them with one batch call.
+
+``make_features`` derives the model inputs from session-like rows
+(``duration_min``, ``session_type``, ``start_time`` and/or ``session_day``).
+
+Train and save the artifacts from the bundled sessions:
+    python -m evocharge.energy_model
+"""
+
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from evocharge.session_analytics import DAY_TYPES, SESSIONS_CSV, TIME_FORMAT
+from evocharge.zip_county import PROJECT_ROOT
+
+try:
+    import joblib
+except ImportError:  # only needed once the artifacts are loaded or saved
+    joblib = None
+
+MODEL_DIR = os.path.join(PROJECT_ROOT, "app", "models")
+MODEL_FILE = "energy_predictor.pkl"
+SCALER_FILE = "scaler.pkl"
+FEATURES_FILE = "feature_names.pkl"
+
+SESSION_TYPES = ["Regular", "Occasional", "Emergency"]
+# (name, first hour) of each time-of-day category
+TIME_OF_DAY = [("night", 0), ("morning", 6), ("afternoon", 12), ("evening", 18)]
+PEAK_HOURS = range(16, 21)
+
+MAX_BATCH = 256
+MAX_WAIT_SECONDS = 0.005
+
+
+def make_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Model features for session-like rows.
+
+    Needs ``duration_min``, ``session_type`` and either ``start_time`` or
+    ``hour`` (``session_day``, when given, sets the weekend flag); categorical inputs are one-hot encoded against
+    fixed vocabularies so every batch has the same columns.
+    """
+    missing = [c for c in ("duration_min", "session_type") if c not in df.columns]
+    if "start_time" not in df.columns and "hour" not in df.columns:
+        missing.append("start_time or hour")
+    if missing:
+        raise ValueError(f"Missing model inputs: {missing}")
+
+    out = pd.DataFrame(index=df.index)
+    out["duration_min"] = pd.to_numeric(df["duration_min"], errors="coerce")
+
+    if "start_time" in df.columns:
+        start = pd.to_datetime(df["start_time"], format=TIME_FORMAT, errors="coerce")
+        hour = start.dt.hour
+        day_of_week = start.dt.dayofweek
+        weekend = day_of_week >= 5
+    else:
+        hour = pd.to_numeric(df["hour"], errors="coerce")
+        day_of_week = pd.Series(np.nan, index=df.index)
+        weekend = pd.Series(False, index=df.index)
+    if "session_day" in df.columns:
+        weekend = df["session_day"] == DAY_TYPES[1]
+
+    out["hour"] = hour
+    out["day_of_week"] = day_of_week
+    out["is_weekend"] = weekend.astype(int)
+    out["is_peak"] = hour.isin(PEAK_HOURS).astype(int)
+
+    bounds = [first_hour for _, first_hour in TIME_OF_DAY]
+    tod = np.searchsorted(bounds, hour.fillna(0).to_numpy(), side="right") - 1
+    for i, (name, _) in enumerate(TIME_OF_DAY):
+        out[f"time_of_day_{name}"] = (tod == i).astype(int)
+
+    for name in SESSION_TYPES:
+        out[f"session_type_{name}"] = (df["session_type"] == name).astype(int)
+    return out
+
+
+class EnergyPredictor:
+    """Lazily loaded regressor + scaler with a fixed feature order."""
+
+    def __init__(self, model_dir: str = MODEL_DIR):
+        self.model_dir = model_dir
+        self.model = None
+        self.scaler = None
+        self.feature_names = None
+        self._lock = threading.Lock()
+        self._loader = None
+
+    def available(self) -> bool:
+        """True if all three artifacts exist."""
+        return all(os.path.exists(os.path.join(self.model_dir, f))
+                   for f in (MODEL_FILE, SCALER_FILE, FEATURES_FILE))
+
+    def load(self):
+        """Load the artifacts (first call only; later calls return immediately)."""
+        if self.model is not None:
+            return self
+        with self._lock:
+            if self.model is None:
+                if joblib is None:
+                    raise ImportError("joblib is required to load the energy model")
+                feature_names = list(joblib.load(os.path.join(self.model_dir, FEATURES_FILE)))
+                scaler = joblib.load(os.path.join(self.model_dir, SCALER_FILE))
+                model = joblib.load(os.path.join(self.model_dir, MODEL_FILE))
+                self._check_artifacts(feature_names, scaler, model)
+                self.feature_names, self.scaler, self.model = feature_names, scaler, model
+        return self
+
+    def load_async(self):
+        """Start loading in a background thread; ``predict`` waits for it."""
+        if self._loader is None and self.model is None:
+            self._loader = threading.Thread(target=self.load, daemon=True)
+            self._loader.start()
+        return self
+
+    @staticmethod
+    def _check_artifacts(feature_names, scaler, model):
+        for name, fitted in (("scaler", scaler), ("model", model)):
+            trained = getattr(fitted, "feature_names_in_", None)
+            if trained is not None and list(trained) != feature_names:
+                raise ValueError(f"{name} was fitted on features {list(trained)}, "
+                                 f"feature_names.pkl lists {feature_names}")
+            n = getattr(fitted, "n_features_in_", None)
+            if n is not None and n != len(feature_names):
+                raise ValueError(f"{name} expects {n} features, feature_names.pkl lists {len(feature_names)}")
+
+    def feature_matrix(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Features in training order; raises if any trained feature is missing."""
+        self.load()
+        features = make_features(df)
+        # Extra columns supplied by the caller (e.g. user patterns) take precedence
+        extra = [c for c in df.columns if c in self.feature_names and c not in features.columns]
+        if extra:
+            features = features.join(df[extra])
+        missing = [c for c in self.feature_names if c not in features.columns]
+        if missing:
+            raise ValueError(f"Missing model features: {missing}")
+        return features[self.feature_names].fillna(0)
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        """Predicted ``energy_kWh`` for every row of ``df`` in one call."""
+        if self._loader is not None:
+            self._loader.join()
+        if df.empty:
+            return np.zeros(0)
+        X = self.feature_matrix(df)
+        return np.asarray(self.model.predict(self.scaler.transform(X)), dtype=float)
+
+
+class MicroBatcher:
+    """Coalesce single-row requests from many threads into batch ``predict`` calls.
+
+    A worker thread waits for the first request, then collects more for up to
+    ``max_wait`` seconds (or ``max_batch`` rows) and answers them all at once.
+    """
+
+    def __init__(self, predictor: EnergyPredictor, max_batch: int = MAX_BATCH,
+                 max_wait: float = MAX_WAIT_SECONDS):
+        self.predictor = predictor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, row: dict) -> Future:
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def predict_one(self, row: dict, timeout: float = None) -> float:
+        """Predicted ``energy_kWh`` of one session (blocks until its batch ran)."""
+        return self.submit(row).result(timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                pass
+            rows, futures = zip(*batch)
+            try:
+                predictions = self.predictor.predict(pd.DataFrame(list(rows)))
+            except Exception as exc:
+                for future in futures:
+                    future.set_exception(exc)
+                continue
+            for future, value in zip(futures, predictions):
+                future.set_result(float(value))
+
+
+def train_and_save(sessions: pd.DataFrame, model_dir: str = MODEL_DIR) -> str:
+    """Fit a scaler + random forest on ``sessions`` and write the three artifacts."""
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    features = make_features(sessions).fillna(0)
+    feature_names = list(features.columns)
+    scaler = StandardScaler().fit(features)
+    model = RandomForestRegressor(n_estimators=200, min_samples_leaf=5, random_state=42, n_jobs=-1)
+    model.fit(scaler.transform(features), sessions["energy_kWh"].to_numpy())
+
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(model, os.path.join(model_dir, MODEL_FILE))
+    joblib.dump(scaler, os.path.join(model_dir, SCALER_FILE))
+    joblib.dump(feature_names, os.path.join(model_dir, FEATURES_FILE))
+    return model_dir
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    sessions = pd.read_csv(args[0] if args else SESSIONS_CSV)
+    print(f"Saved: {train_and_save(sessions, args[1] if len(args) > 1 else MODEL_DIR)}")
+
+
+if __name__ == "__main__":
+    main()
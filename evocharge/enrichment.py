@@ -0,0 +1,151 @@
+"""
+Station -> county -> electricity rate enrichment as a streaming stage.
+
+Reads a Kaggle-style station export (``Station Name``, ``State``, ``ZIP``,
+...) in fixed-size chunks, keeps one state, normalizes ZIPs to 5-digit
+strings in ``zip_code`` (the source ``ZIP`` column is passed through as
+text, unchanged), maps them to counties with the compiled ZIP lookup and joins the
+county electricity rates from ``ca_county_rates.csv``. Every chunk is cast to
+the same dtypes before it is appended, so memory stays bounded by the chunk
+size and the output schema does not depend on which rows a chunk happened to
+contain (no more ``91352.0`` ZIPs).
+
+Writes CSV, or an Arrow IPC file when the output path ends in ``.arrow``:
+    python -m evocharge.enrichment \\
+        data/ev_charging_stations/ev_charging_stations_feb2024_cleaned.csv \\
+        data/ca_county_prices/ev_charging_stations_county_prices.csv
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from evocharge.zip_county import PROJECT_ROOT, load_lookup, parse_zip5
+
+try:
+    import pyarrow as pa
+except ImportError:  # only needed for .arrow output
+    pa = None
+
+RATES_CSV = os.path.join(PROJECT_ROOT, "data", "ca_county_prices", "ca_county_rates.csv")
+CHUNK_SIZE = 50000
+
+COUNT_COLUMNS = ["EV Level1 EVSE Num", "EV Level2 EVSE Num", "EV DC Fast Count", "Total_Chargers"]
+FLAG_COLUMNS = ["Has_Level1", "Has_Level2", "Has_DC_Fast"]
+ENRICHED_DTYPES = {
+    "ZIP": "string",
+    "zip_code": "string",
+    "county_name": "string",
+    "electricity_rate_per_kwh": "float64",
+    "rate_tier": "string",
+}
+
+
+def _zip_strings(zips: np.ndarray) -> pd.Series:
+    out = pd.Series(zips.astype(str), dtype="string").str.zfill(5)
+    out[zips < 0] = pd.NA
+    return out
+
+
+def normalize_zip(values) -> pd.Series:
+    """5-digit, zero-padded ZIP strings (``<NA>`` where invalid)."""
+    return _zip_strings(parse_zip5(values))
+
+
+def load_rates(path: str = RATES_CSV) -> pd.DataFrame:
+    """County rate table indexed by county name."""
+    rates = pd.read_csv(path, usecols=["county_name", "rate_per_kwh", "rate_tier"])
+    return rates.drop_duplicates(subset=["county_name"]).set_index("county_name")
+
+
+def enrich_chunk(chunk: pd.DataFrame, zip_lookup, rates: pd.DataFrame, state: str = "CA") -> pd.DataFrame:
+    """Filter one chunk to ``state`` and add county and rate columns."""
+    if state is not None:
+        chunk = chunk.loc[chunk["State"] == state]
+    chunk = chunk.reset_index(drop=True)
+
+    zip_ints = parse_zip5(chunk["ZIP"])
+    zips = _zip_strings(zip_ints)
+    counties = pd.Series(zip_lookup.lookup(zip_ints, state=state), dtype="string")
+
+    chunk["zip_code"] = zips.where(counties.notna())
+    chunk["county_name"] = counties
+    chunk["electricity_rate_per_kwh"] = counties.map(rates["rate_per_kwh"]).astype("float64")
+    chunk["rate_tier"] = counties.map(rates["rate_tier"])
+    return cast_output(chunk)
+
+
+def cast_output(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the fixed output dtypes so every chunk has the same schema."""
+    dtypes = dict(ENRICHED_DTYPES)
+    dtypes.update({c: "float64" for c in COUNT_COLUMNS if c in df.columns})
+    dtypes.update({c: "bool" for c in FLAG_COLUMNS if c in df.columns})
+    for col in df.columns:
+        if col not in dtypes and df[col].dtype == object:
+            dtypes[col] = "string"
+    return df.astype(dtypes)
+
+
+def iter_enriched(in_path: str, state: str = "CA", chunksize: int = CHUNK_SIZE,
+                  zip_lookup=None, rates_path: str = RATES_CSV):
+    """Yield enriched chunks of ``in_path``."""
+    zip_lookup = zip_lookup or load_lookup()
+    rates = load_rates(rates_path)
+    for chunk in pd.read_csv(in_path, chunksize=chunksize, dtype={"ZIP": str}):
+        enriched = enrich_chunk(chunk, zip_lookup, rates, state=state)
+        if len(enriched):
+            yield enriched
+
+
+def enrich_stations(in_path: str, out_path: str, state: str = "CA", chunksize: int = CHUNK_SIZE,
+                    zip_lookup=None, rates_path: str = RATES_CSV) -> int:
+    """Stream ``in_path`` through the enrichment and write ``out_path``.
+
+    Returns the number of rows written.
+    """
+    chunks = iter_enriched(in_path, state=state, chunksize=chunksize,
+                           zip_lookup=zip_lookup, rates_path=rates_path)
+    tmp_path = out_path + ".tmp"
+    rows = 0
+
+    if out_path.endswith(".arrow"):
+        if pa is None:
+            raise ImportError("pyarrow is required for .arrow output")
+        sink, writer, schema = pa.OSFile(tmp_path, "wb"), None, None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pa.ipc.new_file(sink, schema)
+                writer.write_table(table.cast(schema))
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+            sink.close()
+    else:
+        header = True
+        for chunk in chunks:
+            chunk.to_csv(tmp_path, mode="w" if header else "a", header=header, index=False)
+            header = False
+            rows += len(chunk)
+        if header:  # no matching rows: still write an empty file
+            open(tmp_path, "w").close()
+
+    os.replace(tmp_path, out_path)
+    return rows
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2:
+        sys.exit("usage: python -m evocharge.enrichment STATIONS.csv OUTPUT.(csv|arrow)")
+    rows = enrich_stations(args[0], args[1])
+    print(f"Saved: {args[1]} ({rows} stations)")
+
+
+if __name__ == "__main__":
+    main()
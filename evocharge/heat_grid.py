@@ -0,0 +1,111 @@
+"""
+Server-side grid aggregation for the dashboard heatmap.
+
+Instead of sending every filtered station to a client-side ``HeatmapLayer``,
+stations are binned into square grid cells of ``HEAT_CELL_PX`` screen pixels
+per zoom level (the nested grid of ``evocharge.clustering``, finer cells).
+Each cell holds the station count, capacity sum, port count, DC fast station
+count and coordinate sums (for a station-weighted centroid), so the national
+station set renders as a few thousand cells.
+
+``HeatGrid`` precomputes the station -> cell code of every zoom level once per
+dataset. ``GridAggregate`` keeps one zoom level's per-cell sums for a filter
+mask and updates them incrementally: when the mask changes, only the stations
+that entered or left are added or subtracted (one ``np.bincount`` per summed
+column), falling back to a rebuild when that is the smaller job.
+"""
+
+import numpy as np
+import pandas as pd
+
+from evocharge.clustering import MAX_ZOOM, MIN_ZOOM, grid_cells
+
+HEAT_CELL_PX = 16
+
+# Summed per cell, in this row order
+SUM_COLUMNS = ["station_count", "capacity_proxy", "total_ports", "dc_fast_stations", "latitude", "longitude"]
+
+
+class HeatGrid:
+    """Station -> grid cell codes for every zoom level of one dataset."""
+
+    def __init__(self, df: pd.DataFrame, min_zoom: int = MIN_ZOOM, max_zoom: int = MAX_ZOOM,
+                 cell_px: int = HEAT_CELL_PX):
+        self.min_zoom, self.max_zoom = min_zoom, max_zoom
+        lat = df["latitude"].to_numpy(dtype=np.float64)
+        lon = df["longitude"].to_numpy(dtype=np.float64)
+        self.values = np.nan_to_num(np.vstack([
+            np.ones(len(df)),
+            df["capacity_proxy"].to_numpy(dtype=np.float64),
+            df["total_ports"].to_numpy(dtype=np.float64),
+            (df["ev_dc_fast_num"] > 0).to_numpy(dtype=np.float64),
+            lat,
+            lon,
+        ]))
+
+        # Dense cell codes per zoom (coarser levels halve the finest cell indices)
+        rows, cols = grid_cells(lat, lon, max_zoom, cell_px)
+        self.codes = {}
+        self.n_cells = {}
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            shift = max_zoom - zoom
+            keys, codes = np.unique(((rows >> shift) << 32) | (cols >> shift), return_inverse=True)
+            self.codes[zoom] = codes.ravel()
+            self.n_cells[zoom] = len(keys)
+
+    def __len__(self):
+        return self.values.shape[1]
+
+    def clamp_zoom(self, zoom: int) -> int:
+        return int(min(max(zoom, self.min_zoom), self.max_zoom))
+
+    def aggregate(self, zoom: int, mask=None) -> "GridAggregate":
+        """Per-cell sums at ``zoom`` (all stations if ``mask`` is None)."""
+        agg = GridAggregate(self, zoom)
+        return agg.update(np.ones(len(self), dtype=bool) if mask is None else mask)
+
+
+class GridAggregate:
+    """One zoom level's per-cell sums, kept in step with a changing filter mask."""
+
+    def __init__(self, grid: HeatGrid, zoom: int):
+        self.grid = grid
+        self.zoom = grid.clamp_zoom(zoom)
+        self.codes = grid.codes[self.zoom]
+        self.mask = np.zeros(len(grid), dtype=bool)
+        self.sums = np.zeros((len(SUM_COLUMNS), grid.n_cells[self.zoom]))
+
+    def update(self, mask) -> "GridAggregate":
+        """Move the sums to ``mask``, touching only the stations that changed."""
+        mask = np.asarray(mask, dtype=bool)
+        changed = np.flatnonzero(mask != self.mask)
+        if len(changed) == 0:
+            return self
+        if len(changed) > mask.sum():
+            # More stations changed than remain selected: rebuild from the mask
+            rows = np.flatnonzero(mask)
+            sign = np.ones(len(rows))
+            self.sums[:] = 0.0
+        else:
+            rows = changed
+            sign = np.where(mask[rows], 1.0, -1.0)
+        codes = self.codes[rows]
+        n_cells = self.sums.shape[1]
+        for j, values in enumerate(self.grid.values):
+            self.sums[j] += np.bincount(codes, weights=values[rows] * sign, minlength=n_cells)
+        self.mask = mask.copy()
+        return self
+
+    def cells(self) -> pd.DataFrame:
+        """Non-empty cells with totals, means and a station-weighted centroid."""
+        sums = dict(zip(SUM_COLUMNS, self.sums[:, self.sums[0] > 0.5]))
+        count = np.rint(sums["station_count"])
+        return pd.DataFrame({
+            "latitude": sums["latitude"] / count,
+            "longitude": sums["longitude"] / count,
+            "station_count": count.astype(np.int64),
+            "capacity_sum": sums["capacity_proxy"],
+            "capacity_mean": sums["capacity_proxy"] / count,
+            "total_ports": np.rint(sums["total_ports"]).astype(np.int64),
+            "dc_fast_share": np.rint(sums["dc_fast_stations"]) / count,
+        })
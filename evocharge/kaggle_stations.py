@@ -0,0 +1,128 @@
+"""
+Kaggle station workbooks (``EV_Charging_Stations_*.xlsx``) without re-parsing Excel.
+
+Parsing the 65K / 54K row workbooks with ``pd.read_excel`` dominates the
+station refresh. ``read_workbook`` converts each workbook once into an Arrow
+IPC file named after the SHA-256 of the workbook bytes; later runs hash the
+file (milliseconds) and memory-map the cached table instead of parsing the
+XLSX. A re-downloaded workbook with different contents gets a new hash and is
+converted again.
+
+``clean_stations`` holds the cleaning both snapshots share (charger counts
+NaN -> 0, ``Total_Chargers``, ``Has_*`` flags, ``Connector_Mask`` from
+``evocharge.connectors``).
+
+Convert and clean both snapshots into this directory's CSVs:
+    python -m evocharge.kaggle_stations PATH/TO/kagglehub/download data/ev_charging_stations
+"""
+
+import glob
+import hashlib
+import os
+import sys
+
+import pandas as pd
+
+from evocharge.connectors import connector_mask
+from evocharge.station_store import read_snapshot, write_snapshot
+from evocharge.zip_county import PROJECT_ROOT
+
+CACHE_DIR = os.path.join(PROJECT_ROOT, "data", "ev_charging_stations", "cache")
+
+WORKBOOKS = {
+    "feb2024": "EV_Charging_Stations_Feb82024.xlsx",
+    "jan2023": "EV_Charging_Stations_Jan312023.xlsx",
+}
+CHARGER_COLUMNS = ["EV Level1 EVSE Num", "EV Level2 EVSE Num", "EV DC Fast Count"]
+CLEANED_COLUMNS = [
+    "Station Name", "Street Address", "City", "State", "ZIP",
+    "EV Level1 EVSE Num", "EV Level2 EVSE Num", "EV DC Fast Count",
+    "EV Network", "EV Connector Types", "Access Code", "Facility Type",
+    "Total_Chargers", "Has_Level1", "Has_Level2", "Has_DC_Fast", "Connector_Mask",
+]
+
+
+def file_digest(path: str, block_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of the file contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_path(workbook_path: str, digest: str, cache_dir: str = CACHE_DIR) -> str:
+    stem = os.path.splitext(os.path.basename(workbook_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest[:16]}.arrow")
+
+
+def _text_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Excel columns like ZIP mix ints and strings; Arrow needs one type per column
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        df[col] = values.where(values.isna(), values.astype(str))
+    return df
+
+
+def read_workbook(path: str, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """Raw workbook contents, from the content-hash cache when available."""
+    digest = file_digest(path)
+    cached = cache_path(path, digest, cache_dir)
+    if os.path.exists(cached):
+        return read_snapshot(cached)
+
+    df = _text_columns(pd.read_excel(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    write_snapshot(df, cached)
+
+    # Drop conversions of older versions of the same workbook
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for old in glob.glob(os.path.join(cache_dir, f"{stem}-*.arrow")):
+        if old != cached:
+            os.remove(old)
+    return df
+
+
+def clean_stations(df: pd.DataFrame) -> pd.DataFrame:
+    """Charger counts NaN -> 0 (no chargers of that type), totals, type flags and connector bitmask."""
+    df = df.copy()
+    df[CHARGER_COLUMNS] = df[CHARGER_COLUMNS].fillna(0)
+    df["Total_Chargers"] = df[CHARGER_COLUMNS].sum(axis=1)
+    df["Has_Level1"] = df["EV Level1 EVSE Num"] > 0
+    df["Has_Level2"] = df["EV Level2 EVSE Num"] > 0
+    df["Has_DC_Fast"] = df["EV DC Fast Count"] > 0
+    df["Connector_Mask"] = connector_mask(df["EV Connector Types"])
+    return df
+
+
+def load_snapshot(path: str, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    """Read (cached) and clean one station workbook."""
+    return clean_stations(read_workbook(path, cache_dir))
+
+
+def write_cleaned(df: pd.DataFrame, out_path: str, public_only: bool = False) -> str:
+    """Save the dashboard columns of a cleaned snapshot as CSV."""
+    if public_only:
+        df = df[df["Access Code"] == "public"]
+    df[CLEANED_COLUMNS].to_csv(out_path, index=False)
+    return out_path
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        sys.exit("usage: python -m evocharge.kaggle_stations DOWNLOAD_DIR [OUT_DIR]")
+    download_dir = args[0]
+    out_dir = args[1] if len(args) > 1 else "."
+    for label, name in WORKBOOKS.items():
+        df = load_snapshot(os.path.join(download_dir, name))
+        out = write_cleaned(df, os.path.join(out_dir, f"ev_charging_stations_{label}_cleaned.csv"))
+        print(f"Saved: {out} ({len(df)} stations)")
+        if label == "feb2024":
+            out = write_cleaned(df, os.path.join(out_dir, "ev_charging_stations_feb2024_public.csv"),
+                                public_only=True)
+            print(f"Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
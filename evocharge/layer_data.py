@@ -0,0 +1,77 @@
+"""
+Compact layer data for the pydeck map.
+
+pydeck ships a layer's DataFrame to the browser as JSON records, so every
+column - and every column name - is repeated for each row, and deck.gl's
+binary attributes (``use_binary_transport``) only reach the browser through
+the Jupyter widget, not through ``st.pydeck_chart``. ``pack_records`` gets as
+close to typed attribute arrays as that JSON allows:
+
+- only the attributes a layer draws (position, color, radius, label, weight)
+  plus a short hover name;
+- one-letter keys (``FIELDS``), so the layer accessors are ``"p"``, ``"c"``...;
+- coordinates rounded to ``POSITION_DECIMALS`` (about a meter), colors as one
+  uint8 ``[r, g, b, a]`` array, weights and radii rounded.
+
+Station details (address, port breakdown, availability...) are not shipped
+at all. Each record carries its station row as ``key`` and the dashboard looks
+the station up when its marker is picked (``st.pydeck_chart(on_select=...)``
+reports the picked object). Picks are resolved by that key rather than by
+their index in the layer data, which a later rerun with other filters may
+have reordered.
+"""
+
+import numpy as np
+
+POSITION_DECIMALS = 5
+
+# attribute -> record key (and deck.gl accessor)
+FIELDS = {"position": "p", "color": "c", "radius": "s", "label": "t", "name": "n", "weight": "w", "key": "k"}
+
+
+def pack_records(longitude, latitude, color=None, alpha: int = 255, radius=None, label=None,
+                 name=None, weight=None, key=None) -> list:
+    """JSON-ready records with only the given attributes.
+
+    ``color`` is an ``(n, 3)`` uint8 array (``alpha`` is appended);
+    ``radius`` / ``weight`` are numeric arrays; ``label`` / ``name`` anything
+    with string-like values (e.g. a categorical); ``key`` integer ids that
+    identify a picked record (see ``picked_index``).
+    """
+    position = np.round(np.column_stack([np.asarray(longitude, dtype=np.float64),
+                                         np.asarray(latitude, dtype=np.float64)]), POSITION_DECIMALS)
+    columns = {FIELDS["position"]: position.tolist()}
+    if color is not None:
+        color = np.asarray(color, dtype=np.uint8)
+        rgba = np.column_stack([color, np.full(len(color), alpha, dtype=np.uint8)])
+        columns[FIELDS["color"]] = rgba.tolist()
+    if radius is not None:
+        columns[FIELDS["radius"]] = np.round(np.asarray(radius, dtype=np.float64), 1).tolist()
+    if weight is not None:
+        columns[FIELDS["weight"]] = np.round(np.asarray(weight, dtype=np.float64), 3).tolist()
+    if key is not None:
+        columns[FIELDS["key"]] = np.asarray(key, dtype=np.int64).tolist()
+    for field, values in (("label", label), ("name", name)):
+        if values is not None:
+            columns[FIELDS[field]] = [str(v) for v in np.asarray(values, dtype=object)]
+
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def picked_index(selection, layer_id: str, keys):
+    """Position in the current layer data of the object picked in ``layer_id``, or None.
+
+    ``selection`` is the ``PydeckState.selection`` of a chart rendered with
+    ``on_select`` and ``keys`` the ``key`` column the layer records were packed
+    with. The pick is matched by key, so one left over from a differently
+    filtered map still means the same station, or nothing if that station is
+    no longer shown.
+    """
+    if not selection:
+        return None
+    objects = selection.get("objects", {}).get(layer_id) or []
+    if not objects or FIELDS["key"] not in objects[0]:
+        return None
+    hits = np.flatnonzero(np.asarray(keys) == objects[0][FIELDS["key"]])
+    return int(hits[0]) if len(hits) else None
@@ -0,0 +1,89 @@
+"""
+Precomputed render columns for the dashboard's station layers.
+
+Marker colors that depend only on the dataset are computed once per dataset
+by ``StationStyles`` (the dashboard keeps it in ``st.cache_resource``):
+
+- ``colors["capacity"]``: green (high) to red (low) capacity gradient,
+  normalized over the whole dataset so a station keeps its color under any
+  filter;
+- ``colors["network"]``: one palette entry per network, most common first.
+
+Colors are ``(n, 3)`` uint8 arrays. A filter is a positional index array at
+which the per-station arrays are gathered (``evocharge.layer_data`` packs
+them for pydeck) instead of copying the whole station table. Availability
+changes with the arrival time, so ``availability_colors`` is applied per
+rerun to the shown stations only, and cluster port labels are a categorical
+with one string per distinct count (``port_labels``).
+"""
+
+import numpy as np
+import pandas as pd
+
+NETWORK_PALETTE = np.array([
+    [46, 125, 50],    # Green
+    [33, 150, 243],   # Blue
+    [255, 152, 0],    # Orange
+    [156, 39, 176],   # Purple
+    [244, 67, 54],    # Red
+    [0, 150, 136],    # Teal
+    [121, 85, 72],    # Brown
+    [96, 125, 139],   # Blue Grey
+], dtype=np.uint8)
+OTHER_COLOR = np.array([100, 100, 100], dtype=np.uint8)
+
+
+def _gradient(values, blue: int, green_max: int = 255) -> np.ndarray:
+    """Red (0) to green (1) uint8 colors for values in [0, 1]."""
+    values = np.clip(np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0), 0.0, 1.0)
+    colors = np.empty((len(values), 3), dtype=np.uint8)
+    colors[:, 0] = (255 * (1 - values)).astype(np.uint8)
+    colors[:, 1] = (green_max * values).astype(np.uint8)
+    colors[:, 2] = blue
+    return colors
+
+
+def capacity_colors(capacity) -> np.ndarray:
+    """Capacity gradient, min-max normalized over ``capacity``."""
+    capacity = np.asarray(capacity, dtype=np.float64)
+    lo, hi = np.nanmin(capacity, initial=np.inf), np.nanmax(capacity, initial=-np.inf)
+    norm = (capacity - lo) / (hi - lo) if hi > lo else np.full(len(capacity), 0.5)
+    return _gradient(norm, blue=30)
+
+
+def availability_colors(availability) -> np.ndarray:
+    """Red (likely full) to green (likely a free port)."""
+    return _gradient(availability, blue=60, green_max=200)
+
+
+def network_colors(networks) -> np.ndarray:
+    """Palette color per station by network (most common network first)."""
+    networks = pd.Series(networks)
+    order = networks.value_counts().index
+    codes = pd.Categorical(networks, categories=order).codes
+    colors = NETWORK_PALETTE[np.maximum(codes, 0) % len(NETWORK_PALETTE)]
+    colors[codes < 0] = OTHER_COLOR
+    return colors
+
+
+def port_labels(ports) -> pd.Categorical:
+    """Port counts as label strings (formatted once per distinct count)."""
+    unique, inverse = np.unique(np.asarray(ports, dtype=np.int64), return_inverse=True)
+    return pd.Categorical.from_codes(inverse.ravel(), unique.astype(str))
+
+
+class StationStyles:
+    """Per-station render columns for one dataset."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.longitude = df["longitude"].to_numpy(dtype=np.float64)
+        self.latitude = df["latitude"].to_numpy(dtype=np.float64)
+        self.ports = df["total_ports"].to_numpy()
+        self.names = df["station_name"].to_numpy()
+        self.colors = {
+            "capacity": capacity_colors(df["capacity_proxy"]),
+            "network": network_colors(df["ev_network"]),
+        }
+
+    def __len__(self):
+        return len(self.longitude)
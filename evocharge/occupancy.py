@@ -0,0 +1,180 @@
+"""
+Per-station occupancy from charging session intervals.
+
+``OccupancyTimeline`` turns ``start_time`` / ``end_time`` intervals into:
+
+- an exact step function per station: start (+1) and end (-1) events are
+  sorted once by ``(station, time)`` and cumulatively summed. Each station's
+  events sum to zero, so one global ``cumsum`` gives every station's level.
+  ``occupancy_at`` is a ``searchsorted`` into the combined key;
+- a weekly profile: expected concurrent sessions per station for every
+  ``bin_minutes`` slot of the week (Monday 00:00 = slot 0), built with a
+  difference array over the slots and divided by how many times each slot
+  occurs in the observed window. ``expected_at`` is one array index, i.e.
+  constant time for any ``T``, past or future.
+
+Intervals are half-open ``[start, end)``. Building is a few sorts and
+bincounts over the event arrays, so millions of sessions are fine.
+
+Weekly profile of the bundled sample:
+    python -m evocharge.occupancy data/ev_charging_sessions/ev_charging_sessions.csv
+"""
+
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from evocharge.session_analytics import SESSIONS_CSV, TIME_FORMAT, Vocabulary
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+BIN_MINUTES = 5
+
+# 1970-01-01 was a Thursday; shifting by three days puts Monday 00:00 at slot 0
+_MONDAY_OFFSET = 3 * MINUTES_PER_DAY
+
+
+def to_minutes(values) -> np.ndarray:
+    """Timestamps (strings, datetimes, Timestamps) as int64 minutes since the epoch."""
+    ts = pd.to_datetime(pd.Series(np.atleast_1d(values)), errors="coerce")
+    if ts.dt.tz is not None:
+        ts = ts.dt.tz_localize(None)
+    return ts.to_numpy(dtype="datetime64[m]").astype(np.int64)
+
+
+def week_slot(minutes, bin_minutes: int = BIN_MINUTES) -> np.ndarray:
+    """Slot of the week (Monday 00:00 = 0) containing each epoch minute."""
+    return ((np.asarray(minutes) + _MONDAY_OFFSET) % MINUTES_PER_WEEK) // bin_minutes
+
+
+def weekly_counts(rows, start, end, n_rows: int, bin_minutes: int = BIN_MINUTES) -> np.ndarray:
+    """``[row, slot]``: how many intervals ``[start, end)`` cover each weekly slot start.
+
+    Difference array over the slots: +1 where an interval's first covered slot
+    starts, -1 after its last, wrapping past Sunday; whole weeks are added flat.
+    """
+    n_bins = MINUTES_PER_WEEK // bin_minutes
+    rows = np.asarray(rows, dtype=np.int64)
+    first = -((-(np.asarray(start) + _MONDAY_OFFSET)) // bin_minutes)   # ceil division
+    last = -((-(np.asarray(end) + _MONDAY_OFFSET)) // bin_minutes)
+    length = np.maximum(last - first, 0)
+    full_weeks, rem = np.divmod(length, n_bins)
+    a = first % n_bins
+    b = a + rem
+    wrap = b > n_bins
+
+    width = n_bins + 1
+    flat = np.concatenate([
+        rows * width + a,
+        rows * width + np.minimum(b, n_bins),
+        rows[wrap] * width,
+        rows[wrap] * width + (b[wrap] - n_bins),
+    ])
+    weights = np.concatenate([
+        np.ones(len(rows)), -np.ones(len(rows)), np.ones(wrap.sum()), -np.ones(wrap.sum()),
+    ])
+    diff = np.bincount(flat, weights=weights, minlength=n_rows * width).reshape(n_rows, width)
+    counts = np.cumsum(diff[:, :n_bins], axis=1)
+    counts += np.bincount(rows, weights=full_weeks, minlength=n_rows)[:, None]
+    return counts
+
+
+class OccupancyTimeline:
+    """Exact per-station occupancy plus an O(1) weekly expected-concurrency profile."""
+
+    def __init__(self, stations, start, end, bin_minutes: int = BIN_MINUTES):
+        """``stations`` are station ids; ``start`` / ``end`` epoch minutes (see ``to_minutes``)."""
+        start, end = np.asarray(start, dtype=np.int64), np.asarray(end, dtype=np.int64)
+        stations = np.asarray(stations, dtype=object)
+        valid = (end > start) & pd.notna(stations)
+        self.stations = Vocabulary()
+        codes = self.stations.encode(stations[valid])
+        start, end = start[valid], end[valid]
+        self.bin_minutes = bin_minutes
+        n = len(self.stations)
+
+        # Exact timeline: events sorted by (station, time); one global cumsum
+        self.t0 = int(start.min()) if len(start) else 0
+        self.t1 = int(end.max()) if len(end) else 0
+        self._stride = self.t1 - self.t0 + 1
+        times = np.concatenate([start, end]) - self.t0
+        event_codes = np.concatenate([codes, codes]).astype(np.int64)
+        deltas = np.concatenate([np.ones(len(start), np.int32), -np.ones(len(end), np.int32)])
+        keys = event_codes * self._stride + times
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._levels = np.cumsum(deltas[order])
+
+        # Weekly profile: coverage counts / occurrences of each slot in the window
+        counts = weekly_counts(codes, start, end, n, bin_minutes)
+        seen = weekly_counts([0], [self.t0], [self.t1], 1, bin_minutes)[0]
+        self.weeks_observed = seen
+        self.profile = (counts / np.maximum(seen, 1)).astype(np.float32)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, bin_minutes: int = BIN_MINUTES):
+        start = pd.to_datetime(df["start_time"], format=TIME_FORMAT, errors="coerce")
+        end = pd.to_datetime(df["end_time"], format=TIME_FORMAT, errors="coerce")
+        ok = (start.notna() & end.notna()).to_numpy()
+        return cls(df["station_id"].to_numpy()[ok], to_minutes(start[ok]), to_minutes(end[ok]),
+                   bin_minutes=bin_minutes)
+
+    @classmethod
+    def from_csv(cls, path: str = SESSIONS_CSV, bin_minutes: int = BIN_MINUTES):
+        df = pd.read_csv(path, usecols=["station_id", "start_time", "end_time"])
+        return cls.from_frame(df, bin_minutes=bin_minutes)
+
+    def _codes(self, stations) -> np.ndarray:
+        return self.stations.index.get_indexer(pd.Index(np.atleast_1d(stations), dtype=object))
+
+    def occupancy_at(self, stations, times) -> np.ndarray:
+        """Sessions actually in progress at each ``(station, time)`` pair (broadcast)."""
+        codes, minutes = np.broadcast_arrays(self._codes(stations), to_minutes(times))
+        offset = minutes - self.t0
+        inside = (codes >= 0) & (offset >= 0) & (offset < self._stride)
+        keys = codes.astype(np.int64) * self._stride + np.clip(offset, 0, self._stride - 1)
+        pos = np.searchsorted(self._keys, keys, side="right") - 1
+        same_station = (pos >= 0) & (self._keys[np.maximum(pos, 0)] // self._stride == codes)
+        return np.where(inside & same_station, self._levels[np.maximum(pos, 0)], 0)
+
+    def expected_at(self, stations, times) -> np.ndarray:
+        """Expected concurrent sessions for each ``(station, time)`` pair (broadcast).
+
+        Unknown stations get 0.
+        """
+        codes, minutes = np.broadcast_arrays(self._codes(stations), to_minutes(times))
+        values = self.profile[np.maximum(codes, 0), week_slot(minutes, self.bin_minutes)]
+        return np.where(codes >= 0, values, 0.0)
+
+    def series(self, station, start=None, end=None, freq: str = "15min") -> pd.Series:
+        """Exact occupancy of one station sampled on a regular grid."""
+        start = pd.Timestamp(start) if start is not None else pd.Timestamp(self.t0, unit="m")
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp(self.t1, unit="m")
+        grid = pd.date_range(start, end, freq=freq)
+        return pd.Series(self.occupancy_at(station, grid), index=grid, name=station)
+
+    def weekly_profile(self, station) -> pd.Series:
+        """Expected concurrency of one station per weekly slot."""
+        code = self._codes(station)[0]
+        if code < 0:
+            raise KeyError(f"unknown station: {station}")
+        slots = pd.timedelta_range(0, periods=self.profile.shape[1], freq=f"{self.bin_minutes}min")
+        return pd.Series(self.profile[code], index=pd.Index(slots, name="since_monday"), name=station)
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    timeline = OccupancyTimeline.from_csv(args[0] if args else SESSIONS_CSV)
+    busiest = timeline.profile.max(axis=1).argmax()
+    print(json.dumps({
+        "stations": len(timeline.stations),
+        "window": [str(pd.Timestamp(timeline.t0, unit="m")), str(pd.Timestamp(timeline.t1, unit="m"))],
+        "busiest_station": timeline.stations.index[busiest],
+        "peak_expected_concurrency": float(timeline.profile.max()),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Station opening hours compiled into weekly bitmaps.
+
+AFDC's ``access_days_time`` is free text ("24 hours daily",
+"Mon: 6:00am-11:59pm; Tue: ...", "8am-8:30pm M-F; 2 hour limit",
+"Dealership business hours"). ``parse_hours`` compiles one string into a
+168-bit weekly bitmap - bit ``h`` is hour ``h`` of the week, Monday 00:00 = 0
+as in ``evocharge.occupancy.week_slot`` - stored as ``HOURS_WORDS`` uint64
+words. Parsing is memoized, and ``compile_hours`` factorizes the column first,
+so the handful of distinct strings shared by thousands of stations is parsed
+once.
+
+An hour is open if the posted hours overlap any part of it. Text with no
+recognizable hours, or hours that only partly parse (a day list without
+times, day letters that cannot be placed), is ``None`` from ``parse_hours``
+and compiles to "always open", so an unreadable schedule never hides a
+station. ``open_at`` is then one
+shift-and-mask over the ``(stations, 3)`` word array for any arrival time.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from evocharge.occupancy import to_minutes, week_slot
+
+HOURS_PER_WEEK = 7 * 24
+HOURS_WORDS = 3  # ceil(168 / 64)
+HOURS_COLUMNS = [f"open_hours_{i}" for i in range(HOURS_WORDS)]
+HOURS_SOURCE = "access_days_time"
+
+_WORD_MASK = (1 << 64) - 1
+ALWAYS_OPEN = tuple(((1 << HOURS_PER_WEEK) - 1) >> (64 * i) & _WORD_MASK for i in range(HOURS_WORDS))
+
+# Day names and abbreviations -> weekday (Monday = 0); forms shorter than three
+# letters only count in ranges ("M-F"), before a colon ("MO: ...") or next to
+# a time ("7:30am-5pm F", "F 8am-5pm")
+_DAYS = {
+    "monday": 0, "mon": 0, "mo": 0, "m": 0,
+    "tuesday": 1, "tues": 1, "tue": 1, "tu": 1, "t": 1,
+    "wednesday": 2, "wed": 2, "we": 2, "w": 2,
+    "thursday": 3, "thurs": 3, "thur": 3, "thu": 3, "th": 3,
+    "friday": 4, "fri": 4, "fr": 4, "f": 4,
+    "saturday": 5, "sat": 5, "sa": 5,
+    "sunday": 6, "sun": 6, "su": 6,
+}
+_DAY = "|".join(sorted(_DAYS, key=len, reverse=True))
+_DAY_RE = re.compile(rf"\b({_DAY})\b(?:\s*(?:-|\u2013|\bthrough\b|\bthru\b|\bto\b)\s*\b({_DAY})\b)?")
+# What may sit between the days of a list ("Sat & Sun", "Mon, Wed and Fri")
+_DAY_LIST_GAP = re.compile(r"^\s*(?:,|&|/|\+|\band\b)?\s*$")
+_DAY_GROUPS = {
+    "daily": range(7), "everyday": range(7), "every day": range(7), "7 days": range(7),
+    "weekdays": range(5), "weekday": range(5), "weekends": (5, 6), "weekend": (5, 6),
+}
+_DAY_GROUP_RE = re.compile(r"\b(" + "|".join(_DAY_GROUPS) + r")\b")
+_NAMED_TIMES = [(re.compile(r"\b(?:12\s*)?noon\b"), "12:00pm"),
+                (re.compile(r"\b(?:12\s*)?midnight\b"), "12:00am")]
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?"
+_RANGE_RE = re.compile(_TIME + r"\s*(?:-|to)\s*" + _TIME)
+_ALL_DAY_RE = re.compile(r"\b(24\s*(?:hours|hrs|hr|/\s*7)|open 24|all day)\b")
+_CLOSED_RE = re.compile(r"\bclosed\b")
+_CLAUSES = re.compile(rf"[;|\n]+|,(?=\s*(?:\b(?:{_DAY}|daily|weekdays?|weekends?)\b|\d))")
+_TIME_BEFORE = re.compile(r"(?:\d|am|pm|a\.m\.|p\.m\.)\s*$")
+_TIME_AFTER = re.compile(r"^\s*(?::|\d)")
+
+
+def _normalize(text: str) -> str:
+    """Lower-cased text with "noon"/"midnight" spelled as clock times."""
+    text = text.lower()
+    for pattern, clock in _NAMED_TIMES:
+        text = pattern.sub(clock, text)
+    return text
+
+
+def _hour(h: str, m: str, meridiem) -> float:
+    hour = int(h) % 12 + (12 if meridiem.startswith("p") else 0) if meridiem else int(h)
+    return hour + (int(m) if m else 0) / 60
+
+
+def _time_range(match):
+    """``(start, end)`` in hours of the day; a missing start meridiem borrows the end's."""
+    h1, m1, mer1, h2, m2, mer2 = match.groups()
+    if not mer1 and mer2 and int(h2) <= 12:
+        mer1 = mer2
+        if _hour(h1, m1, mer1) > _hour(h2, m2, mer2) and mer2.startswith("p"):
+            mer1 = "am"  # "8-5pm"
+    start, end = _hour(h1, m1, mer1), _hour(h2, m2, mer2)
+    if end <= start:
+        end += 24  # past midnight into the next day
+    return start, end
+
+
+def _day_tokens(clause: str):
+    """``(days, unplaced)``: weekdays a clause names (None if none) and how many
+    day tokens could not be placed - short ones not in a range, before ":" or
+    next to a time, and days joined by words that are neither a range nor a
+    list ("Monday until Friday")."""
+    days = set()
+    unplaced = 0
+    for name in _DAY_GROUP_RE.findall(clause):
+        days.update(_DAY_GROUPS[name])
+    previous_end = None
+    for match in _DAY_RE.finditer(clause):
+        first, last = match.groups()
+        if not last:
+            if not (len(first) > 2 or _TIME_AFTER.match(clause[match.end():])
+                    or _TIME_BEFORE.search(clause[:match.start()])):
+                if first != "we" and clause[match.start() - 1:match.start()] != "'":
+                    unplaced += 1  # ("we" is the word far more often than Wednesday; "don't")
+                continue
+            days.add(_DAYS[first])
+        else:
+            a, b = _DAYS[first], _DAYS[last]
+            days.update((a + i) % 7 for i in range((b - a) % 7 + 1))
+        if previous_end is not None:
+            gap = clause[previous_end:match.start()]
+            if not re.search(r"\d", gap) and not _DAY_LIST_GAP.match(gap):
+                unplaced += 1
+        previous_end = match.end()
+    return days or None, unplaced
+
+
+def _days(clause: str):
+    """Weekdays a clause names, or None if it names none."""
+    return _day_tokens(clause)[0]
+
+
+def _spans(clause: str) -> list:
+    """``(start, end)`` hour-of-day spans named in a clause ("24 hours" = the whole day)."""
+    if _ALL_DAY_RE.search(clause):
+        return [(0.0, 24.0)]
+    # Bare number pairs ("1-2") are not times: need a meridiem or hh:mm on both ends
+    return [_time_range(m) for m in _RANGE_RE.finditer(clause) if m.group(6) or (m.group(2) and m.group(5))]
+
+
+def _week_hours(days, spans) -> set:
+    """Hours of the week covered by ``spans`` on ``days`` (None = every day)."""
+    hours = set()
+    for day in (range(7) if days is None else days):
+        for start, end in spans:
+            first, last = int(np.floor(start)), int(np.ceil(end))
+            hours.update((day * 24 + h) % HOURS_PER_WEEK for h in range(first, last))
+    return hours
+
+
+def _to_words(hours) -> tuple:
+    bits = 0
+    for hour in hours:
+        bits |= 1 << hour
+    return tuple(bits >> (64 * i) & _WORD_MASK for i in range(HOURS_WORDS))
+
+
+@lru_cache(maxsize=None)
+def parse_hours(text: str):
+    """Weekly bitmap of one hours string as ``HOURS_WORDS`` ints, or None if unrecognized.
+
+    Clauses are split on ``;``/``|`` and on commas before a day or time
+    ("7:30am-6pm M-Th, 7:30am-5pm F"). Each contributes its time ranges
+    ("24 hours" = all day, "noon"/"midnight" = 12pm/12am) on its days ("M-F",
+    "Monday through Friday"); a clause without days applies every day,
+    day-only clauses ("Mon, Wed, Fri 8am-5pm") take the times next to them,
+    and a ``closed`` clause removes its days. A schedule with a part that
+    cannot be placed is None rather than closed for that part.
+    """
+    hours = {}  # weekday -> hours of the week opening on that day
+    recognized = False
+    pending = set()  # days waiting for the times of a following clause
+    closed = set()
+    last_spans = None
+
+    def add(days, spans):
+        for day in (range(7) if days is None else days):
+            hours.setdefault(day, set()).update(_week_hours([day], spans))
+
+    for clause in _CLAUSES.split(_normalize(text)):
+        days, unplaced = _day_tokens(clause)
+        if _CLOSED_RE.search(clause):
+            recognized = recognized or days is not None
+            closed |= days or set()
+            pending = set()
+            continue
+        spans = _spans(clause)
+        if unplaced:
+            return None
+        if not spans:
+            if days is not None:
+                pending |= days
+            continue
+        if pending:
+            days = (days or set()) | pending
+            pending = set()
+        recognized = True
+        last_spans = spans
+        add(days, spans)
+    if pending:
+        # Trailing day list ("8am-5pm Mon, Wed"): the preceding times, else unknown
+        if last_spans is None:
+            return None
+        add(pending, last_spans)
+    if not recognized:
+        return None
+    # Closed days drop what clauses without days ("9am-5pm; closed Sunday") gave them
+    return _to_words(set().union(*(h for day, h in hours.items() if day not in closed)))
+
+
+def window_hours(text: str) -> np.ndarray:
+    """Hours of the week (bool[168]) a qualifier like "M-F 4pm-9pm" covers.
+
+    Missing days mean every day and missing times the whole day, so text
+    without either covers the full week.
+    """
+    text = _normalize(text)
+    covered = np.zeros(HOURS_PER_WEEK, dtype=bool)
+    covered[list(_week_hours(_days(text), _spans(text) or [(0.0, 24.0)]))] = True
+    return covered
+
+
+def compile_hours(values) -> np.ndarray:
+    """``(rows, HOURS_WORDS)`` uint64 weekly bitmaps (always open when missing or unrecognized)."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    table = [parse_hours(str(v)) or ALWAYS_OPEN for v in uniques] + [ALWAYS_OPEN]
+    return np.array(table, dtype=np.uint64).reshape(-1, HOURS_WORDS)[codes]
+
+
+def open_at(words, when) -> np.ndarray:
+    """Rows open at local wall-clock time ``when`` (a naive Timestamp)."""
+    hour = int(week_slot(to_minutes(when), 60)[0])
+    column = np.asarray(words)[:, hour // 64]
+    return ((column >> np.uint64(hour % 64)) & np.uint64(1)).astype(bool)
+
+
+def add_hours_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Set ``HOURS_COLUMNS`` from ``HOURS_SOURCE`` (always open if the column is absent; in place)."""
+    values = df[HOURS_SOURCE] if HOURS_SOURCE in df.columns else pd.Series([None] * len(df), dtype=object)
+    words = compile_hours(values)
+    for i, col in enumerate(HOURS_COLUMNS):
+        df[col] = words[:, i]
+    return df
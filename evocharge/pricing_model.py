@@ -0,0 +1,189 @@
+"""
+Vectorized charging-price estimates (DESIGN.md, "Cost Estimation Engine").
+
+    cost = kWh x base price (charger type) x network x access x facility
+               x location x time of day
+
+``PricingEngine`` precomputes, once per station table:
+
+- ``base``: stations x charger-type matrix of base $/kWh (NaN where the
+  station has no charger of that type);
+- ``station_factor``: product of the per-station modifiers (network premium,
+  public access, parking garage, and a location factor from the county
+  electricity rate relative to the state median);
+- ``tod``: a 24-entry time-of-day multiplier array (peak / off-peak).
+
+``cost(stations, kwh, hours)`` is then a gather and multiply over whole
+broadcast arrays of (station, kWh, start hour) scenarios, so thousands of
+what-ifs cost one numpy expression.
+
+Station tables in either naming convention work: the Kaggle / county-price
+export (``EV DC Fast Count``, ``electricity_rate_per_kwh``, ...) or the AFDC
+table used by the dashboard (``ev_dc_fast_num``, ``zip``, ...; county rates
+are then looked up from the ZIP).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from evocharge.zip_county import PROJECT_ROOT
+
+COUNTY_PRICES_CSV = os.path.join(PROJECT_ROOT, "data", "ca_county_prices",
+                                 "ev_charging_stations_county_prices.csv")
+
+# Midpoints of the DESIGN.md base price ranges ($/kWh), fastest first
+CHARGER_TYPES = ["dc_fast", "level2", "level1"]
+BASE_PRICE = {"dc_fast": 0.50, "level2": 0.25, "level1": 0.125}
+
+NETWORK_PREMIUM = 0.125
+PUBLIC_PREMIUM = 0.15
+PARKING_GARAGE_PREMIUM = 0.25
+PEAK_PREMIUM = 0.20
+OFF_PEAK_DISCOUNT = 0.10
+
+PEAK_HOURS = range(16, 21)
+OFF_PEAK_HOURS = list(range(0, 6)) + [22, 23]
+NON_NETWORKED = "non-networked"
+
+# column -> aliases in the other naming convention
+COLUMN_ALIASES = {
+    "dc_fast": ["EV DC Fast Count", "ev_dc_fast_num"],
+    "level2": ["EV Level2 EVSE Num", "ev_level2_evse_num"],
+    "level1": ["EV Level1 EVSE Num", "ev_level1_evse_num"],
+    "network": ["EV Network", "ev_network"],
+    "access": ["Access Code", "access_code"],
+    "facility": ["Facility Type", "facility_type"],
+    "rate": ["electricity_rate_per_kwh"],
+    "zip": ["ZIP", "zip", "zip_code"],
+}
+
+
+def _column(df: pd.DataFrame, name: str):
+    col = next((c for c in COLUMN_ALIASES[name] if c in df.columns), None)
+    return df[col] if col is not None else None
+
+
+def time_of_day_factors() -> np.ndarray:
+    """Multiplier per start hour (0-23)."""
+    tod = np.ones(24)
+    tod[list(PEAK_HOURS)] += PEAK_PREMIUM
+    tod[OFF_PEAK_HOURS] -= OFF_PEAK_DISCOUNT
+    return tod
+
+
+def county_rates(df: pd.DataFrame, state: str = "CA") -> pd.Series:
+    """County electricity $/kWh per station (from the table, else via ZIP -> county)."""
+    rates = _column(df, "rate")
+    if rates is not None:
+        return pd.to_numeric(rates, errors="coerce")
+    zips = _column(df, "zip")
+    if zips is None:
+        return pd.Series(np.nan, index=df.index)
+    from evocharge.enrichment import load_rates
+    from evocharge.zip_county import load_lookup
+
+    counties = pd.Series(load_lookup().lookup(zips, state=state), index=df.index)
+    return counties.map(load_rates()["rate_per_kwh"]).astype(float)
+
+
+def state_reference_rate() -> float:
+    """Median county electricity rate of the state (NaN without the rates CSV)."""
+    from evocharge.enrichment import RATES_CSV, load_rates
+
+    if not os.path.exists(RATES_CSV):
+        return np.nan
+    return float(load_rates()["rate_per_kwh"].median())
+
+
+def station_modifiers(df: pd.DataFrame, reference_rate: float = None) -> pd.DataFrame:
+    """Per-station modifier columns (all multiplicative, 1.0 = baseline)."""
+    out = pd.DataFrame(index=df.index)
+    no = pd.Series(False, index=df.index)
+
+    network = _column(df, "network")
+    networked = no if network is None else network.notna() & (network.astype(str).str.lower() != NON_NETWORKED)
+    out["network_factor"] = 1.0 + NETWORK_PREMIUM * networked
+
+    access = _column(df, "access")
+    public = ~no if access is None else access.eq("public")
+    out["access_factor"] = 1.0 + PUBLIC_PREMIUM * public
+
+    facility = _column(df, "facility")
+    garage = no if facility is None else facility.eq("PARKING_GARAGE")
+    out["facility_factor"] = 1.0 + PARKING_GARAGE_PREMIUM * garage
+
+    # Location: county electricity rate relative to the state median county rate
+    rate = county_rates(df)
+    if reference_rate is None:
+        reference_rate = state_reference_rate()
+    if pd.isna(reference_rate):
+        reference_rate = rate.median()
+    if pd.notna(reference_rate) and reference_rate > 0:
+        out["location_factor"] = (rate / reference_rate).fillna(1.0)
+    else:
+        out["location_factor"] = 1.0
+
+    out["station_factor"] = out.prod(axis=1)
+    return out
+
+
+class PricingEngine:
+    """Estimated $/kWh and session cost for arrays of (station, kWh, hour)."""
+
+    def __init__(self, stations: pd.DataFrame, reference_rate: float = None):
+        self.modifiers = station_modifiers(stations, reference_rate)
+        self.station_factor = self.modifiers["station_factor"].to_numpy()
+        self.tod = time_of_day_factors()
+
+        # stations x charger-type port counts
+        self.ports = np.column_stack([
+            pd.to_numeric(_column(stations, t), errors="coerce").fillna(0).to_numpy()
+            if _column(stations, t) is not None else np.zeros(len(stations))
+            for t in CHARGER_TYPES
+        ])
+        prices = np.array([BASE_PRICE[t] for t in CHARGER_TYPES])
+        self.base = np.where(self.ports > 0, prices, np.nan)
+        # Fastest charger the station has (stations without ports get Level 2 prices)
+        has_any = self.ports > 0
+        self.default_charger = np.where(has_any.any(axis=1), has_any.argmax(axis=1), CHARGER_TYPES.index("level2"))
+
+    @classmethod
+    def from_csv(cls, path: str = COUNTY_PRICES_CSV, **kwargs):
+        return cls(pd.read_csv(path, dtype={"ZIP": str, "zip_code": str}), **kwargs)
+
+    def _base_price(self, stations, charger):
+        if charger is None:
+            charger = self.default_charger[stations]
+        elif isinstance(charger, str):
+            charger = CHARGER_TYPES.index(charger)
+        return self.base[stations, charger]
+
+    def price_per_kwh(self, stations, hours, charger=None) -> np.ndarray:
+        """$/kWh for positional ``stations`` starting at ``hours`` (broadcast).
+
+        ``charger`` is a name from ``CHARGER_TYPES``, an array of their
+        indices, or None for each station's fastest type; NaN where the
+        station has no charger of the requested type.
+        """
+        stations, hours = np.broadcast_arrays(np.asarray(stations), np.asarray(hours))
+        base = self._base_price(stations, charger)
+        return base * self.station_factor[stations] * self.tod[hours % 24]
+
+    def cost(self, stations, kwh, hours, charger=None) -> np.ndarray:
+        """Session cost ($) for each (station, kWh, start hour) scenario (broadcast)."""
+        stations, kwh, hours = np.broadcast_arrays(np.asarray(stations), np.asarray(kwh, dtype=float),
+                                                   np.asarray(hours))
+        return kwh * self.price_per_kwh(stations, hours, charger)
+
+    def breakdown(self, station: int, hour: int, charger=None) -> dict:
+        """Base price and each modifier for one station, for display."""
+        row = self.modifiers.iloc[station]
+        base = float(self._base_price(np.asarray(station), charger))
+        return {
+            "base_price": base,
+            **{k: float(v) for k, v in row.items() if k != "station_factor"},
+            "time_of_day_factor": float(self.tod[hour % 24]),
+            "price_per_kwh": float(self.price_per_kwh(station, hour, charger)),
+        }
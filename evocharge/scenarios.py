@@ -0,0 +1,140 @@
+"""
+Scenario comparison over stations x arrival hours x charger types.
+
+``ScenarioComparator.compare`` evaluates the whole cartesian grid at once:
+
+- energy (kWh): the energy model is asked once per arrival hour (24 rows at
+  most), then capped by what each charger type can deliver in the session
+  (``CHARGER_POWER_KW`` x duration) - shape ``(H, C)``;
+- price and cost: ``PricingEngine`` gathers broadcast over ``(S, H, C)``;
+- posted cost: with a ``TariffTable``, the same grid priced from each
+  station's posted tariff (county electricity rate where none is readable);
+- availability: ``AvailabilityModel`` per hour and per station's port count
+  of that charger type, ``(H, S, C)`` transposed to ``(S, H, C)``.
+
+Scenarios a station cannot offer (no charger of that type) are dropped, and
+``pareto_front`` marks the options not beaten on both cost per kWh delivered
+(``price_per_kwh``, lower) and availability (higher) by any other option.
+Session cost is not the objective: it would favour the chargers that deliver
+the least energy in the session.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from evocharge.availability import arrival_time
+from evocharge.pricing_model import CHARGER_TYPES
+
+# Typical power per charger type (kW), caps the energy a session can take
+CHARGER_POWER_KW = {"dc_fast": 50.0, "level2": 7.2, "level1": 1.4}
+# Mean energy_kWh of the bundled sessions, used when no energy model is loaded
+DEFAULT_ENERGY_KWH = 41.9
+# Energy predictions kept per comparator (least recently used dropped first)
+ENERGY_CACHE_SIZE = 256
+
+
+def pareto_front(cost, availability) -> np.ndarray:
+    """Boolean mask of options no other option beats on both cost (lower, e.g.
+    $/kWh) and availability (higher); options with identical values share the verdict."""
+    points = np.column_stack([np.asarray(cost, dtype=float), np.asarray(availability, dtype=float)])
+    if len(points) == 0:
+        return np.zeros(0, dtype=bool)
+    unique, inverse = np.unique(points, axis=0, return_inverse=True)
+    # unique is sorted by cost, then availability: walking from the most
+    # available option of the cheapest cost upwards, a point is on the front
+    # iff it is more available than everything cheaper-or-equal before it
+    order = np.lexsort((-unique[:, 1], unique[:, 0]))
+    avail = unique[order, 1]
+    best_before = np.concatenate([[-np.inf], np.maximum.accumulate(avail)[:-1]])
+    on_front = np.zeros(len(unique), dtype=bool)
+    on_front[order] = avail > best_before
+    return on_front[inverse.ravel()]
+
+
+class ScenarioComparator:
+    """Station x hour x charger grids from the pricing, availability and energy models."""
+
+    def __init__(self, pricing, availability=None, predictor=None, tariffs=None):
+        self.pricing = pricing
+        self.availability = availability
+        self.predictor = predictor
+        self.tariffs = tariffs
+        self._energy_cache = OrderedDict()
+        # The comparator is shared across dashboard sessions (st.cache_resource)
+        self._energy_lock = threading.Lock()
+
+    def _hourly_energy(self, hours, duration_min, session_type, day) -> np.ndarray:
+        """Predicted kWh per arrival hour (one batched model call, memoized per date)."""
+        if self.predictor is None:
+            return np.full(len(hours), DEFAULT_ENERGY_KWH)
+        key = (tuple(hours), duration_min, session_type, day)
+        with self._energy_lock:
+            if key in self._energy_cache:
+                self._energy_cache.move_to_end(key)
+                return self._energy_cache[key]
+        rows = pd.DataFrame({
+            "duration_min": duration_min,
+            "session_type": session_type,
+            "start_time": [(day + pd.Timedelta(hours=int(h))).strftime("%Y-%m-%d %H:%M:%S") for h in hours],
+        })
+        # Predict outside the lock so one slow model call does not stall other sessions
+        energy = self.predictor.predict(rows)
+        with self._energy_lock:
+            self._energy_cache[key] = energy
+            self._energy_cache.move_to_end(key)
+            if len(self._energy_cache) > ENERGY_CACHE_SIZE:
+                self._energy_cache.popitem(last=False)
+        return energy
+
+    def compare(self, stations, hours=range(24), chargers=CHARGER_TYPES, duration_min: float = 60,
+                session_type: str = "Regular", day=None) -> pd.DataFrame:
+        """All feasible (station, hour, charger) options with energy, cost and availability.
+
+        ``pareto`` marks the trade-offs between cost per kWh and availability.
+
+        ``stations`` are positional indices into the pricing engine's station
+        table; ``day`` is the arrival date (default: today, San Diego time).
+        """
+        stations = np.asarray(stations)
+        hours = np.asarray(list(hours))
+        charger_idx = np.array([CHARGER_TYPES.index(c) for c in chargers])
+        day = (arrival_time(0) if day is None else pd.Timestamp(day)).normalize()
+
+        # (H, C) energy: model per hour, capped by charger power over the session
+        power = np.array([CHARGER_POWER_KW[c] for c in chargers])
+        energy = np.minimum(self._hourly_energy(hours, duration_min, session_type, day)[:, None],
+                            power[None, :] * duration_min / 60.0)
+
+        # (S, H, C) price and cost
+        s, h, c = stations[:, None, None], hours[None, :, None], charger_idx[None, None, :]
+        price = self.pricing.price_per_kwh(s, h, c)
+        cost = price * energy[None, :, :]
+
+        # (S, H, C) availability for the ports of each charger type
+        ports = self.pricing.ports[stations][:, charger_idx]
+        if self.availability is not None:
+            times = day + pd.to_timedelta(hours, unit="h")
+            available = self.availability.predict(ports, times).transpose(1, 0, 2)
+        else:
+            available = np.broadcast_to((ports > 0).astype(float)[:, None, :], price.shape)
+
+        feasible = ~np.isnan(price)
+        si, hi, ci = np.nonzero(feasible)
+        result = pd.DataFrame({
+            "station": stations[si],
+            "hour": hours[hi],
+            "charger": np.asarray(chargers, dtype=object)[ci],
+            "energy_kWh": energy[hi, ci],
+            "price_per_kwh": price[feasible],
+            "cost": cost[feasible],
+            "availability": available[feasible],
+        })
+        if self.tariffs is not None:
+            # Posted prices for the same sessions, at the arrival hour of the week
+            posted = self.tariffs.cost(s, energy[None, :, :], duration_min, day.dayofweek * 24 + h)
+            result["posted_cost"] = np.broadcast_to(posted, price.shape)[feasible]
+        result["pareto"] = pareto_front(result["price_per_kwh"].to_numpy(), result["availability"].to_numpy())
+        return result
@@ -0,0 +1,238 @@
+"""
+Pre-aggregated session cubes over ``ev_charging_sessions.csv``.
+
+``SessionAnalytics`` parses ``start_time`` once, stores station / user /
+session type as integer codes and accumulates with ``np.bincount`` into:
+
+- a station x hour-of-day x day-type cube of session count, total kWh and
+  total duration (mean duration = total / count);
+- per-user count, kWh, duration and a user x session-type count matrix.
+
+Panels then answer "sessions at S091 on weekend evenings" or "a user's
+preferred session type" by indexing the cubes instead of grouping raw
+sessions. Input is consumed in chunks (``from_csv(..., chunksize=...)``) and
+the code vocabularies grow as new ids appear, so memory depends on the number
+of stations and users, not sessions; the same code handles the 3,500-session
+sample and tens of millions of rows.
+
+Print the summary of the bundled sample:
+    python -m evocharge.session_analytics data/ev_charging_sessions/ev_charging_sessions.csv
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from evocharge.zip_county import PROJECT_ROOT
+
+SESSIONS_CSV = os.path.join(PROJECT_ROOT, "data", "ev_charging_sessions", "ev_charging_sessions.csv")
+CHUNK_SIZE = 1000000
+
+HOURS = 24
+DAY_TYPES = ["Weekday", "Weekend"]
+SESSION_COLUMNS = ["user_id", "station_id", "start_time", "duration_min", "energy_kWh",
+                   "session_day", "session_type"]
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class Vocabulary:
+    """Stable string -> integer code mapping that grows across chunks."""
+
+    def __init__(self, values=()):
+        self.index = pd.Index(list(values), dtype=object)
+
+    def __len__(self):
+        return len(self.index)
+
+    def encode(self, values) -> np.ndarray:
+        """Codes for ``values`` (-1 where missing); unseen values are appended to the vocabulary."""
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        known = self.index.get_indexer(uniques)
+        new = known < 0
+        if new.any():
+            known[new] = np.arange(len(self.index), len(self.index) + new.sum())
+            self.index = self.index.append(pd.Index(uniques[new], dtype=object))
+        return np.where(codes >= 0, known[codes], -1).astype(np.int32)
+
+    def code(self, value) -> int:
+        """Code of one value, or -1 if it was never seen."""
+        return int(self.index.get_indexer([value])[0])
+
+
+def _grow(arr: np.ndarray, n: int) -> np.ndarray:
+    """Zero-pad ``arr`` along its first axis to length ``n``."""
+    if arr.shape[0] >= n:
+        return arr
+    pad = np.zeros((n - arr.shape[0],) + arr.shape[1:], dtype=arr.dtype)
+    return np.concatenate([arr, pad])
+
+
+def _day_type_codes(chunk: pd.DataFrame, start: pd.Series) -> np.ndarray:
+    if "session_day" in chunk.columns:
+        codes = pd.Index(DAY_TYPES).get_indexer(chunk["session_day"])
+        if (codes >= 0).all():
+            return codes
+    return (start.dt.dayofweek >= 5).to_numpy().astype(np.int64)
+
+
+class SessionAnalytics:
+    """Station x hour x day-type cubes plus per-user aggregates."""
+
+    def __init__(self):
+        self.stations = Vocabulary()
+        self.users = Vocabulary()
+        self.session_types = Vocabulary()
+        self.n_sessions = 0
+        self.count = np.zeros((0, HOURS, len(DAY_TYPES)), dtype=np.int64)
+        self.energy = np.zeros((0, HOURS, len(DAY_TYPES)))
+        self.duration = np.zeros((0, HOURS, len(DAY_TYPES)))
+        self.user_count = np.zeros(0, dtype=np.int64)
+        self.user_energy = np.zeros(0)
+        self.user_duration = np.zeros(0)
+        self.user_types = np.zeros((0, 0), dtype=np.int64)
+
+    # -- building -----------------------------------------------------------
+
+    def update(self, chunk: pd.DataFrame):
+        """Fold a chunk of raw sessions into the cubes."""
+        if chunk.empty:
+            return self
+        start = pd.to_datetime(chunk["start_time"], format=TIME_FORMAT, errors="coerce")
+        # Sessions without a start time or an id are left out rather than filed under another id
+        ok = (start.notna() & chunk[["station_id", "user_id", "session_type"]].notna().all(axis=1)).to_numpy()
+        chunk, start = chunk.loc[ok], start[ok]
+
+        station = self.stations.encode(chunk["station_id"])
+        user = self.users.encode(chunk["user_id"])
+        stype = self.session_types.encode(chunk["session_type"])
+        hour = start.dt.hour.to_numpy()
+        day = _day_type_codes(chunk, start)
+        kwh = pd.to_numeric(chunk["energy_kWh"], errors="coerce").fillna(0).to_numpy()
+        minutes = pd.to_numeric(chunk["duration_min"], errors="coerce").fillna(0).to_numpy()
+
+        n_st, n_us, n_ty = len(self.stations), len(self.users), len(self.session_types)
+        self.count, self.energy, self.duration = (
+            _grow(a, n_st) for a in (self.count, self.energy, self.duration))
+        self.user_count, self.user_energy, self.user_duration = (
+            _grow(a, n_us) for a in (self.user_count, self.user_energy, self.user_duration))
+        self.user_types = _grow(self.user_types, n_us)
+        if self.user_types.shape[1] < n_ty:
+            self.user_types = _grow(self.user_types.T, n_ty).T.copy()
+
+        cell = (station * HOURS + hour) * len(DAY_TYPES) + day
+        size = n_st * HOURS * len(DAY_TYPES)
+        self.count += np.bincount(cell, minlength=size).reshape(self.count.shape)
+        self.energy += np.bincount(cell, weights=kwh, minlength=size).reshape(self.energy.shape)
+        self.duration += np.bincount(cell, weights=minutes, minlength=size).reshape(self.duration.shape)
+
+        self.user_count += np.bincount(user, minlength=n_us)
+        self.user_energy += np.bincount(user, weights=kwh, minlength=n_us)
+        self.user_duration += np.bincount(user, weights=minutes, minlength=n_us)
+        self.user_types += np.bincount(user * n_ty + stype, minlength=n_us * n_ty).reshape(n_us, n_ty)
+
+        self.n_sessions += len(chunk)
+        return self
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame):
+        return cls().update(df)
+
+    @classmethod
+    def from_csv(cls, path: str = SESSIONS_CSV, chunksize: int = CHUNK_SIZE):
+        """Build the cubes from a sessions CSV, ``chunksize`` rows at a time."""
+        analytics = cls()
+        for chunk in pd.read_csv(path, usecols=SESSION_COLUMNS, chunksize=chunksize):
+            analytics.update(chunk)
+        return analytics
+
+    # -- queries ------------------------------------------------------------
+
+    def _slice(self, station=None, day_type=None):
+        axes = [slice(None), slice(None), slice(None)]
+        if station is not None:
+            axes[0] = self.stations.code(station)
+            if axes[0] < 0:
+                raise KeyError(f"unknown station: {station}")
+        if day_type is not None:
+            axes[2] = DAY_TYPES.index(day_type)
+        return tuple(axes)
+
+    def cell(self, station, hour: int, day_type: str) -> dict:
+        """Count, total kWh and mean duration of one cube cell."""
+        s, _, d = self._slice(station, day_type)
+        n = int(self.count[s, hour, d])
+        return {
+            "sessions": n,
+            "energy_kWh": float(self.energy[s, hour, d]),
+            "mean_duration_min": float(self.duration[s, hour, d] / n) if n else float("nan"),
+        }
+
+    def hourly(self, station=None, day_type=None) -> pd.DataFrame:
+        """Sessions, kWh and mean duration per hour of day (optionally one station / day type)."""
+        s, _, d = self._slice(station, day_type)
+
+        def total(cube):
+            sub = cube[s, :, d]
+            if day_type is None:
+                sub = sub.sum(axis=-1)
+            return sub if station is not None else sub.sum(axis=0)
+
+        count, energy, duration = total(self.count), total(self.energy), total(self.duration)
+        return self._frame(pd.RangeIndex(HOURS, name="hour"), count, energy, duration)
+
+    def by_station(self, day_type=None) -> pd.DataFrame:
+        """Per-station totals, optionally for one day type."""
+        d = slice(None) if day_type is None else DAY_TYPES.index(day_type)
+        count = self.count[:, :, d].reshape(len(self.stations), -1).sum(axis=1)
+        energy = self.energy[:, :, d].reshape(len(self.stations), -1).sum(axis=1)
+        duration = self.duration[:, :, d].reshape(len(self.stations), -1).sum(axis=1)
+        index = pd.Index(self.stations.index, name="station_id")
+        return self._frame(index, count, energy, duration)
+
+    def by_user(self) -> pd.DataFrame:
+        """Per-user totals and preferred session type."""
+        index = pd.Index(self.users.index, name="user_id")
+        df = self._frame(index, self.user_count, self.user_energy, self.user_duration)
+        if len(self.session_types):
+            df["preferred_session_type"] = self.session_types.index[self.user_types.argmax(axis=1)]
+        return df
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long-form cube: one row per non-empty station / hour / day-type cell."""
+        s, h, d = np.nonzero(self.count)
+        df = self._frame(pd.RangeIndex(len(s)), self.count[s, h, d], self.energy[s, h, d],
+                         self.duration[s, h, d])
+        df.insert(0, "station_id", self.stations.index[s])
+        df.insert(1, "hour", h)
+        df.insert(2, "session_day", np.asarray(DAY_TYPES, dtype=object)[d])
+        return df
+
+    @staticmethod
+    def _frame(index, count, energy, duration) -> pd.DataFrame:
+        count = np.asarray(count)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_duration = np.where(count > 0, duration / np.maximum(count, 1), np.nan)
+        return pd.DataFrame({
+            "sessions": count,
+            "energy_kWh": energy,
+            "mean_duration_min": mean_duration,
+        }, index=index)
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    analytics = SessionAnalytics.from_csv(args[0] if args else SESSIONS_CSV)
+    busiest = analytics.hourly()["sessions"].idxmax()
+    print(json.dumps({
+        "sessions": analytics.n_sessions,
+        "stations": len(analytics.stations),
+        "users": len(analytics.users),
+        "busiest_hour": int(busiest),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Diff two station snapshots: added, removed and modified stations.
+
+Stations are matched on a key column: the station ``id`` when both snapshots
+carry one (AFDC pulls), otherwise a normalized ``name|address|zip5`` key
+(the Kaggle workbooks have no ids). Matching is a hash join on the key index
+(``Index.get_indexer``) and the value comparison is column-at-a-time, so two
+60K-row snapshots diff in a fraction of a second.
+
+Both column conventions are understood (``station_name`` / ``Station Name``,
+``ev_dc_fast_num`` / ``EV DC Fast Count``, ...); only columns present in both
+snapshots are compared.
+
+Diff two cleaned Kaggle snapshots:
+    python -m evocharge.snapshot_diff \\
+        data/ev_charging_stations/ev_charging_stations_jan2023_cleaned.csv \\
+        data/ev_charging_stations/ev_charging_stations_feb2024_cleaned.csv
+"""
+
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from evocharge.zip_county import parse_zip5
+
+ID_COLUMNS = ["id", "ID"]
+NAME_COLUMNS = ["station_name", "Station Name"]
+ADDRESS_COLUMNS = ["street_address", "Street Address"]
+ZIP_COLUMNS = ["zip", "ZIP", "zip_code"]
+
+# Fields whose changes matter when comparing snapshots (either naming convention)
+DEFAULT_COMPARE = [
+    "station_name", "Station Name", "ev_network", "EV Network",
+    "ev_level1_evse_num", "EV Level1 EVSE Num", "ev_level2_evse_num", "EV Level2 EVSE Num",
+    "ev_dc_fast_num", "EV DC Fast Count", "ev_connector_types", "EV Connector Types",
+    "access_code", "Access Code", "facility_type", "Facility Type", "ev_pricing", "access_days_time",
+    "latitude", "longitude",
+]
+
+
+def _first_present(df: pd.DataFrame, candidates):
+    return next((c for c in candidates if c in df.columns), None)
+
+
+# ASCII punctuation -> space; whitespace runs are collapsed by split/join
+_PUNCT_TO_SPACE = str.maketrans({c: " " for c in map(chr, range(128)) if not c.isalnum()})
+
+
+def _normalize_text(values: pd.Series) -> list:
+    # One Python pass per value beats chaining .str methods (each its own pass)
+    table = _PUNCT_TO_SPACE
+    return [" ".join(v.lower().translate(table).split()) if isinstance(v, str) else "" for v in values.tolist()]
+
+
+def has_ids(df: pd.DataFrame) -> bool:
+    """True if every station in ``df`` carries an id."""
+    id_col = _first_present(df, ID_COLUMNS)
+    return id_col is not None and bool(df[id_col].notna().all())
+
+
+def station_keys(df: pd.DataFrame, use_id: bool = True) -> pd.Series:
+    """Match key per station: the id, or ``name|address|zip5`` when there is none."""
+    if use_id and has_ids(df):
+        ids = df[_first_present(df, ID_COLUMNS)]
+        # Numeric ids read as int64 in one snapshot and float64 in another must still match
+        numeric = pd.to_numeric(ids, errors="coerce")
+        if numeric.notna().all() and (numeric % 1 == 0).all():
+            ids = numeric.astype("Int64")
+        return ids.astype(str).rename("key")
+
+    name_col = _first_present(df, NAME_COLUMNS)
+    addr_col = _first_present(df, ADDRESS_COLUMNS)
+    zip_col = _first_present(df, ZIP_COLUMNS)
+    if name_col is None:
+        raise KeyError("snapshot has neither an id nor a station name column")
+
+    parts = [_normalize_text(df[name_col])]
+    if addr_col is not None:
+        parts.append(_normalize_text(df[addr_col]))
+    if zip_col is not None:
+        parts.append([f"{z:05d}" for z in np.maximum(parse_zip5(df[zip_col]), 0).tolist()])
+    return pd.Series(["|".join(p) for p in zip(*parts)], index=df.index, dtype=object, name="key")
+
+
+def _differs(old: pd.Series, new: pd.Series) -> np.ndarray:
+    """Element-wise "value changed", treating NaN == NaN and 2 == 2.0 as equal."""
+    if old.dtype.kind in "biuf" and new.dtype.kind in "biuf":
+        a, b = old.to_numpy(dtype=float), new.to_numpy(dtype=float)
+        return ~((a == b) | (np.isnan(a) & np.isnan(b)))
+    a, b = old.astype("string"), new.astype("string")
+    both_na = (a.isna() & b.isna()).to_numpy()
+    return ~(both_na | (a == b).fillna(False).to_numpy())
+
+
+class SnapshotDiff:
+    """Result of ``diff_snapshots``.
+
+    - ``added`` / ``removed``: station rows only in the new / old snapshot;
+    - ``modified``: matched stations with at least one compared column
+      changed, with ``key``, ``changed_columns`` (comma-joined) and
+      ``old_<col>`` / ``new_<col>`` for each changed column;
+    - ``changed``: boolean DataFrame (matched stations x compared columns).
+    """
+
+    def __init__(self, added, removed, modified, changed, key_type, duplicates):
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+        self.changed = changed
+        self.key_type = key_type
+        self.duplicates = duplicates
+
+    def summary(self) -> dict:
+        counts = self.changed.sum()
+        return {
+            "key": self.key_type,
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "modified": len(self.modified),
+            "unchanged": int((~self.changed.any(axis=1)).sum()),
+            "duplicate_keys": self.duplicates,
+            "changed_columns": {c: int(n) for c, n in counts.items() if n},
+        }
+
+
+def diff_snapshots(old: pd.DataFrame, new: pd.DataFrame, compare=None, use_id: bool = True) -> SnapshotDiff:
+    """Hash-join ``old`` and ``new`` on the station key and compare ``compare`` columns.
+
+    Duplicate keys within a snapshot keep their last row (their number is
+    reported in ``duplicates``).
+    """
+    # Both sides must use the same key kind; missing ids on either side fall back
+    use_id = use_id and has_ids(old) and has_ids(new)
+    key_type = "id" if use_id else "name_address_zip"
+    old_keys = station_keys(old, use_id)
+    new_keys = station_keys(new, use_id)
+
+    old_dup = old_keys.duplicated(keep="last").to_numpy()
+    new_dup = new_keys.duplicated(keep="last").to_numpy()
+    old, old_keys = old.loc[~old_dup], old_keys[~old_dup]
+    new, new_keys = new.loc[~new_dup], new_keys[~new_dup]
+
+    old_index = pd.Index(old_keys)
+    pos = old_index.get_indexer(new_keys)          # new row -> old row (-1 if added)
+    matched_new = pos >= 0
+    in_new = np.zeros(len(old_index), dtype=bool)
+    in_new[pos[matched_new]] = True
+
+    added = new.loc[~matched_new].assign(key=new_keys[~matched_new].to_numpy())
+    removed = old.loc[~in_new].assign(key=old_keys[~in_new].to_numpy())
+
+    columns = [c for c in (compare or DEFAULT_COMPARE) if c in old.columns and c in new.columns]
+    old_m = old.iloc[pos[matched_new]].reset_index(drop=True)
+    new_m = new.loc[matched_new].reset_index(drop=True)
+    keys_m = new_keys[matched_new].to_numpy()
+    changed = pd.DataFrame({c: _differs(old_m[c], new_m[c]) for c in columns}, index=keys_m,
+                           columns=columns, dtype=bool)
+
+    rows = changed.any(axis=1).to_numpy()
+    modified = pd.DataFrame({"key": keys_m[rows]})
+    if rows.any():
+        sub = changed.loc[rows]
+        modified["changed_columns"] = [",".join(np.asarray(columns)[r]) for r in sub.to_numpy()]
+        for c in columns:
+            if sub[c].any():
+                modified["old_" + c] = old_m.loc[rows, c].to_numpy()
+                modified["new_" + c] = new_m.loc[rows, c].to_numpy()
+    else:
+        modified["changed_columns"] = pd.Series(dtype=object)
+
+    duplicates = int(old_dup.sum() + new_dup.sum())
+    return SnapshotDiff(added.reset_index(drop=True), removed.reset_index(drop=True),
+                        modified, changed, key_type, duplicates)
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2:
+        sys.exit("usage: python -m evocharge.snapshot_diff OLD.csv NEW.csv")
+    old, new = (pd.read_csv(path, dtype={"ZIP": str, "zip": str}) for path in args)
+    print(json.dumps(diff_snapshots(old, new).summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Grid spatial index over station coordinates.
+
+Stations are bucketed into a uniform latitude/longitude grid and stored in
+cell order (CSR-style), so a bounding box touches one contiguous slice of the
+sorted cell ids per grid row. Radius and k-nearest queries narrow the
+candidates with a bounding box first and then apply the exact haversine
+distance. Query results are positional row indices into the frame the index
+was built from.
+
+Build the index once per station snapshot and reuse it across reruns.
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+
+# Web-mercator tile size used by deck.gl / Mapbox
+TILE_SIZE_PX = 256
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km (vectorized over numpy arrays)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2.0) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2)
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def radius_bounds(lat: float, lon: float, radius_km: float):
+    """Bounding box (south, west, north, east) that contains a circle."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    cos_lat = max(math.cos(math.radians(min(abs(lat) + dlat, 89.9))), 1e-6)
+    dlon = min(radius_km / (KM_PER_DEG_LAT * cos_lat), 180.0)
+    return lat - dlat, lon - dlon, lat + dlat, lon + dlon
+
+
+def viewport_bounds(lat: float, lon: float, zoom: float,
+                    width_px: int = 1200, height_px: int = 700, padding: float = 1.0):
+    """Approximate (south, west, north, east) visible in a deck.gl view.
+
+    ``padding`` scales the box around its center, e.g. 2.0 keeps a margin of
+    half a viewport on every side so small pans still show stations.
+    """
+    deg_per_px = 360.0 / (TILE_SIZE_PX * 2.0 ** zoom)
+    half_lon = width_px * deg_per_px * padding / 2.0
+    half_lat = height_px * deg_per_px * math.cos(math.radians(lat)) * padding / 2.0
+    return lat - half_lat, lon - half_lon, lat + half_lat, lon + half_lon
+
+
+class StationGridIndex:
+    """Uniform grid index answering bbox, radius and k-nearest queries."""
+
+    def __init__(self, latitude, longitude, cell_deg: float = 0.05):
+        self.lat = np.asarray(latitude, dtype=np.float64)
+        self.lon = np.asarray(longitude, dtype=np.float64)
+        self.cell_deg = float(cell_deg)
+
+        if len(self.lat):
+            self.lat0, self.lon0 = float(self.lat.min()), float(self.lon.min())
+            lat1, lon1 = float(self.lat.max()), float(self.lon.max())
+        else:
+            self.lat0 = self.lon0 = lat1 = lon1 = 0.0
+        self.n_rows = int((lat1 - self.lat0) // self.cell_deg) + 1
+        self.n_cols = int((lon1 - self.lon0) // self.cell_deg) + 1
+
+        rows, cols = self._cell(self.lat, self.lon)
+        cell_id = rows * self.n_cols + cols
+        self._order = np.argsort(cell_id, kind="stable")
+        self._sorted_ids = cell_id[self._order]
+        # Coordinates in cell order keep the exact filter cache friendly
+        self._lat_sorted = self.lat[self._order]
+        self._lon_sorted = self.lon[self._order]
+
+    @classmethod
+    def from_frame(cls, df, cell_deg: float = 0.05):
+        """Build an index from a frame with ``latitude``/``longitude`` columns."""
+        return cls(df["latitude"].to_numpy(), df["longitude"].to_numpy(), cell_deg=cell_deg)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _cell(self, lat, lon):
+        rows = np.floor((lat - self.lat0) / self.cell_deg).astype(np.int64)
+        cols = np.floor((lon - self.lon0) / self.cell_deg).astype(np.int64)
+        return rows, cols
+
+    def _candidates(self, south, west, north, east):
+        """Sorted-order slots of all stations in cells touching the box."""
+        (r0, r1), (c0, c1) = self._cell(np.array([south, north]), np.array([west, east]))
+        r0, r1 = max(int(r0), 0), min(int(r1), self.n_rows - 1)
+        c0, c1 = max(int(c0), 0), min(int(c1), self.n_cols - 1)
+        if r0 > r1 or c0 > c1:
+            return np.empty(0, dtype=np.int64)
+
+        rows = np.arange(r0, r1 + 1, dtype=np.int64)
+        starts = np.searchsorted(self._sorted_ids, rows * self.n_cols + c0, side="left")
+        ends = np.searchsorted(self._sorted_ids, rows * self.n_cols + c1, side="right")
+        lengths = ends - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Concatenate the per-row [start, end) ranges without a Python loop
+        nonempty = lengths > 0
+        starts, lengths = starts[nonempty], lengths[nonempty]
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return np.arange(total, dtype=np.int64) + offsets
+
+    def bbox(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Positional indices of stations inside the bounding box."""
+        slots = self._candidates(south, west, north, east)
+        lat, lon = self._lat_sorted[slots], self._lon_sorted[slots]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return self._order[slots[inside]]
+
+    def within_radius(self, lat: float, lon: float, radius_km: float,
+                      return_distances: bool = False):
+        """Positional indices of stations within ``radius_km``, nearest first."""
+        slots = self._candidates(*radius_bounds(lat, lon, radius_km))
+        dist = haversine_km(lat, lon, self._lat_sorted[slots], self._lon_sorted[slots])
+        keep = dist <= radius_km
+        slots, dist = slots[keep], dist[keep]
+        by_dist = np.argsort(dist, kind="stable")
+        idx = self._order[slots[by_dist]]
+        if return_distances:
+            return idx, dist[by_dist]
+        return idx
+
+    def nearest(self, lat: float, lon: float, k: int = 10, return_distances: bool = False):
+        """Positional indices of the ``k`` nearest stations, nearest first."""
+        k = min(int(k), len(self))
+        if k <= 0:
+            empty = np.empty(0, dtype=np.int64)
+            return (empty, np.empty(0)) if return_distances else empty
+
+        radius = self.cell_deg * KM_PER_DEG_LAT
+        while True:
+            slots = self._candidates(*radius_bounds(lat, lon, radius))
+            if len(slots) >= k:
+                dist = haversine_km(lat, lon, self._lat_sorted[slots], self._lon_sorted[slots])
+                kth = float(np.partition(dist, k - 1)[k - 1])
+                # The box contains the full circle of ``radius``, so the k best
+                # candidates are exact once the kth distance fits inside it.
+                if kth <= radius:
+                    best = np.argpartition(dist, k - 1)[:k]
+                    best = best[np.argsort(dist[best], kind="stable")]
+                    idx = self._order[slots[best]]
+                    return (idx, dist[best]) if return_distances else idx
+                radius = kth
+            else:
+                radius *= 2.0
@@ -0,0 +1,182 @@
+"""
+Columnar station snapshots for the dashboard.
+
+Parsing the station CSVs and recomputing the derived columns on every cache
+miss dominates dashboard cold start once the national station set is used.
+``build_snapshot`` does that work once and writes an uncompressed Arrow IPC
+file next to the CSV; ``load_station_frame`` memory-maps the snapshot and only
+falls back to parsing the CSV when no up-to-date snapshot exists.
+
+Build snapshots for the AFDC exports:
+    python -m evocharge.station_store data/afdc/afdc_stations_top50.csv data/afdc/afdc_stations_raw.csv
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+from evocharge.afdc_ingest import compute_capacity_proxy
+from evocharge.connectors import MASK_COLUMN, add_connector_mask
+from evocharge.opening_hours import HOURS_COLUMNS, add_hours_columns
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; the CSV fallback still works
+    pa = None
+
+SNAPSHOT_EXT = ".arrow"
+
+REQUIRED_COLUMNS = ["latitude", "longitude", "station_name", "ev_network",
+                    "ev_dc_fast_num", "ev_level2_evse_num"]
+PORT_COLUMNS = ["ev_dc_fast_num", "ev_level2_evse_num"]
+# Low-cardinality text stored as categoricals, counts as the smallest integer type
+CATEGORY_COLUMNS = ["ev_network", "city", "state", "access_code", "facility_type"]
+SMALL_INT_COLUMNS = PORT_COLUMNS + ["total_ports"]
+
+
+def prepare_stations(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce dtypes and add the derived columns the dashboard relies on."""
+    df = df.copy()
+
+    # Ensure required columns exist
+    for col in REQUIRED_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+
+    # Convert numeric columns safely
+    for col in PORT_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+
+    # Calculate capacity proxy if not present
+    if "capacity_proxy" not in df.columns:
+        df["capacity_proxy"] = compute_capacity_proxy(df)
+
+    # Remove rows without coordinates
+    df = df.dropna(subset=["latitude", "longitude"]).reset_index(drop=True)
+
+    df["total_ports"] = df["ev_dc_fast_num"] + df["ev_level2_evse_num"]
+    df["has_dc_fast"] = df["ev_dc_fast_num"] > 0
+    return add_hours_columns(add_connector_mask(df))
+
+
+def compact_stations(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorical text columns and downcast port counts (sums stay in ``total_ports``)."""
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORY_COLUMNS:
+            values = values.astype("category")
+        elif col in SMALL_INT_COLUMNS:
+            values = pd.to_numeric(values, downcast="integer")
+        columns[col] = values
+    return pd.DataFrame(columns)
+
+
+def freeze_stations(df: pd.DataFrame) -> pd.DataFrame:
+    """Read-only version of ``df`` to cache once and share across dashboard sessions.
+
+    Every column is backed by a non-writeable array, so nothing can write into
+    the shared data in place. The frame object itself is not protected: under
+    copy-on-write (pandas 3) a cell assignment swaps in a writeable copy of the
+    column, and any pandas lets whole columns be added or replaced. Sessions
+    must therefore only ever see ``station_view`` objects of it, never the
+    frozen frame.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col].array
+        if isinstance(values, pd.Categorical):
+            codes = values.codes.copy()
+            codes.flags.writeable = False
+            values = pd.Categorical.from_codes(codes, dtype=values.dtype)
+        else:
+            values = df[col].to_numpy(copy=True)
+            values.flags.writeable = False
+        columns[col] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def station_view(df: pd.DataFrame) -> pd.DataFrame:
+    """Shallow copy of a shared (frozen) station table for one session.
+
+    Shares the read-only column arrays, so it costs no copy of the data. Cell
+    writes on the view either raise (pandas 2) or copy the column into the view
+    (pandas 3 copy-on-write), and columns added or replaced stay on the view;
+    the shared table is unchanged either way.
+    """
+    return df.copy(deep=False)
+
+
+def snapshot_path(csv_path: str) -> str:
+    """Path of the Arrow snapshot that belongs to ``csv_path``."""
+    return os.path.splitext(csv_path)[0] + SNAPSHOT_EXT
+
+
+def snapshot_is_fresh(csv_path: str) -> bool:
+    """True if a snapshot exists and is not older than its source CSV."""
+    snap = snapshot_path(csv_path)
+    if not os.path.exists(snap):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(snap) >= os.path.getmtime(csv_path)
+
+
+def dataset_exists(csv_path: str) -> bool:
+    """True if either the CSV or its snapshot is available."""
+    return os.path.exists(csv_path) or os.path.exists(snapshot_path(csv_path))
+
+
+def write_snapshot(df: pd.DataFrame, path: str) -> str:
+    """Write ``df`` as an uncompressed Arrow IPC file (memory-mappable)."""
+    if pa is None:
+        raise ImportError("pyarrow is required to write station snapshots")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(path: str) -> pd.DataFrame:
+    """Memory-map an Arrow snapshot and return it as a DataFrame."""
+    if pa is None:
+        raise ImportError("pyarrow is required to read station snapshots")
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def build_snapshot(csv_path: str, out_path: str = None) -> str:
+    """Parse ``csv_path`` once, compute derived columns and write the snapshot."""
+    df = prepare_stations(pd.read_csv(csv_path))
+    return write_snapshot(df, out_path or snapshot_path(csv_path))
+
+
+def load_station_frame(csv_path: str) -> pd.DataFrame:
+    """Load stations for ``csv_path``, preferring an up-to-date snapshot."""
+    if pa is not None and snapshot_is_fresh(csv_path):
+        df = read_snapshot(snapshot_path(csv_path))
+        # Snapshots written before connector masks / opening hours existed
+        if MASK_COLUMN not in df.columns:
+            add_connector_mask(df)
+        if HOURS_COLUMNS[0] not in df.columns:
+            add_hours_columns(df)
+        return df
+    return prepare_stations(pd.read_csv(csv_path))
+
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        sys.exit("usage: python -m evocharge.station_store STATIONS.csv [...]")
+    for csv_path in paths:
+        out = build_snapshot(csv_path)
+        print(f"Saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Posted station prices (AFDC ``ev_pricing``) compiled into a tariff table.
+
+``ev_pricing`` is free text: "$0.26 per kWh", "Free", "$2.00 per hour",
+"$1 session fee + $0.35/kWh", "Public charging: $0.50 per kWh M-F, $0.40 per
+kWh Sat-Sun; Charge club (campus affiliates): $0.40 per kWh".
+``parse_tariff`` turns one string into a ``Tariff``: $/kWh and $/minute for
+each of the 168 hours of the week (Monday 00:00 = 0, day / time qualifiers
+such as "M-F" or "4pm-9pm" are read with ``evocharge.opening_hours``), time
+charges tiered by session length ("$1.50/hr for first 4 hours, then $5/hr",
+"Free for first 2 hours, $1/hr after") and a per-session fee. Member-only
+segments and prices ("Club: ...", "$0.40/kWh for members") and subscription /
+idle fees are skipped, so the table holds what a public driver pays. Text
+that cannot be modelled exactly - price ranges ("$0.31-$0.43/kWh"), "varies",
+several prices in one clause, two different all-week prices of one kind,
+tiers mixed with day / time qualifiers - parses to None, so the station falls
+back instead of being ranked on a guessed price.
+
+``TariffTable`` parses each distinct string once, de-duplicates the resulting
+tariffs ("Free" and "FREE" share one) and keeps an integer tariff id per
+station (-1 when nothing was posted or nothing could be read). ``cost`` then
+evaluates whole broadcast arrays of (station, kWh, minutes, hour of week):
+
+    cost = kWh x energy[id, hour] + minutes x per_minute[id, hour]
+           + sum over tiers (rate x minutes within the tier) + session_fee[id]
+
+falling back to ``kWh x`` the station's county electricity rate
+(``ca_county_rates.csv`` via ``pricing_model.county_rates``) for stations
+without a readable tariff.
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from evocharge.occupancy import to_minutes, week_slot
+from evocharge.opening_hours import HOURS_PER_WEEK, window_hours
+from evocharge.pricing_model import county_rates, state_reference_rate
+
+PRICING_COLUMNS = ["ev_pricing", "EV Pricing"]
+
+# Segment labels ("Public charging: ...") kept / skipped when a string has several
+PUBLIC_LABELS = ("public", "guest", "non-member", "nonmember", "driver")
+MEMBER_LABELS = ("member", "club", "affiliate", "employee", "subscri", "fleet", "resident", "tenant")
+
+_AMOUNT = r"\$\s*(\d+(?:\.\d+)?|\.\d+)"
+_UNIT_RE = re.compile(_AMOUNT + r"\s*(?:/|per|an|a)\s*(kwh|kw h|hour|hr|h|minute|min|session|charge)\b")
+_FEE_RE = re.compile(_AMOUNT + r"\s*(session|connection|plug-?in|start|access)\s*fee")
+_IGNORED_RE = re.compile(r"month|annual|year|membership|idle|overstay|parking")
+_FREE_RE = re.compile(r"\bfree\b")
+# Prices that cannot be modelled exactly: ranges, "varies", "up to $X"...
+_UNMODELED_RE = re.compile(r"\$\s*[\d.]+\s*(?:-|to)\s*\$?\s*\d|\bvar(?:y|ies|iable)\b|\bdepend|\bdynamic\b"
+                           r"|\bup to\b|\bstarting at\b|\bfrom \$")
+_SEGMENTS = re.compile(r"[;|\n]+")
+_PIECES = re.compile(r",|\+|\band\b|(?=\b(?:then|thereafter)\b)")
+
+# Session-length tiers of time charges
+_DURATION = r"(\d+(?:\.\d+)?)?\s*(hours?|hrs?|minutes?|mins?)\b"
+_AFTER_RE = re.compile(r"\bafter\s+(?:the\s+)?(?:first\s+)?" + _DURATION)
+_FIRST_RE = re.compile(r"\b(?:first|up to)\s+" + _DURATION)
+_NEXT_RE = re.compile(r"\b(?:then|thereafter|after|additional)\b")
+NO_END = 1e9  # minutes; "open-ended" tier end (finite, so tier widths stay finite)
+_LABEL_RE = re.compile(r"^\s*([^:$]+):(?!\d{2})")
+_UNITS = {"kwh": "energy", "kw h": "energy", "hour": "hour", "hr": "hour", "h": "hour",
+          "minute": "minute", "min": "minute", "session": "session", "charge": "session"}
+
+
+class Tariff(NamedTuple):
+    energy: tuple         # $/kWh per hour of the week
+    per_minute: tuple     # $/minute per hour of the week
+    session_fee: float    # $ per session
+    time_tiers: tuple = ()  # ((start minute, $/minute), ...) by session length, from minute 0
+
+
+FREE = Tariff((0.0,) * HOURS_PER_WEEK, (0.0,) * HOURS_PER_WEEK, 0.0)
+
+
+def _members_only(text: str) -> bool:
+    """True if ``text`` names a member group and no public one ("for members", "Club")."""
+    return any(k in text for k in MEMBER_LABELS) and not any(k in text for k in PUBLIC_LABELS)
+
+
+def _segments(text: str) -> list:
+    """Segments that apply to public drivers (all of them when none is labelled)."""
+    segments = [s for s in _SEGMENTS.split(text) if s.strip()]
+    kept = []
+    for segment in segments:
+        label = _LABEL_RE.match(segment)
+        if not _members_only(label.group(1) if label else ""):
+            kept.append(segment)
+    return kept
+
+
+def _minutes(amount, unit: str) -> float:
+    return float(amount or 1) * (60.0 if unit.startswith("h") else 1.0)
+
+
+def _duration(piece: str, previous_end):
+    """``(start, end)`` minutes of a session-length tier named in ``piece``.
+
+    None if the piece has no tier; ``False`` if it continues ("then",
+    "after") a tier that does not exist.
+    """
+    after = _AFTER_RE.search(piece)
+    if after:
+        return _minutes(*after.groups()), NO_END
+    first = _FIRST_RE.search(piece)
+    if first:
+        return 0.0, _minutes(*first.groups())
+    if _NEXT_RE.search(piece):
+        return (previous_end, NO_END) if previous_end is not None else False
+    return None
+
+
+def _time_tiers(tiers, base) -> tuple:
+    """Contiguous ``((start, rate), ...)`` from minute 0; gaps charge ``base``. None if tiers overlap."""
+    tiers = sorted(tiers)
+    out = []
+    position = 0.0
+    for start, end, rate in tiers:
+        if start < position:
+            return None
+        if start > position:
+            out.append((position, base))
+        out.append((start, rate))
+        position = end
+    if position < NO_END:
+        out.append((position, base))
+    return tuple(out)
+
+
+@lru_cache(maxsize=None)
+def parse_tariff(text: str):
+    """``Tariff`` of one ``ev_pricing`` string, or None if it cannot be modelled.
+
+    Qualified prices ("$0.40 per kWh Sat-Sun") override unqualified ones for
+    the hours they cover; time charges for part of a session ("first 4 hours",
+    "after 2 hours", "then") become session-length tiers; fees add up.
+    """
+    text = text.lower()
+    rates = {"energy": [], "minute": []}  # (hours covered, $ per unit)
+    tiers = []  # (start minute, end minute, $ per minute)
+    fee = 0.0
+    recognized = False
+    for segment in _segments(text):
+        if _UNMODELED_RE.search(segment):
+            return None
+        for piece in _PIECES.split(segment):
+            if _IGNORED_RE.search(piece) or _members_only(piece):
+                continue
+            units = _UNIT_RE.findall(piece)
+            flat = _FEE_RE.search(piece)
+            if len(units) > 1:
+                return None  # several prices in one clause: which applies when is unclear
+            tier = _duration(piece, tiers[-1][1] if tiers else None)
+            if tier is False:
+                return None
+            if flat:
+                # Counted whether or not the clause also has a unit price ("$0.25/kWh + $1 session fee")
+                fee += float(flat.group(1))
+                recognized = True
+            if units:
+                amount, kind = float(units[0][0]), _UNITS[units[0][1]]
+                hours = window_hours(_UNIT_RE.sub(" ", piece))
+                if tier is not None:
+                    # Session-length tiers: time charges only, and not combined with day / time windows
+                    if kind not in ("hour", "minute") or not hours.all():
+                        return None
+                    tiers.append((*tier, amount / 60.0 if kind == "hour" else amount))
+                elif kind == "energy":
+                    rates["energy"].append((hours, amount))
+                elif kind == "hour":
+                    rates["minute"].append((hours, amount / 60.0))
+                elif kind == "minute":
+                    rates["minute"].append((hours, amount))
+                else:
+                    fee += amount
+                recognized = True
+            elif not flat and _FREE_RE.search(piece):
+                if tier is not None:
+                    tiers.append((*tier, 0.0))
+                recognized = True
+    if not recognized:
+        return None
+    for entries in rates.values():
+        # Two different all-week prices of one kind: which one the public pays is unclear
+        if len({amount for hours, amount in entries if hours.all()}) > 1:
+            return None
+
+    time_tiers = ()
+    if tiers:
+        # Tiers replace the flat time rate, which may only fill the minutes they leave out
+        flat_rates = {amount for _, amount in rates["minute"]}
+        if len(flat_rates) > 1 or any(not hours.all() for hours, _ in rates["minute"]):
+            return None
+        time_tiers = _time_tiers(tiers, flat_rates.pop() if flat_rates else 0.0)
+        if time_tiers is None:
+            return None
+        rates["minute"] = []
+
+    arrays = {}
+    for kind, entries in rates.items():
+        values = np.zeros(HOURS_PER_WEEK)
+        # Widest windows first so day / time qualified prices win where they apply
+        for hours, amount in sorted(entries, key=lambda e: -e[0].sum()):
+            values[hours] = amount
+        arrays[kind] = tuple(values.tolist())
+    return Tariff(arrays["energy"], arrays["minute"], fee, time_tiers)
+
+
+def hour_of_week(times) -> np.ndarray:
+    """Hour of the week (Monday 00:00 = 0) of each local wall-clock time."""
+    return week_slot(to_minutes(times), 60)
+
+
+def describe(tariff: Tariff) -> str:
+    """Short price summary, e.g. "$0.40-0.50/kWh + $1.00/session" (time rates per hour).
+
+    Session-length tiers read "free, then $1.00/hr from 2h".
+    """
+    parts = []
+    for values, unit, scale in ((tariff.energy, "kWh", 1), (tariff.per_minute, "hr", 60)):
+        lo, hi = min(values) * scale, max(values) * scale
+        if hi > 0:
+            parts.append(f"${lo:.2f}/{unit}" if lo == hi else f"${lo:.2f}-{hi:.2f}/{unit}")
+    if any(rate > 0 for _, rate in tariff.time_tiers):
+        parts.append(", then ".join((f"${rate * 60:.2f}/hr" if rate else "free")
+                                    + (f" from {start / 60:g}h" if start else "")
+                                    for start, rate in tariff.time_tiers))
+    if tariff.session_fee > 0:
+        parts.append(f"${tariff.session_fee:.2f}/session")
+    return " + ".join(parts) or "Free"
+
+
+class TariffTable:
+    """De-duplicated tariffs, a tariff id per station and the county-rate fallback."""
+
+    def __init__(self, pricing, fallback_rates=None):
+        codes, uniques = pd.factorize(pd.Series(pricing, dtype=object))
+        ids = {}
+        unique_ids = []
+        for value in uniques:
+            tariff = parse_tariff(str(value))
+            unique_ids.append(-1 if tariff is None else ids.setdefault(tariff, len(ids)))
+        self.tariffs = list(ids)
+        self.ids = np.array(unique_ids + [-1], dtype=np.int32)[codes]
+
+        # One row per tariff plus a trailing zero row, which id -1 picks
+        rows = self.tariffs + [FREE]
+        self.energy = np.array([t.energy for t in rows])
+        self.per_minute = np.array([t.per_minute for t in rows])
+        self.session_fee = np.array([t.session_fee for t in rows])
+        # Session-length tiers padded to the longest: starts (NO_END when unused) and $/minute
+        width = max([len(t.time_tiers) for t in rows] + [1])
+        self.tier_start = np.full((len(rows), width + 1), NO_END)
+        self.tier_rate = np.zeros((len(rows), width))
+        for i, tariff in enumerate(rows):
+            for k, (start, rate) in enumerate(tariff.time_tiers):
+                self.tier_start[i, k], self.tier_rate[i, k] = start, rate
+        self.fallback_rate = (np.full(len(self.ids), np.nan) if fallback_rates is None
+                              else np.asarray(fallback_rates, dtype=np.float64))
+
+    @classmethod
+    def from_stations(cls, df: pd.DataFrame):
+        """Tariffs from the station pricing column, county rates (state median if unknown) as fallback."""
+        column = next((c for c in PRICING_COLUMNS if c in df.columns), None)
+        pricing = df[column] if column else pd.Series([None] * len(df), dtype=object)
+        rates = county_rates(df).fillna(state_reference_rate())
+        return cls(pricing, rates.to_numpy())
+
+    def __len__(self):
+        return len(self.tariffs)
+
+    def tariff(self, station: int):
+        """Tariff of one station, or None if it has no readable posted price."""
+        tid = self.ids[station]
+        return self.tariffs[tid] if tid >= 0 else None
+
+    def posted(self, stations) -> np.ndarray:
+        """True where the station's cost comes from its posted tariff."""
+        return self.ids[np.asarray(stations)] >= 0
+
+    def cost(self, stations, kwh, minutes, hours) -> np.ndarray:
+        """Session cost ($) per (station, kWh, minutes, hour of week) scenario (broadcast).
+
+        Stations without a readable tariff cost ``kWh x`` their county rate
+        (NaN if that is unknown too).
+        """
+        stations, kwh, minutes, hours = np.broadcast_arrays(
+            np.asarray(stations), np.asarray(kwh, dtype=float), np.asarray(minutes, dtype=float),
+            np.asarray(hours))
+        ids = self.ids[stations]
+        hours = hours % HOURS_PER_WEEK
+        posted = kwh * self.energy[ids, hours] + minutes * self.per_minute[ids, hours] + self.session_fee[ids]
+        # Minutes spent in each session-length tier, (..., tiers)
+        starts = self.tier_start[ids]
+        in_tier = np.clip(minutes[..., None] - starts[..., :-1], 0.0, np.diff(starts, axis=-1))
+        posted = posted + (in_tier * self.tier_rate[ids]).sum(axis=-1)
+        return np.where(ids >= 0, posted, kwh * self.fallback_rate[stations])
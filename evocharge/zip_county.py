@@ -0,0 +1,227 @@
+"""
+Compiled ZIP -> county lookup over the quarterly HUD FIPS snapshots.
+
+``build_lookup`` parses every ``zip_county_fips_YYYY_MM.csv`` once and writes
+a compact artifact:
+
+- ``codes.npy``: int16 matrix ``[snapshot, zip]`` (100,000 columns, one per
+  5-digit ZIP) holding an index into the county table, -1 where unmapped;
+- ``cross_state.npy``: ``(key, county)`` int64 pairs, sorted by key
+  ``snapshot * 100,000 + zip``, for ZIPs listed in more than one state: the
+  first county listed in each state other than the one ``codes`` holds;
+- ``meta.json``: snapshot dates (the version of each row), the county table
+  (FIPS, name without " County", state) and the source file names.
+
+``ZipCountyLookup`` memory-maps the matrix, so loading is O(1) and a lookup
+is one array index; point-in-time queries pick the latest snapshot on or
+before ``as_of``. As in the rates notebook, a ZIP that spans several counties
+maps to the first county listed for it - within ``state`` when one is given,
+so a ZIP that crosses a state line keeps its county on each side.
+
+Build the artifact:
+    python -m evocharge.zip_county
+"""
+
+import bisect
+import glob
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIPS_DIR = os.path.join(PROJECT_ROOT, "data", "ca_county_prices", "zip_code_to_county")
+LOOKUP_DIR = os.path.join(PROJECT_ROOT, "data", "ca_county_prices", "zip_county_lookup")
+
+N_ZIPS = 100000
+_SNAPSHOT_RE = re.compile(r"zip_county_fips_(\d{4})_(\d{2})\.csv$")
+
+
+def parse_zip5(values) -> np.ndarray:
+    """5-digit ZIPs as int32 (-1 where invalid).
+
+    Accepts ints, floats (``91352.0``), strings with or without leading zeros
+    and ZIP+4 (``92101-1234``).
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iuf":
+        with np.errstate(invalid="ignore"):
+            valid = np.isfinite(arr) & (arr >= 0) & (arr < N_ZIPS) & (arr == np.floor(arr))
+        return np.where(valid, np.nan_to_num(arr), -1).astype(np.int32)
+
+    # Plain numeric strings convert in one C pass; only the rest (ZIP+4,
+    # stray text) goes through the regex
+    s = pd.Series(arr, dtype="object")
+    numeric = pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+    out = parse_zip5(numeric)
+    rest = np.isnan(numeric) & s.notna().to_numpy()
+    if rest.any():
+        text = s[rest].astype("string").str.strip()
+        text = text.str.replace(r"\.0+$", "", regex=True).str.extract(r"^(\d{1,5})(?:-\d{4})?$", expand=False)
+        out[rest] = pd.to_numeric(text, errors="coerce").fillna(-1).astype(np.int32).to_numpy()
+    return out
+
+
+def snapshot_files(fips_dir: str = FIPS_DIR):
+    """``[(date 'YYYY-MM', path)]`` for every FIPS snapshot, oldest first."""
+    found = []
+    for path in glob.glob(os.path.join(fips_dir, "zip_county_fips_*.csv")):
+        m = _SNAPSHOT_RE.search(os.path.basename(path))
+        if m:
+            found.append((f"{m.group(1)}-{m.group(2)}", path))
+    return sorted(found)
+
+
+def build_lookup(fips_dir: str = FIPS_DIR, out_dir: str = LOOKUP_DIR) -> str:
+    """Compile all FIPS snapshots into ``out_dir`` and return it."""
+    snapshots = snapshot_files(fips_dir)
+    if not snapshots:
+        raise FileNotFoundError(f"No zip_county_fips_*.csv files in {fips_dir}")
+
+    frames = []
+    for date, path in snapshots:
+        df = pd.read_csv(path, usecols=["zip", "stcountyfp", "state", "countyname"], dtype=str)
+        df["zip"] = parse_zip5(df["zip"])
+        # First county per ZIP and state; the ZIP's first listing overall is the primary
+        df = df[df["zip"] >= 0].drop_duplicates(subset=["zip", "state"])
+        frames.append(df.assign(snapshot=date, primary=~df["zip"].duplicated()))
+    all_rows = pd.concat(frames, ignore_index=True)
+
+    # County table keyed by FIPS; the most recent name/state wins
+    all_rows["stcountyfp"] = all_rows["stcountyfp"].str.zfill(5)
+    counties = all_rows.drop_duplicates(subset=["stcountyfp"], keep="last").sort_values("stcountyfp")
+    county_index = pd.Index(counties["stcountyfp"])
+
+    dates = [date for date, _ in snapshots]
+    codes = np.full((len(dates), N_ZIPS), -1, dtype=np.int16)
+    row = pd.Index(dates).get_indexer(all_rows["snapshot"])
+    zips = all_rows["zip"].to_numpy()
+    county = county_index.get_indexer(all_rows["stcountyfp"])
+    primary = all_rows["primary"].to_numpy()
+    codes[row[primary], zips[primary]] = county[primary]
+    keys = row[~primary].astype(np.int64) * N_ZIPS + zips[~primary]
+    order = np.argsort(keys, kind="stable")
+    cross_state = np.column_stack([keys[order], county[~primary][order]]).astype(np.int64)
+
+    meta = {
+        "version": dates[-1],
+        "snapshots": dates,
+        "source_files": [os.path.basename(path) for _, path in snapshots],
+        "counties": {
+            "fips": counties["stcountyfp"].tolist(),
+            "name": counties["countyname"].str.replace(" County", "").str.strip().tolist(),
+            "state": counties["state"].tolist(),
+        },
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "codes.npy"), codes)
+    np.save(os.path.join(out_dir, "cross_state.npy"), cross_state.reshape(-1, 2))
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return out_dir
+
+
+class ZipCountyLookup:
+    """O(1) ZIP -> county lookups, optionally as of a past snapshot."""
+
+    def __init__(self, lookup_dir: str = LOOKUP_DIR):
+        with open(os.path.join(lookup_dir, "meta.json")) as f:
+            meta = json.load(f)
+        self.version = meta["version"]
+        self.snapshots = meta["snapshots"]
+        self.fips = np.array(meta["counties"]["fips"], dtype=object)
+        self.names = np.array(meta["counties"]["name"], dtype=object)
+        self.states = np.array(meta["counties"]["state"], dtype=object)
+        self.codes = np.load(os.path.join(lookup_dir, "codes.npy"), mmap_mode="r")
+        cross_state = np.load(os.path.join(lookup_dir, "cross_state.npy"))
+        self.cross_keys, self.cross_codes = cross_state[:, 0], cross_state[:, 1].astype(np.int32)
+
+    def snapshot_row(self, as_of=None) -> int:
+        """Row of the latest snapshot on or before ``as_of`` (clamped to the first)."""
+        if as_of is None:
+            return len(self.snapshots) - 1
+        key = pd.Timestamp(as_of).strftime("%Y-%m")
+        return max(bisect.bisect_right(self.snapshots, key) - 1, 0)
+
+    def _in_state(self, row: int, zips: np.ndarray, codes: np.ndarray, state: str) -> np.ndarray:
+        """``codes`` of ``zips`` with counties outside ``state`` swapped for the ZIP's
+        county in ``state`` (-1 if it has none there)."""
+        codes = codes.copy()
+        other = (codes >= 0) & (self.states[np.maximum(codes, 0)] != state)
+        codes[other] = -1
+        if other.any() and len(self.cross_keys):
+            keys = row * N_ZIPS + zips[other].astype(np.int64)
+            start = np.searchsorted(self.cross_keys, keys, side="left")
+            stop = np.searchsorted(self.cross_keys, keys, side="right")
+            found = np.full(len(keys), -1, dtype=np.int32)
+            # A ZIP is listed in a handful of states at most
+            for offset in range(int((stop - start).max(initial=0))):
+                pos = start + offset
+                candidate = self.cross_codes[np.minimum(pos, len(self.cross_codes) - 1)]
+                hit = (pos < stop) & (found < 0) & (self.states[candidate] == state)
+                found[hit] = candidate[hit]
+            codes[other] = found
+        return codes
+
+    def county_codes(self, zips, as_of=None, state: str = None) -> np.ndarray:
+        """County table indices for ``zips`` (-1 where unmapped)."""
+        z = parse_zip5(zips)
+        valid = z >= 0
+        row = self.snapshot_row(as_of)
+        out = np.full(len(z), -1, dtype=np.int32)
+        out[valid] = self.codes[row][z[valid]]
+        if state is not None:
+            out[valid] = self._in_state(row, z[valid], out[valid], state)
+        return out
+
+    def lookup(self, zips, as_of=None, state: str = None) -> np.ndarray:
+        """County names for ``zips`` (None where unmapped)."""
+        codes = self.county_codes(zips, as_of=as_of, state=state)
+        return np.where(codes >= 0, self.names[np.maximum(codes, 0)], None)
+
+    def county(self, zip_code, as_of=None, state: str = None):
+        """County name of a single ZIP, or None."""
+        return self.lookup([zip_code], as_of=as_of, state=state)[0]
+
+    def to_frame(self, as_of=None, state: str = None) -> pd.DataFrame:
+        """``zip_code``/``county_name`` table for one snapshot (e.g. ca_zip_to_county.csv)."""
+        row = self.snapshot_row(as_of)
+        codes = np.asarray(self.codes[row], dtype=np.int32)
+        zips = np.flatnonzero(codes >= 0)
+        codes = codes[zips]
+        if state is not None:
+            codes = self._in_state(row, zips, codes, state)
+            keep = codes >= 0
+            zips, codes = zips[keep], codes[keep]
+        return pd.DataFrame({"zip_code": zips, "county_name": self.names[codes]})
+
+
+def load_lookup(lookup_dir: str = LOOKUP_DIR, fips_dir: str = FIPS_DIR,
+                build_if_missing: bool = True) -> ZipCountyLookup:
+    """Open the compiled lookup, (re)building it if missing or out of date."""
+    meta_path = os.path.join(lookup_dir, "meta.json")
+    if build_if_missing:
+        # (lookups built before cross-state ZIPs were kept have no cross_state.npy)
+        stale = not os.path.exists(meta_path) or not os.path.exists(os.path.join(lookup_dir, "cross_state.npy"))
+        if not stale:
+            with open(meta_path) as f:
+                built = json.load(f)["source_files"]
+            current = [os.path.basename(p) for _, p in snapshot_files(fips_dir)]
+            stale = bool(current) and built != current
+        if stale:
+            build_lookup(fips_dir, lookup_dir)
+    return ZipCountyLookup(lookup_dir)
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    fips_dir = args[0] if args else FIPS_DIR
+    out_dir = args[1] if len(args) > 1 else LOOKUP_DIR
+    print(f"Saved: {build_lookup(fips_dir, out_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,23 @@ import pandas as pd
 import streamlit as st
 import pydeck as pdk
 import numpy as np
-import json
+
+from evocharge.availability import AvailabilityModel, arrival_time
+from evocharge.bitmap_index import StationBitmaps
+from evocharge.clustering import ClusterPyramid
+from evocharge.connectors import CONNECTOR_LABELS, MASK_COLUMN, has_all, present_types
+from evocharge.energy_model import EnergyPredictor
+from evocharge.heat_grid import HEAT_CELL_PX, GridAggregate, HeatGrid
+from evocharge.layer_data import pack_records, picked_index
+from evocharge.map_styles import StationStyles, availability_colors, port_labels
+from evocharge.opening_hours import HOURS_COLUMNS, open_at
+from evocharge.pricing_model import CHARGER_TYPES, PricingEngine
+from evocharge.scenarios import DEFAULT_ENERGY_KWH, ScenarioComparator
+from evocharge.session_analytics import SESSIONS_CSV
+from evocharge.spatial_index import StationGridIndex, viewport_bounds
+from evocharge.station_store import (compact_stations, dataset_exists, freeze_stations, load_station_frame,
+                                     station_view)
+from evocharge.tariffs import TariffTable, describe, hour_of_week
 
 # -----------------------------
 # Config
@@ -35,35 +51,24 @@ SD_NEIGHBORHOODS = {
     "La Jolla": {"lat": 32.8328, "lon": -117.2713, "color": [255, 215, 0, 100]}
 }
 
-@st.cache_data
-def load_stations(path: str):
-    """Load and clean station data from CSV."""
+# Above this many matching stations, only the ones near the viewport are drawn
+MAX_MAP_STATIONS = 5000
+
+# Station Details column -> label
+DETAIL_COLUMNS = {
+    "station_name": "Station Name", "ev_network": "Network", "city": "City", "street_address": "Address",
+    "ev_dc_fast_num": "DC Fast", "ev_level2_evse_num": "Level 2", "capacity_proxy": "Capacity Score",
+}
+
+@st.cache_resource
+def load_shared_stations(path: str):
+    """Station table, loaded once per process and shared read-only by all sessions.
+
+    Prefers the prebuilt columnar snapshot over the CSV. Never hand this frame to
+    a session directly; go through ``load_stations``.
+    """
     try:
-        df = pd.read_csv(path)
-        
-        # Ensure required columns exist
-        required_cols = ["latitude", "longitude", "station_name", "ev_network", 
-                        "ev_dc_fast_num", "ev_level2_evse_num"]
-        for col in required_cols:
-            if col not in df.columns:
-                df[col] = None
-        
-        # Convert numeric columns safely
-        for col in ["ev_dc_fast_num", "ev_level2_evse_num"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
-        
-        # Calculate capacity proxy if not present
-        if "capacity_proxy" not in df.columns:
-            df["capacity_proxy"] = df["ev_dc_fast_num"] * 1.0 + df["ev_level2_evse_num"] * 0.25
-        
-        # Clean data - remove rows without coordinates
-        df = df.dropna(subset=["latitude", "longitude"]).copy()
-        
-        # Add some additional useful columns
-        df["total_ports"] = df["ev_dc_fast_num"] + df["ev_level2_evse_num"]
-        df["has_dc_fast"] = df["ev_dc_fast_num"] > 0
-        
-        return df
+        return freeze_stations(compact_stations(load_station_frame(path)))
         
     except FileNotFoundError:
         st.error(f"Data file not found: {path}")
@@ -73,32 +78,132 @@ def load_stations(path: str):
         st.error(f"Error loading data: {e}")
         return pd.DataFrame()
 
+def load_stations(path: str):
+    """This session's view of the shared station table (cell writes and added columns stay local)."""
+    return station_view(load_shared_stations(path))
+
+@st.cache_resource
+def get_spatial_index(path: str):
+    """Grid index over station coordinates, built once per dataset."""
+    return StationGridIndex.from_frame(load_stations(path))
+
+@st.cache_resource
+def get_cluster_pyramid(path: str):
+    """Per-zoom station cluster assignment, built once per dataset."""
+    return ClusterPyramid(load_stations(path))
+
+@st.cache_resource
+def get_station_styles(path: str):
+    """Marker colors and layer columns, precomputed once per dataset."""
+    return StationStyles(load_stations(path))
+
+@st.cache_resource
+def get_station_bitmaps(path: str):
+    """Bitmap indexes for the sidebar filters and Quick Stats, built once per dataset."""
+    return StationBitmaps(load_stations(path))
+
+@st.cache_resource
+def get_opening_hours(path: str):
+    """``(stations, 3)`` uint64 weekly opening-hour bitmaps, stacked once per dataset."""
+    return load_stations(path)[HOURS_COLUMNS].to_numpy(dtype=np.uint64)
+
+@st.cache_resource
+def get_capacity_order(path: str):
+    """Station positions by capacity (highest first), sorted once per dataset."""
+    return np.argsort(-load_stations(path)["capacity_proxy"].to_numpy(), kind="stable")
+
+@st.cache_resource
+def get_heat_grid(path: str):
+    """Station -> heatmap grid cell per zoom level, built once per dataset."""
+    return HeatGrid(load_stations(path))
+
+def heat_cells(path: str, zoom: int, mask: np.ndarray):
+    """Heatmap cells for ``mask``; this session's sums are updated incrementally."""
+    grid = get_heat_grid(path)
+    agg = st.session_state.get("heat_grid")
+    if agg is None or agg.grid is not grid or agg.zoom != grid.clamp_zoom(zoom):
+        agg = st.session_state["heat_grid"] = GridAggregate(grid, zoom)
+    return agg.update(mask).cells()
+
+@st.cache_resource
+def get_availability_model():
+    """Availability model fitted on the charging sessions, shared by all sessions."""
+    if not os.path.exists(SESSIONS_CSV):
+        return None
+    return AvailabilityModel.from_sessions(SESSIONS_CSV)
+
+@st.cache_resource
+def get_energy_predictor():
+    """Energy model artifacts, unpickled in the background once per process."""
+    predictor = EnergyPredictor()
+    return predictor.load_async() if predictor.available() else None
+
+@st.cache_resource
+def get_tariffs(path: str):
+    """Posted prices parsed into a de-duplicated tariff table, once per dataset."""
+    return TariffTable.from_stations(load_stations(path))
+
+@st.cache_resource
+def get_scenario_comparator(path: str):
+    """Pricing / availability / energy models over one dataset, built once."""
+    return ScenarioComparator(PricingEngine(load_stations(path)), get_availability_model(),
+                              get_energy_predictor(), get_tariffs(path))
+
+@st.cache_data
+def dataset_summary(path: str):
+    """Header metrics, computed once per dataset."""
+    df = load_stations(path)
+    return {
+        "stations": len(df),
+        "networks": df["ev_network"].nunique(),
+        "dc_fast": int((df["ev_dc_fast_num"] > 0).sum()),
+        "capacity": float(df["capacity_proxy"].mean()),
+    }
+
+def filter_stations(path: str, min_counts: dict, values: dict, connectors: list):
+    """Bitmap and mask of the stations matching the sidebar filters, and their center."""
+    bitmaps = get_station_bitmaps(path)
+    df = load_stations(path)
+    bits = bitmaps.select(min_counts, **values)
+    if connectors:
+        # Every selected connector: one AND/compare over the uint16 mask column
+        bits &= np.packbits(has_all(df[MASK_COLUMN].to_numpy(), connectors))
+    mask = bitmaps.mask(bits)
+    if not mask.any():
+        return bits, mask, None, None
+    return (bits, mask, float(df["latitude"].to_numpy()[mask].mean()),
+            float(df["longitude"].to_numpy()[mask].mean()))
+
+def station_details(path: str, bits: np.ndarray, mask: np.ndarray):
+    """Station Details row order (by capacity) and Quick Stats from bitmap popcounts."""
+    bitmaps = get_station_bitmaps(path)
+    by_capacity = get_capacity_order(path)
+    charger = bitmaps.charger_counts(bits)
+    stats = {
+        "top_networks": bitmaps.value_counts("ev_network", bits).head(5),
+        "dc_only": charger["dc_only"],
+        "l2_only": charger["l2_only"],
+        "both": charger["both"],
+    }
+    return by_capacity[mask[by_capacity]], stats
+
 # -----------------------------
-# Load initial data
+# Locate data
 # -----------------------------
-# Try multiple possible locations for the CSV files
+# Try multiple possible locations for the CSV files (or their .arrow snapshots)
 possible_paths = [
     (TOP50_CSV, RAW_CSV),  # Primary location: ../data/afdc/
     ("afdc_stations_top50.csv", "afdc_stations_raw.csv"),  # Current directory
     ("data/afdc_stations_top50.csv", "data/afdc_stations_raw.csv"),  # Relative path
 ]
 
-df = None
-for top50_path, raw_path in possible_paths:
-    if os.path.exists(top50_path):
-        df = load_stations(top50_path)
-        TOP50_CSV = top50_path  # Update global paths
-        RAW_CSV = raw_path
-        st.success(f"✅ Loaded data from: {top50_path}")
-        break
-    elif os.path.exists(raw_path):
-        df = load_stations(raw_path)
-        TOP50_CSV = top50_path  # Update global paths  
-        RAW_CSV = raw_path
-        st.warning(f"⚠️ Top 50 CSV not found, loaded raw data from: {raw_path}")
-        break
-
-if df is None:
+found_paths = next(
+    ((top50_path, raw_path) for top50_path, raw_path in possible_paths
+     if dataset_exists(top50_path) or dataset_exists(raw_path)),
+    None,
+)
+
+if found_paths is None:
     st.error("❌ No data files found! Please run the data collection notebook first.")
     st.info("""
     **Expected file locations:**
@@ -112,6 +217,32 @@ if df is None:
     """)
     st.stop()
 
+TOP50_CSV, RAW_CSV = found_paths  # Update global paths
+
+# -----------------------------
+# Dataset selection + load (once per rerun)
+# -----------------------------
+st.sidebar.header("🎛️ Map Controls")
+
+csv_options = {}
+if dataset_exists(TOP50_CSV):
+    csv_options["Top 50 (highest capacity)"] = TOP50_CSV
+if dataset_exists(RAW_CSV):
+    csv_options["All stations (raw data)"] = RAW_CSV
+
+if len(csv_options) > 1:
+    csv_choice = st.sidebar.selectbox("Dataset", list(csv_options), index=0)
+else:
+    csv_choice = next(iter(csv_options))
+
+data_path = csv_options[csv_choice]
+df = load_stations(data_path)
+
+if data_path == TOP50_CSV:
+    st.success(f"✅ Loaded data from: {data_path}")
+elif not dataset_exists(TOP50_CSV):
+    st.warning(f"⚠️ Top 50 CSV not found, loaded raw data from: {data_path}")
+
 if df.empty:
     st.error("No valid station data loaded.")
     st.stop()
@@ -122,341 +253,456 @@ if df.empty:
 st.title("EvoCharge — San Diego EV Charger Map")
 st.markdown("**Real-time EV charging station availability predictor for San Diego County**")
 
+summary = dataset_summary(data_path)
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    st.metric("Total Stations", len(df))
+    st.metric("Total Stations", summary["stations"])
 with col2:
-    st.metric("Networks", df["ev_network"].nunique())
+    st.metric("Networks", summary["networks"])
 with col3:
-    st.metric("DC Fast Stations", (df["ev_dc_fast_num"] > 0).sum())
+    st.metric("DC Fast Stations", summary["dc_fast"])
 with col4:
-    st.metric("Avg Capacity Score", f"{df['capacity_proxy'].mean():.1f}")
+    st.metric("Avg Capacity Score", f"{summary['capacity']:.1f}")
 
 # -----------------------------
 # Sidebar controls
 # -----------------------------
-st.sidebar.header("🎛️ Map Controls")
-
-# Dataset selection
-csv_options = []
-if os.path.exists(TOP50_CSV):
-    csv_options.append("Top 50 (highest capacity)")
-if os.path.exists(RAW_CSV):
-    csv_options.append("All stations (raw data)")
-
-if len(csv_options) > 1:
-    csv_choice = st.sidebar.selectbox("Dataset", csv_options, index=0)
-    if "All stations" in csv_choice:
-        df = load_stations(RAW_CSV)
-    else:
-        df = load_stations(TOP50_CSV)
+# Filters rerun the whole page; map display controls live in the map fragment
+bitmaps = get_station_bitmaps(data_path)
 
 # Network filter
-networks = ["(All Networks)"] + sorted([n for n in df["ev_network"].dropna().unique() if pd.notna(n)])
+networks = ["(All Networks)"] + bitmaps.options("ev_network")
 net_filter = st.sidebar.selectbox("🔌 Network Filter", networks, index=0)
 
+# Access / facility filters (only when the dataset has more than one value)
+access_options = bitmaps.options("access_code")
+access_filter = "(Any Access)"
+if len(access_options) > 1:
+    access_filter = st.sidebar.selectbox("🔓 Access", ["(Any Access)"] + access_options, index=0)
+
+facility_options = bitmaps.options("facility_type")
+facility_filter = "(All Facility Types)"
+if len(facility_options) > 1:
+    facility_filter = st.sidebar.selectbox("🏢 Facility Type", ["(All Facility Types)"] + facility_options, index=0)
+
+# Connector filter (stations must offer every selected connector)
+connector_filter = st.sidebar.multiselect(
+    "🔋 Connectors", present_types(df[MASK_COLUMN].to_numpy()),
+    format_func=lambda name: CONNECTOR_LABELS.get(name, name),
+)
+
 # Capacity filters
 st.sidebar.subheader("⚡ Charging Capacity")
 min_dc = st.sidebar.slider("Min DC Fast Chargers", 0, int(df["ev_dc_fast_num"].max()), 0)
 min_l2 = st.sidebar.slider("Min Level 2 Chargers", 0, int(df["ev_level2_evse_num"].max()), 0)
 
-# Map display options
-st.sidebar.subheader("Map Display")
-layer_mode = st.sidebar.radio("Visualization Type", ["ChargePoint Style", "Heatmap"], index=0)
-
-# Map style options
-show_neighborhoods = st.sidebar.checkbox("Show Neighborhood Labels", value=True)
-show_boundaries = st.sidebar.checkbox("Show Area Boundaries", value=True)
-
-if layer_mode == "ChargePoint Style":
-    point_size = st.sidebar.slider("Station Marker Size", 100, 300, 180)
-    marker_style = st.sidebar.selectbox("Marker Style", 
-                                       ["Green Circles (ChargePoint)", "Color by Capacity", "Color by Network"])
-else:
-    heat_radius = st.sidebar.slider("Heat Radius", 60, 600, 180)
-
-zoom_level = st.sidebar.slider("Zoom Level", 9, 15, 11)
-
-# Future prediction controls (placeholder)
-st.sidebar.subheader("Availability Prediction")
-eta_minutes = st.sidebar.slider("Arrival Time (minutes from now)", 0, 120, 30, step=15)
-st.sidebar.caption("🚧 Prediction model integration coming in Week 4-5")
-
 # Show/hide additional info
 show_details = st.sidebar.checkbox("Show Station Details", value=True)
 
 # -----------------------------
 # Filter data based on controls
 # -----------------------------
-mask = (df["ev_dc_fast_num"] >= min_dc) & (df["ev_level2_evse_num"] >= min_l2)
-
-if net_filter != "(All Networks)":
-    mask = mask & (df["ev_network"] == net_filter)
-
-df_filtered = df.loc[mask].copy()
+# Bitmap ANDs; "(All ...)" choices leave a column unfiltered
+bits, mask, center_lat, center_lon = filter_stations(
+    data_path,
+    {"ev_dc_fast_num": min_dc, "ev_level2_evse_num": min_l2},
+    {
+        "ev_network": None if net_filter == "(All Networks)" else net_filter,
+        "access_code": None if access_filter == "(Any Access)" else access_filter,
+        "facility_type": None if facility_filter == "(All Facility Types)" else facility_filter,
+    },
+    connector_filter,
+)
 
-if df_filtered.empty:
+if center_lat is None:
     st.warning("No stations match your current filters. Try adjusting the criteria.")
     st.stop()
 
 # -----------------------------
-# Calculate map center
-# -----------------------------
-center_lat = float(df_filtered["latitude"].mean())
-center_lon = float(df_filtered["longitude"].mean())
-
-# -----------------------------
-# Create map layers
+# Map (reruns on its own when a map control changes)
 # -----------------------------
+# Hover shows name and port count only; the rest loads when a marker is picked
+STATION_LAYER = "stations"
 tooltip = {
     "html": """
     <div style="background: white; padding: 10px; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.3);">
-        <h4 style="margin: 0 0 8px 0; color: #2E7D32;">{station_name}</h4>
-        <p style="margin: 2px 0; color: #666;"><b>Network:</b> {ev_network}</p>
-        <p style="margin: 2px 0; color: #666;"><b>Address:</b> {street_address}</p>
-        <p style="margin: 2px 0; color: #666;"><b>DC Fast:</b> {ev_dc_fast_num} ports | <b>Level 2:</b> {ev_level2_evse_num} ports</p>
-        <p style="margin: 2px 0; color: #2E7D32;"><b>Capacity Score:</b> {capacity_proxy:.1f}</p>
+        <h4 style="margin: 0 0 8px 0; color: #2E7D32;">{n}</h4>
+        <p style="margin: 2px 0; color: #666;"><b>Ports:</b> {t}</p>
+        <p style="margin: 2px 0; color: #999;">Click for station details</p>
     </div>
     """,
     "style": {"backgroundColor": "transparent", "color": "black"}
 }
 
-layers = []
-
-# Add neighborhood boundaries if enabled
-if show_boundaries:
-    # Create simple circular boundaries for neighborhoods
-    neighborhood_data = []
-    for name, info in SD_NEIGHBORHOODS.items():
-        neighborhood_data.append({
-            "name": name,
-            "coordinates": [info["lon"], info["lat"]],
-            "radius": 2000,  # 2km radius
-            "color": info["color"]
-        })
-    
-    boundary_layer = pdk.Layer(
-        "ScatterplotLayer",
-        data=neighborhood_data,
-        get_position="coordinates",
-        get_radius="radius",
-        get_fill_color="color",
-        get_line_color=[255, 255, 255, 100],
-        get_line_width=2,
-        pickable=False,
-        stroked=True,
-        filled=True,
-    )
-    layers.append(boundary_layer)
-
-# Add neighborhood labels if enabled
-if show_neighborhoods:
-    neighborhood_labels = []
-    for name, info in SD_NEIGHBORHOODS.items():
-        neighborhood_labels.append({
-            "name": name,
-            "coordinates": [info["lon"], info["lat"]],
-            "size": 16
-        })
-    
-    label_layer = pdk.Layer(
-        "TextLayer",
-        data=neighborhood_labels,
-        get_position="coordinates",
-        get_text="name",
-        get_size="size",
-        get_color=[80, 80, 80, 200],
-        get_angle=0,
-        get_alignment_baseline="'center'",
-        pickable=False,
-    )
-    layers.append(label_layer)
-
-# Main station layer
-if layer_mode == "ChargePoint Style":
-    if marker_style == "Green Circles (ChargePoint)":
-        # ChargePoint-style green circles with white numbers
-        df_filtered["station_count"] = 1  # Could be aggregated count in real implementation
-        df_filtered["r"] = 46   # ChargePoint green: #2E7D32
-        df_filtered["g"] = 125
-        df_filtered["b"] = 50
+def show_station(data_path: str, row: int, arrival, availability_model):
+    """Details of one picked station (read from the station table on demand)."""
+    station = load_stations(data_path).iloc[row]
+    st.markdown(f"**{station['station_name']}** · {station['ev_network']}  \n"
+                f"{station['street_address']}, {station['city']}")
+    details = (f"DC Fast: {station['ev_dc_fast_num']} ports | Level 2: {station['ev_level2_evse_num']} ports | "
+               f"Capacity Score: {station['capacity_proxy']:.1f}")
+    if availability_model is not None:
+        free = availability_model.predict([station["total_ports"]], arrival)[0]
+        details += f" | Availability at {arrival:%H:%M}: {free:.0%}"
+    st.caption(details)
+    hours = station.get("access_days_time")
+    if isinstance(hours, str) and hours:
+        words = np.array([station[HOURS_COLUMNS].tolist()], dtype=np.uint64)
+        state = "open" if open_at(words, arrival)[0] else "closed"
+        st.caption(f"Hours: {hours} ({state} at {arrival:%a %H:%M})")
+    # Posted price (county electricity rate when none is readable) for a typical session
+    tariffs = get_tariffs(data_path)
+    tariff = tariffs.tariff(row)
+    cost = tariffs.cost(row, DEFAULT_ENERGY_KWH, 60, hour_of_week(arrival))[0]
+    if tariff is not None:
+        price = f"Posted price: {describe(tariff)}"
+    else:
+        price = "No posted price; county electricity rate"
+    if not np.isnan(cost):
+        price += f" · est. ${cost:.2f} for {DEFAULT_ENERGY_KWH:.0f} kWh / 60 min at {arrival:%H:%M}"
+    st.caption(price)
+
+@st.fragment
+def map_view(data_path: str, mask: np.ndarray, center_lat: float, center_lon: float):
+    """Map display controls, layers and deck for the filtered stations."""
+    styles = get_station_styles(data_path)
+    header = st.container()
+
+    # Map display options
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        layer_mode = st.radio("Visualization Type", ["ChargePoint Style", "Heatmap"], index=0)
+    with col2:
+        if layer_mode == "ChargePoint Style":
+            marker_style = st.selectbox("Marker Style",
+                                        ["Green Circles (ChargePoint)", "Color by Capacity", "Color by Network",
+                                         "Color by Availability"])
+            point_size = st.slider("Station Marker Size", 100, 300, 180)
+        else:
+            heat_radius = st.slider("Heat Radius", 60, 600, 180)
+    with col3:
+        zoom_level = st.slider("Zoom Level", 9, 15, 11)
+        # Map style options
+        show_neighborhoods = st.checkbox("Show Neighborhood Labels", value=True)
+        show_boundaries = st.checkbox("Show Area Boundaries", value=True)
+    with col4:
+        # Availability prediction at the chosen arrival time
+        eta_minutes = st.slider("Arrival Time (minutes from now)", 0, 120, 30, step=15)
+        availability_model = get_availability_model()
+        arrival = arrival_time(eta_minutes)
+        if availability_model is None:
+            st.caption("Charging sessions data not found; availability prediction is off")
+        else:
+            st.caption(f"Predicting for arrival at {arrival:%a %H:%M} (San Diego time)")
+        open_only = st.checkbox("Only stations open at arrival", value=False)
+
+    # Posted opening hours at the arrival time: one bit test per station
+    if open_only:
+        mask = mask & open_at(get_opening_hours(data_path), arrival)
+        if not mask.any():
+            st.warning(f"None of the matching stations is open at {arrival:%a %H:%M}.")
+            return
+
+    # Large datasets: only send stations around the initial viewport to pydeck
+    # (the heatmap sends grid cells, so it always covers every matching station)
+    n_matching = int(mask.sum())
+    shown = mask
+    if n_matching > MAX_MAP_STATIONS and layer_mode != "Heatmap":
+        in_view = np.zeros(len(styles), dtype=bool)
+        in_view[get_spatial_index(data_path).bbox(
+            *viewport_bounds(center_lat, center_lon, zoom_level, padding=2.0)
+        )] = True
+        if (mask & in_view).any():
+            shown = mask & in_view
+
+    # Positions of the shown stations; layers gather only the columns they draw
+    idx = np.flatnonzero(shown)
+
+    # Score every shown station for the arrival time in one batched call
+    availability = None
+    if availability_model is not None:
+        availability = availability_model.predict(styles.ports[idx], arrival)
+
+    layers = []
+
+    # Add neighborhood boundaries if enabled
+    if show_boundaries:
+        # Create simple circular boundaries for neighborhoods
+        neighborhood_data = []
+        for name, info in SD_NEIGHBORHOODS.items():
+            neighborhood_data.append({
+                "name": name,
+                "coordinates": [info["lon"], info["lat"]],
+                "radius": 2000,  # 2km radius
+                "color": info["color"]
+            })
         
-        station_layer = pdk.Layer(
+        boundary_layer = pdk.Layer(
             "ScatterplotLayer",
-            data=df_filtered,
-            get_position='[longitude, latitude]',
-            get_radius=point_size,
-            get_fill_color='[r, g, b, 220]',
-            get_line_color=[255, 255, 255, 255],
-            get_line_width=3,
-            pickable=True,
-            auto_highlight=True,
+            data=neighborhood_data,
+            get_position="coordinates",
+            get_radius="radius",
+            get_fill_color="color",
+            get_line_color=[255, 255, 255, 100],
+            get_line_width=2,
+            pickable=False,
             stroked=True,
             filled=True,
         )
+        layers.append(boundary_layer)
+
+    # Add neighborhood labels if enabled
+    if show_neighborhoods:
+        neighborhood_labels = []
+        for name, info in SD_NEIGHBORHOODS.items():
+            neighborhood_labels.append({
+                "name": name,
+                "coordinates": [info["lon"], info["lat"]],
+                "size": 16
+            })
         
-        # Add text layer for numbers (simplified - showing total ports)
-        df_filtered["port_text"] = df_filtered["total_ports"].astype(str)
-        text_layer = pdk.Layer(
+        label_layer = pdk.Layer(
             "TextLayer",
-            data=df_filtered,
-            get_position='[longitude, latitude]',
-            get_text="port_text",
-            get_size=14,
-            get_color=[255, 255, 255, 255],
+            data=neighborhood_labels,
+            get_position="coordinates",
+            get_text="name",
+            get_size="size",
+            get_color=[80, 80, 80, 200],
             get_angle=0,
             get_alignment_baseline="'center'",
             pickable=False,
         )
-        layers.extend([station_layer, text_layer])
-        
-    elif marker_style == "Color by Capacity":
-        # Color gradient based on capacity
-        values = df_filtered["capacity_proxy"]
-        if values.max() > values.min():
-            values_norm = (values - values.min()) / (values.max() - values.min())
+        layers.append(label_layer)
+
+    # Main station layer (packed records: only what the layers draw; details load on pick)
+    clusters = None
+    if layer_mode == "ChargePoint Style":
+        if marker_style == "Green Circles (ChargePoint)":
+            # ChargePoint-style green circles with white numbers; nearby stations
+            # are merged into one circle per cluster at the current zoom level
+            clusters = get_cluster_pyramid(data_path).level(zoom_level, shown)
+            port_text = port_labels(clusters["total_ports"])
+            station_data = pack_records(
+                clusters["longitude"], clusters["latitude"],
+                radius=point_size * (1 + np.log2(clusters["station_count"]) / 2),
+                label=port_text, name=clusters["station_name"], key=clusters["station"],
+            )
+            
+            station_layer = pdk.Layer(
+                "ScatterplotLayer",
+                id=STATION_LAYER,
+                data=station_data,
+                get_position="p",
+                get_radius="s",
+                get_fill_color=[46, 125, 50, 220],  # ChargePoint green: #2E7D32
+                get_line_color=[255, 255, 255, 255],
+                get_line_width=3,
+                pickable=True,
+                auto_highlight=True,
+                stroked=True,
+                filled=True,
+            )
+            
+            # Add text layer for numbers (total ports per cluster)
+            text_layer = pdk.Layer(
+                "TextLayer",
+                data=pack_records(clusters["longitude"], clusters["latitude"], label=port_text),
+                get_position="p",
+                get_text="t",
+                get_size=14,
+                get_color=[255, 255, 255, 255],
+                get_angle=0,
+                get_alignment_baseline="'center'",
+                pickable=False,
+            )
+            layers.extend([station_layer, text_layer])
+            
         else:
-            values_norm = pd.Series([0.5] * len(values), index=values.index)
-        
-        # Green to red gradient (high capacity = green)
-        df_filtered["r"] = (255 * (1 - values_norm)).astype(int)
-        df_filtered["g"] = (255 * values_norm).astype(int)
-        df_filtered["b"] = 30
-        
-        station_layer = pdk.Layer(
-            "ScatterplotLayer",
-            data=df_filtered,
-            get_position='[longitude, latitude]',
-            get_radius=point_size,
-            get_fill_color='[r, g, b, 200]',
-            get_line_color=[255, 255, 255, 150],
-            get_line_width=2,
-            pickable=True,
-            auto_highlight=True,
-            stroked=True,
+            if marker_style == "Color by Availability" and availability is not None:
+                # Red (likely full) to green (likely a free port) at the arrival time
+                colors = availability_colors(availability)
+            elif marker_style == "Color by Capacity":
+                # Green to red gradient (high capacity = green), precomputed per dataset
+                colors = styles.colors["capacity"][idx]
+            else:  # Color by Network
+                colors = styles.colors["network"][idx]
+
+            station_data = pack_records(styles.longitude[idx], styles.latitude[idx], color=colors, alpha=200,
+                                        label=styles.ports[idx], name=styles.names[idx], key=idx)
+            station_layer = pdk.Layer(
+                "ScatterplotLayer",
+                id=STATION_LAYER,
+                data=station_data,
+                get_position="p",
+                get_radius=point_size,
+                get_fill_color="c",
+                get_line_color=[255, 255, 255, 150],
+                get_line_width=2,
+                pickable=True,
+                auto_highlight=True,
+                stroked=True,
+            )
+            layers.append(station_layer)
+
+    else:
+        # Heatmap over grid cells aggregated on the server (mean capacity per cell)
+        cells = heat_cells(data_path, zoom_level, mask)
+        heat_layer = pdk.Layer(
+            "HeatmapLayer",
+            data=pack_records(cells["longitude"], cells["latitude"], weight=cells["capacity_mean"]),
+            get_position="p",
+            aggregation='"MEAN"',
+            get_weight="w",
+            radius_pixels=heat_radius,
+            intensity=1,
+            threshold=0.03,
         )
-        layers.append(station_layer)
-        
-    else:  # Color by Network
-        # Different colors for each network
-        unique_networks = df_filtered["ev_network"].unique()
-        network_colors = {}
-        colors = [
-            [46, 125, 50],    # Green
-            [33, 150, 243],   # Blue  
-            [255, 152, 0],    # Orange
-            [156, 39, 176],   # Purple
-            [244, 67, 54],    # Red
-            [0, 150, 136],    # Teal
-            [121, 85, 72],    # Brown
-            [96, 125, 139],   # Blue Grey
-        ]
-        
-        for i, network in enumerate(unique_networks):
-            color = colors[i % len(colors)]
-            network_colors[network] = color
-        
-        df_filtered["r"] = df_filtered["ev_network"].map(lambda x: network_colors.get(x, [100, 100, 100])[0])
-        df_filtered["g"] = df_filtered["ev_network"].map(lambda x: network_colors.get(x, [100, 100, 100])[1])
-        df_filtered["b"] = df_filtered["ev_network"].map(lambda x: network_colors.get(x, [100, 100, 100])[2])
-        
-        station_layer = pdk.Layer(
+
+        # Near-invisible cell markers so hovering the heatmap shows each cell's totals
+        cell_layer = pdk.Layer(
             "ScatterplotLayer",
-            data=df_filtered,
-            get_position='[longitude, latitude]',
-            get_radius=point_size,
-            get_fill_color='[r, g, b, 200]',
-            get_line_color=[255, 255, 255, 150],
-            get_line_width=2,
+            id="heat_cells",
+            data=pack_records(
+                cells["longitude"], cells["latitude"], label=cells["total_ports"],
+                name=[f"{n} stations · {share:.0%} DC fast"
+                      for n, share in zip(cells["station_count"], cells["dc_fast_share"])],
+            ),
+            get_position="p",
+            get_radius=HEAT_CELL_PX / 2,
+            radius_units="'pixels'",
+            get_fill_color=[0, 0, 0, 1],
             pickable=True,
-            auto_highlight=True,
-            stroked=True,
         )
-        layers.append(station_layer)
-
-else:
-    # Heatmap layer
-    heat_layer = pdk.Layer(
-        "HeatmapLayer",
-        data=df_filtered,
-        get_position='[longitude, latitude]',
-        aggregation='"MEAN"',
-        get_weight="capacity_proxy",
-        radius_pixels=heat_radius,
-        intensity=1,
-        threshold=0.03,
+        layers.extend([heat_layer, cell_layer])
+
+    # Map view state
+    view_state = pdk.ViewState(
+        latitude=center_lat, 
+        longitude=center_lon, 
+        zoom=zoom_level, 
+        bearing=0, 
+        pitch=0
     )
-    layers.append(heat_layer)
-
-# Map view state
-view_state = pdk.ViewState(
-    latitude=center_lat, 
-    longitude=center_lon, 
-    zoom=zoom_level, 
-    bearing=0, 
-    pitch=0
-)
 
-# -----------------------------
-# Display the map
-# -----------------------------
-st.subheader(f"📍 San Diego EV Charging Stations ({len(df_filtered)} stations shown)")
+    with header:
+        st.subheader(f"📍 San Diego EV Charging Stations ({len(idx)} stations shown)")
+        if len(idx) < n_matching:
+            st.caption(f"Showing stations near the map view ({n_matching} match your filters)")
+
+        # Add style description
+        if layer_mode == "ChargePoint Style" and marker_style == "Green Circles (ChargePoint)":
+            st.caption("🟢 ChargePoint-style interface: Green circles show charging stations (clustered at this zoom) with port counts")
+        elif layer_mode == "ChargePoint Style" and marker_style == "Color by Availability" and availability is not None:
+            st.caption(f"🟢 Likely free port on arrival at {arrival:%H:%M} · 🔴 likely full "
+                       f"(mean availability {availability.mean():.0%})")
+        elif layer_mode == "ChargePoint Style":
+            st.caption("🎨 Enhanced visualization with neighborhood boundaries and labels")
+        else:
+            st.caption(f"🔥 Heatmap showing station density and capacity ({len(cells)} grid cells)")
 
-# Add style description
-if layer_mode == "ChargePoint Style" and marker_style == "Green Circles (ChargePoint)":
-    st.caption("🟢 ChargePoint-style interface: Green circles show charging stations with port counts")
-elif layer_mode == "ChargePoint Style":
-    st.caption("🎨 Enhanced visualization with neighborhood boundaries and labels")
-else:
-    st.caption("🔥 Heatmap showing station density and capacity")
+    deck = pdk.Deck(
+        layers=layers,
+        initial_view_state=view_state,
+        tooltip=tooltip,
+        map_style="mapbox://styles/mapbox/light-v11",
+    )
 
-deck = pdk.Deck(
-    layers=layers,
-    initial_view_state=view_state,
-    tooltip=tooltip,
-    map_style="mapbox://styles/mapbox/light-v11",
-)
+    event = st.pydeck_chart(deck, width="stretch", on_select="rerun",
+                            selection_mode="single-object", key="station_map")
 
-st.pydeck_chart(deck, use_container_width=True)
+    # Picked marker -> details, matched by station row so a pick made before a
+    # filter change cannot open another station (clusters only have a summary)
+    picked = None
+    if layer_mode == "ChargePoint Style":
+        keys = clusters["station"].to_numpy() if clusters is not None else idx
+        picked = picked_index(event["selection"], STATION_LAYER, keys)
+    if picked is not None and clusters is not None and clusters["station_count"].iat[picked] > 1:
+        st.info(f"{clusters['station_name'].iat[picked]} with {clusters['total_ports'].iat[picked]} ports "
+                "here; zoom in to pick a single station")
+    elif picked is not None:
+        show_station(data_path, int(keys[picked]), arrival, availability_model)
+
+map_view(data_path, mask, center_lat, center_lon)
 
 # -----------------------------
 # Station details and analytics
 # -----------------------------
 if show_details:
+    order, stats = station_details(data_path, bits, mask)
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.subheader("📋 Station Details")
-        display_cols = ["station_name", "ev_network", "city", "street_address", 
-                       "ev_dc_fast_num", "ev_level2_evse_num", "capacity_proxy"]
-        
-        # Rename columns for display
-        display_df = df_filtered[display_cols].copy()
-        display_df.columns = ["Station Name", "Network", "City", "Address", 
-                             "DC Fast", "Level 2", "Capacity Score"]
-        
-        st.dataframe(
-            display_df.sort_values("Capacity Score", ascending=False).reset_index(drop=True),
-            use_container_width=True
-        )
+        # One gather of the shown columns; labels via column_config, no renamed copy
+        columns = [df.columns.get_loc(c) for c in DETAIL_COLUMNS]
+        st.dataframe(df.iloc[order, columns], column_config=DETAIL_COLUMNS, hide_index=True,
+                     width="stretch")
     
     with col2:
         st.subheader("📊 Quick Stats")
         
         # Network distribution
-        network_counts = df_filtered["ev_network"].value_counts().head(5)
         st.write("**Top Networks:**")
-        for network, count in network_counts.items():
+        for network, count in stats["top_networks"].items():
             st.write(f"• {network}: {count} stations")
         
         st.write("**Charging Types:**")
-        dc_only = (df_filtered["ev_dc_fast_num"] > 0) & (df_filtered["ev_level2_evse_num"] == 0)
-        l2_only = (df_filtered["ev_dc_fast_num"] == 0) & (df_filtered["ev_level2_evse_num"] > 0)
-        both = (df_filtered["ev_dc_fast_num"] > 0) & (df_filtered["ev_level2_evse_num"] > 0)
-        
-        st.write(f"• DC Fast Only: {dc_only.sum()}")
-        st.write(f"• Level 2 Only: {l2_only.sum()}")
-        st.write(f"• Both Types: {both.sum()}")
+        st.write(f"• DC Fast Only: {stats['dc_only']}")
+        st.write(f"• Level 2 Only: {stats['l2_only']}")
+        st.write(f"• Both Types: {stats['both']}")
+
+# -----------------------------
+# Scenario comparator (reruns on its own when its controls change)
+# -----------------------------
+CHARGER_LABELS = {"dc_fast": "DC Fast", "level2": "Level 2", "level1": "Level 1"}
+MAX_SCENARIO_STATIONS = 100
+
+@st.fragment
+def scenario_view(data_path: str, mask: np.ndarray):
+    """Pareto table and hourly price chart for the top filtered stations."""
+    df = load_stations(data_path)
+    with st.expander("⚖️ Compare Charging Options"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            session_minutes = st.slider("Session length (minutes)", 15, 180, 60, step=15)
+        with col2:
+            session_type = st.selectbox("Session type", ["Regular", "Occasional", "Emergency"])
+        with col3:
+            chargers = st.multiselect("Charger types", CHARGER_TYPES, default=["dc_fast", "level2"],
+                                      format_func=CHARGER_LABELS.get)
+
+        if chargers:
+            # Stations x 24 arrival hours x charger types, scored in one pass
+            idx = np.flatnonzero(mask)
+            capacity = df["capacity_proxy"].to_numpy()[idx]
+            candidates = idx[np.argsort(-capacity, kind="stable")[:MAX_SCENARIO_STATIONS]]
+            options = get_scenario_comparator(data_path).compare(
+                candidates, chargers=chargers, duration_min=session_minutes, session_type=session_type)
+
+            if options.empty:
+                st.info("None of the shown stations offer the selected charger types.")
+            else:
+                st.caption(f"{len(options)} options across {len(candidates)} stations; "
+                           "best trade-offs between price and availability:")
+                best = options[options["pareto"]].sort_values("price_per_kwh")
+                best = best.join(df[["station_name", "ev_network"]], on="station")
+                best["charger"] = best["charger"].map(CHARGER_LABELS)
+                st.dataframe(
+                    best[["station_name", "ev_network", "hour", "charger", "energy_kWh", "price_per_kwh",
+                          "cost", "posted_cost", "availability"]].rename(columns={
+                        "station_name": "Station", "ev_network": "Network", "hour": "Arrival Hour",
+                        "charger": "Charger", "energy_kWh": "Energy (kWh)", "price_per_kwh": "$/kWh",
+                        "cost": "Est. Cost ($)", "posted_cost": "Posted Cost ($)",
+                        "availability": "Availability"}).reset_index(drop=True),
+                    width="stretch",
+                )
+
+                st.write("**Cheapest $/kWh by arrival hour:**")
+                by_hour = options.pivot_table(index="hour", columns="charger", values="price_per_kwh", aggfunc="min")
+                st.line_chart(by_hour.rename(columns=CHARGER_LABELS))
+
+
+scenario_view(data_path, mask)
 
 # -----------------------------
 # Footer and next steps
@@ -0,0 +1,140 @@
+"""
+AFDC fetcher against a local stub server (no network).
+"""
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from evocharge.afdc_fetch import (AFDCClient, TruncatedRegionWarning, fetch_pages, fetch_region,
+                                  make_session)
+from evocharge.spatial_index import haversine_km
+
+KM_PER_MILE = 1.609344
+REGION = (32.6, -117.3, 32.9, -117.0)
+
+
+def make_stations(n_inside=1000, n_outside=100, seed=0):
+    """Stations inside ``REGION`` plus a ring just outside it."""
+    rng = np.random.default_rng(seed)
+    south, west, north, east = REGION
+    lat = rng.uniform(south, north, n_inside)
+    lon = rng.uniform(west, east, n_inside)
+    # Outside but within the circles that enclose the edge tiles
+    out_lat = rng.uniform(south, north, n_outside)
+    out_lon = np.where(rng.random(n_outside) < 0.5, west - 0.02, east + 0.02)
+    lat, lon = np.concatenate([lat, out_lat]), np.concatenate([lon, out_lon])
+    return [{"id": i, "latitude": float(a), "longitude": float(b)} for i, (a, b) in enumerate(zip(lat, lon))]
+
+
+class StubAFDC:
+    """``nearest.json`` / ``all.json`` over an in-memory station list, with scripted failures."""
+
+    def __init__(self, stations, failures=(), page_overlap=0):
+        self.stations = stations
+        self.failures = list(failures)  # status codes returned before serving normally
+        self.page_overlap = page_overlap
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with stub.lock:
+                    stub.requests.append((url.path, params))
+                    status = stub.failures.pop(0) if stub.failures else 200
+                if status != 200:
+                    self.send_response(status)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps(stub.respond(url.path, params)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def respond(self, path, params):
+        limit = int(params.get("limit", 200))
+        if path.endswith("nearest.json"):
+            lat, lon = float(params["latitude"]), float(params["longitude"])
+            radius_km = float(params["radius"]) * KM_PER_MILE
+            found = [s for s in self.stations
+                     if haversine_km(lat, lon, s["latitude"], s["longitude"]) <= radius_km]
+            return {"total_results": len(found), "fuel_stations": found[:limit]}
+        offset = int(params.get("offset", 0))
+        start = max(offset - self.page_overlap, 0)
+        return {"total_results": len(self.stations), "fuel_stations": self.stations[start:offset + limit]}
+
+    def offsets(self):
+        return sorted(int(p["offset"]) for path, p in self.requests if path.endswith("all.json"))
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FetchTestCase(unittest.TestCase):
+    def start(self, stations, **kwargs):
+        stub = StubAFDC(stations, **kwargs)
+        self.addCleanup(stub.close)
+        client = AFDCClient(api_key="TEST", base_url=stub.url, rate=0,
+                            session=make_session(backoff_factor=0))
+        return stub, client
+
+
+class FetchRegionTest(FetchTestCase):
+    def test_splits_truncated_tiles_and_clips_to_bounds(self):
+        stations = make_stations()
+        stub, client = self.start(stations)
+        result = fetch_region(REGION, client=client)
+
+        inside = {s["id"] for s in stations[:1000]}
+        ids = [s["id"] for s in result]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(set(ids), inside)
+        # 4 top-level tiles of up to 1000 stations each must have been split
+        self.assertGreater(len(stub.requests), 4)
+
+    def test_warns_when_still_truncated(self):
+        _, client = self.start(make_stations())
+        with self.assertWarns(TruncatedRegionWarning):
+            result = fetch_region(REGION, client=client, max_depth=0)
+        self.assertLess(len(result), 1000)
+
+
+class FetchPagesTest(FetchTestCase):
+    def test_offsets_and_dedup(self):
+        stations = make_stations(n_inside=450, n_outside=0)
+        stub, client = self.start(stations, page_overlap=10)
+        result = fetch_pages(client=client, page_size=200)
+
+        self.assertEqual(stub.offsets(), [0, 200, 400])
+        self.assertEqual(sorted(s["id"] for s in result), list(range(450)))
+
+    def test_retries_rate_limits_and_server_errors(self):
+        stations = make_stations(n_inside=50, n_outside=0)
+        stub, client = self.start(stations, failures=[429, 503, 500])
+        result = fetch_pages(client=client, page_size=200)
+
+        self.assertEqual(len(result), 50)
+        self.assertEqual(len(stub.requests), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
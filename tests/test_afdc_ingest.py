@@ -0,0 +1,61 @@
+"""
+AFDC record normalization: columns, dtypes and the ingest scoring.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.afdc_ingest import AFDC_FIELDS, ingest, normalize_stations
+
+RECORDS = [
+    {"id": 101, "station_name": "Mission Valley", "ev_network": "ChargePoint Network",
+     "latitude": 32.77, "longitude": -117.16, "ev_connector_types": ["J1772", "J1772COMBO"],
+     "ev_dc_fast_num": 2, "ev_level1_evse_num": None, "ev_level2_evse_num": 6,
+     "facility_type": "PARKING_GARAGE", "updated_at": "2024-03-01T12:00:00Z",
+     "ev_network_ids": {"posts": ["A1"]}},                      # not an AFDC_FIELDS column
+    {"id": 102, "station_name": "Supercharger", "ev_network": "Tesla",
+     "latitude": "32.71", "longitude": "-117.15", "ev_connector_types": ["TESLA"],
+     "ev_dc_fast_num": 12, "ev_level1_evse_num": None, "ev_level2_evse_num": None},
+    {"id": 103, "station_name": "Library", "ev_network": "Non-Networked",
+     "latitude": 32.80, "longitude": -117.20, "ev_connector_types": "J1772",
+     "ev_level2_evse_num": "2", "facility_type": "LIBRARY"},    # no DC / L1 keys at all
+]
+
+
+class NormalizeStationsTest(unittest.TestCase):
+    def test_columns_and_dtypes(self):
+        df = normalize_stations(RECORDS)
+        self.assertEqual(list(df.columns), AFDC_FIELDS)
+        self.assertEqual(len(df), 3)
+        for col in ["ev_dc_fast_num", "ev_level1_evse_num", "ev_level2_evse_num", "latitude", "longitude"]:
+            self.assertEqual(df[col].dtype, np.float64, col)
+        np.testing.assert_array_equal(df["ev_dc_fast_num"], [2, 12, np.nan])
+        np.testing.assert_array_equal(df["ev_level2_evse_num"], [6, np.nan, 2])
+        self.assertTrue(df["ev_level1_evse_num"].isna().all())
+        np.testing.assert_allclose(df["latitude"], [32.77, 32.71, 32.80])
+
+    def test_text_fields(self):
+        df = normalize_stations(RECORDS)
+        self.assertEqual(df["ev_connector_types"].tolist(), ["J1772,J1772COMBO", "TESLA", "J1772"])
+        self.assertEqual(df["facility_type"].tolist()[::2], ["PARKING_GARAGE", "LIBRARY"])
+        self.assertTrue(pd.isna(df["facility_type"].iloc[1]))
+        self.assertTrue(df["access_days_time"].isna().all())
+
+    def test_empty_payload(self):
+        df = normalize_stations([])
+        self.assertEqual(list(df.columns), AFDC_FIELDS)
+        self.assertEqual(len(df), 0)
+
+    def test_ingest_dedups_excludes_tesla_and_scores(self):
+        df_all, df_top = ingest(RECORDS + [RECORDS[0]])
+        self.assertEqual(df_all["id"].tolist(), [101, 103])
+        self.assertEqual(df_all["capacity_proxy"].tolist(), [2 + 0.25 * 6, 0.25 * 2])
+        self.assertEqual(df_top["id"].tolist(), [101, 103])
+        df_all, _ = ingest(RECORDS, exclude_tesla_networks=False)
+        self.assertEqual(df_all["id"].tolist(), [101, 102, 103])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Incremental AFDC sync against a local stub server (no network).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from evocharge import station_store
+from evocharge.afdc_fetch import AFDCClient, fetch_pages, make_session
+from evocharge.afdc_sync import STATE_FILE, STORE_FILE, sync
+from evocharge.station_store import read_snapshot
+
+
+def record(station_id, updated_at, **fields):
+    return {
+        "id": station_id, "station_name": f"Station {station_id}", "ev_network": "ChargePoint Network",
+        "city": "San Diego", "state": "CA", "zip": "92101", "street_address": f"{station_id} Main St",
+        "latitude": 32.7 + station_id / 100, "longitude": -117.1, "ev_connector_types": ["J1772"],
+        "ev_dc_fast_num": None, "ev_level1_evse_num": None, "ev_level2_evse_num": 2,
+        "updated_at": updated_at, **fields,
+    }
+
+
+class StubAFDC:
+    """``all.json`` and ``last-updated.json`` over a station list the test can replace."""
+
+    def __init__(self, stations, last_updated):
+        self.stations = stations
+        self.last_updated = last_updated
+        self.paths = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                stub.paths.append(path)
+                if path.endswith("last-updated.json"):
+                    payload = {"last_updated": stub.last_updated}
+                else:
+                    payload = {"total_results": len(stub.stations), "fuel_stations": stub.stations}
+                body = json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@unittest.skipIf(station_store.pa is None, "pyarrow is not installed")
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out_dir = tmp.name
+        self.stub = StubAFDC([record(1, "2024-01-01T10:00:00Z"), record(2, "2024-01-02T10:00:00Z"),
+                              record(3, "2024-01-03T10:00:00Z")], "2024-01-03T10:00:00Z")
+        self.addCleanup(self.stub.close)
+        self.client = AFDCClient(api_key="TEST", base_url=self.stub.url, rate=0,
+                                 session=make_session(backoff_factor=0))
+
+    def run_sync(self):
+        return sync(self.out_dir, lambda: fetch_pages(self.client, state="CA"), client=self.client)
+
+    def stored(self):
+        return read_snapshot(os.path.join(self.out_dir, STORE_FILE)).set_index("id")
+
+    def test_incremental_sync(self):
+        first = self.run_sync()
+        self.assertEqual([first[k] for k in ("added", "updated", "restored", "deleted")], [3, 0, 0, 0])
+        self.assertEqual(first["high_water_mark"], "2024-01-03T10:00:00+00:00")
+        self.assertEqual(sorted(self.stored().index), [1, 2, 3])
+
+        # The dataset has not moved: nothing is listed or written
+        self.stub.paths.clear()
+        self.assertTrue(self.run_sync()["skipped"])
+        self.assertFalse(any(p.endswith("all.json") for p in self.stub.paths))
+
+        self.stub.stations = [
+            record(1, "2024-01-01T10:00:00Z", ev_network="Blink Network"),  # edited, updated_at not bumped
+            record(2, "2024-02-01T10:00:00Z", ev_dc_fast_num=4),
+            record(4, "2024-02-01T11:00:00Z"),
+        ]
+        self.stub.last_updated = "2024-02-01T11:00:00Z"
+        second = self.run_sync()
+        self.assertEqual([second[k] for k in ("added", "updated", "restored", "deleted")], [1, 2, 0, 1])
+        self.assertEqual(second["changed_fields"], {"ev_network": 1, "ev_dc_fast_num": 1, "updated_at": 1})
+        self.assertEqual(second["high_water_mark"], "2024-02-01T11:00:00+00:00")
+
+        store = self.stored().sort_index()
+        self.assertEqual(store.index.tolist(), [1, 2, 3, 4])
+        self.assertEqual(store["deleted_at"].notna().tolist(), [False, False, True, False])
+        self.assertEqual(store.loc[1, "ev_network"], "Blink Network")
+        self.assertEqual(store.loc[2, "ev_dc_fast_num"], 4)
+        self.assertEqual(store.loc[2, "ev_connector_types"], "J1772")
+
+        with open(os.path.join(self.out_dir, STATE_FILE)) as f:
+            state = json.load(f)
+        self.assertEqual(state["stations"], 3)
+        self.assertEqual(state["high_water_mark"], second["high_water_mark"])
+
+    def test_deleted_station_is_restored(self):
+        self.run_sync()
+        removed = self.stub.stations.pop()
+        self.stub.last_updated = "2024-01-04T10:00:00Z"
+        self.assertEqual(self.run_sync()["deleted"], 1)
+
+        self.stub.stations.append(removed)
+        self.stub.last_updated = "2024-01-05T10:00:00Z"
+        summary = self.run_sync()
+        self.assertEqual([summary[k] for k in ("added", "updated", "restored", "deleted")], [0, 0, 1, 0])
+        self.assertFalse(self.stored()["deleted_at"].notna().any())
+
+
+if __name__ == "__main__":
+    unittest.main()
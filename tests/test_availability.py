@@ -0,0 +1,56 @@
+"""
+Availability on arrival: the broadcast score against a per-station loop.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.availability import MAX_BUSY, AvailabilityModel, arrival_time
+from evocharge.occupancy import MINUTES_PER_WEEK, OccupancyTimeline, to_minutes, week_slot
+
+MONDAY = pd.Timestamp("2024-11-11")
+BIN = 60
+N_BINS = MINUTES_PER_WEEK // BIN
+
+
+class AvailabilityModelTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.p_busy = rng.uniform(0, 1, N_BINS)
+        self.p_busy[[0, 5]] = 0.0
+        self.model = AvailabilityModel(self.p_busy, bin_minutes=BIN)
+
+    def test_matrix_matches_per_station_loop(self):
+        ports = np.array([0, 1, 2, 5, 12])
+        times = MONDAY + pd.to_timedelta(np.arange(0, 7 * 24 * 60, 97), unit="min")
+        got = self.model.predict(ports, times)
+        self.assertEqual(got.shape, (len(times), len(ports)))
+        p = np.minimum(self.p_busy, MAX_BUSY)[week_slot(to_minutes(times), BIN)]
+        for j, n in enumerate(ports):
+            expected = 1.0 - p ** n if n > 0 else np.zeros(len(times))
+            np.testing.assert_allclose(got[:, j], expected, atol=1e-12)
+
+    def test_scalar_time_and_idle_slots(self):
+        idle = MONDAY + pd.Timedelta(hours=5, minutes=30)  # p_busy = 0
+        np.testing.assert_array_equal(self.model.predict([0, 1, 3], idle), [0.0, 1.0, 1.0])
+        self.assertEqual(self.model.busy_probability([idle]).tolist(), [0.0])
+
+    def test_smoothing_wraps_around_the_week(self):
+        # One session in the last hour of Sunday
+        sunday = to_minutes(MONDAY + pd.Timedelta(days=6, hours=23))
+        timeline = OccupancyTimeline(["S1"], sunday, sunday + 60, bin_minutes=BIN)
+        model = AvailabilityModel.from_timeline(timeline, smoothing_minutes=2 * BIN)
+        self.assertAlmostEqual(model.p_busy.sum(), 1.0)
+        self.assertGreater(model.p_busy[0], 0.0)   # Monday 00:00
+        self.assertGreater(model.p_busy[1], 0.0)
+        self.assertEqual(model.p_busy[2], 0.0)
+
+    def test_arrival_time_is_local_wall_clock(self):
+        now = pd.Timestamp("2026-07-01 19:00", tz="UTC")
+        self.assertEqual(arrival_time(30, now=now), pd.Timestamp("2026-07-01 12:30"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Station bitmaps: filters and Quick Stats against pandas boolean filters.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.bitmap_index import StationBitmaps, popcount
+
+NETWORKS = ["ChargePoint Network", "Tesla", "Blink Network", "Non-Networked"]
+
+
+def make_stations(n=1003, seed=7):  # not a multiple of 8: the last byte is padded
+    rng = np.random.default_rng(seed)
+    network = rng.choice(NETWORKS + [None], n)
+    return pd.DataFrame({
+        "ev_network": pd.Categorical(network),
+        "access_code": rng.choice(["public", "private"], n),
+        "ev_dc_fast_num": rng.integers(0, 6, n) * (rng.random(n) < 0.4),
+        "ev_level2_evse_num": rng.integers(0, 12, n),
+    })
+
+
+class StationBitmapsTest(unittest.TestCase):
+    def setUp(self):
+        self.df = make_stations()
+        self.bitmaps = StationBitmaps(self.df)
+
+    def test_select_matches_boolean_filters(self):
+        dc, l2 = self.df["ev_dc_fast_num"], self.df["ev_level2_evse_num"]
+        cases = [
+            ({}, {}, np.ones(len(self.df), dtype=bool)),
+            ({"ev_dc_fast_num": 2}, {}, dc >= 2),
+            ({"ev_dc_fast_num": 1, "ev_level2_evse_num": 4}, {}, (dc >= 1) & (l2 >= 4)),
+            ({"ev_level2_evse_num": 3.5}, {}, l2 >= 3.5),
+            ({"ev_dc_fast_num": 99}, {}, dc >= 99),
+            ({}, {"ev_network": "Tesla"}, self.df["ev_network"] == "Tesla"),
+            ({"ev_level2_evse_num": 2}, {"ev_network": ["Tesla", "Blink Network"], "access_code": "public"},
+             (l2 >= 2) & self.df["ev_network"].isin(["Tesla", "Blink Network"])
+             & (self.df["access_code"] == "public")),
+            ({}, {"ev_network": [], "access_code": None}, np.ones(len(self.df), dtype=bool)),
+            ({}, {"ev_network": "Unknown"}, np.zeros(len(self.df), dtype=bool)),
+        ]
+        for min_counts, values, expected in cases:
+            with self.subTest(min_counts=min_counts, values=values):
+                bits = self.bitmaps.select(min_counts, **values)
+                np.testing.assert_array_equal(self.bitmaps.mask(bits), np.asarray(expected))
+                self.assertEqual(self.bitmaps.count(bits), int(np.asarray(expected).sum()))
+
+    def test_quick_stats_match_pandas(self):
+        bits = self.bitmaps.select({"ev_level2_evse_num": 3})
+        shown = self.df[self.df["ev_level2_evse_num"] >= 3]
+        expected = shown["ev_network"].value_counts()
+        got = self.bitmaps.value_counts("ev_network", bits)
+        self.assertEqual(got.to_dict(), expected[expected > 0].to_dict())
+        self.assertEqual(got.tolist(), sorted(got.tolist(), reverse=True))
+
+        dc, l2 = shown["ev_dc_fast_num"] > 0, shown["ev_level2_evse_num"] > 0
+        self.assertEqual(self.bitmaps.charger_counts(bits), {
+            "dc_only": int((dc & ~l2).sum()), "l2_only": int((~dc & l2).sum()),
+            "both": int((dc & l2).sum()), "none": int((~dc & ~l2).sum()),
+        })
+
+    def test_options_and_popcount(self):
+        self.assertEqual(self.bitmaps.options("ev_network"), sorted(NETWORKS))
+        self.assertEqual(self.bitmaps.options("facility_type"), [])
+        stacked = np.packbits(np.eye(16, dtype=bool), axis=1)
+        self.assertEqual(popcount(stacked), 16)
+        np.testing.assert_array_equal(popcount(stacked, axis=-1), np.ones(16))
+
+
+if __name__ == "__main__":
+    unittest.main()
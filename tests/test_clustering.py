@@ -0,0 +1,71 @@
+"""
+Per-zoom station clusters against a pandas groupby over the grid cells.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.clustering import MAX_ZOOM, MIN_ZOOM, ClusterPyramid, grid_cells
+
+
+def make_stations(n=3000, seed=2):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "latitude": rng.normal(32.8, 0.15, n),
+        "longitude": rng.normal(-117.1, 0.15, n),
+        "ev_dc_fast_num": rng.integers(0, 3, n) * rng.integers(0, 2, n),
+        "ev_level2_evse_num": rng.integers(0, 8, n),
+        "capacity_proxy": rng.uniform(0, 10, n),
+        "station_name": [f"Station {i}" for i in range(n)],
+        "ev_network": pd.Categorical(rng.choice(["ChargePoint", "Tesla"], n)),
+        "street_address": [f"{i} Main St" for i in range(n)],
+    })
+
+
+class ClusterPyramidTest(unittest.TestCase):
+    def setUp(self):
+        self.df = make_stations()
+        self.pyramid = ClusterPyramid(self.df)
+        self.mask = np.random.default_rng(3).random(len(self.df)) < 0.6
+
+    def test_levels_match_groupby(self):
+        rows, cols = grid_cells(self.df["latitude"], self.df["longitude"], MAX_ZOOM)
+        shown = self.df[self.mask]
+        for zoom in (MIN_ZOOM, 12, MAX_ZOOM):
+            shift = MAX_ZOOM - zoom
+            cell = pd.Series(list(zip(rows >> shift, cols >> shift)))[self.mask].to_numpy()
+            expected = shown.groupby(cell).agg(
+                station_count=("latitude", "size"), latitude=("latitude", "mean"),
+                ev_dc_fast_num=("ev_dc_fast_num", "sum"), ev_level2_evse_num=("ev_level2_evse_num", "sum"),
+                capacity_proxy=("capacity_proxy", "sum"),
+            ).sort_values(["station_count", "latitude"]).reset_index(drop=True)
+            got = self.pyramid.level(zoom, self.mask)
+            got = got[expected.columns].sort_values(["station_count", "latitude"]).reset_index(drop=True)
+            pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+
+    def test_clusters_nest_across_zooms(self):
+        counts = [len(self.pyramid.level(zoom, self.mask)) for zoom in range(MIN_ZOOM, MAX_ZOOM + 1)]
+        self.assertEqual(counts, sorted(counts))
+        for zoom in range(MIN_ZOOM, MAX_ZOOM + 1):
+            level = self.pyramid.level(zoom, self.mask)
+            self.assertEqual(level["station_count"].sum(), self.mask.sum())
+            self.assertEqual(level["total_ports"].sum(),
+                             self.df.loc[self.mask, ["ev_dc_fast_num", "ev_level2_evse_num"]].to_numpy().sum())
+
+    def test_singletons_keep_their_station(self):
+        level = self.pyramid.level(MAX_ZOOM, self.mask)
+        single = level[level["station_count"] == 1]
+        self.assertGreater(len(single), 0)
+        self.assertTrue(self.mask[single["station"]].all())
+        self.assertEqual(single["station_name"].tolist(),
+                         self.df["station_name"].to_numpy()[single["station"]].tolist())
+        several = level[level["station_count"] > 1]
+        self.assertTrue((several["ev_network"] == "Multiple stations").all())
+        # Zooms outside the pyramid clamp to its ends
+        pd.testing.assert_frame_equal(self.pyramid.level(MAX_ZOOM + 3, self.mask), level)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Connector bitmasks against token-set filters over the raw connector strings.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.connectors import (CONNECTOR_TYPES, OTHER_BIT, add_connector_mask, connector_mask,
+                                  connector_names, has_all, has_any, present_types)
+
+
+def tokens(value):
+    return set(str(value).upper().replace(",", " ").split()) if isinstance(value, str) else set()
+
+
+class ConnectorMaskTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        # Both the comma-joined AFDC form and the space-separated Kaggle form
+        self.values = [
+            None if rng.random() < 0.05 else
+            (", " if rng.random() < 0.5 else " ").join(
+                rng.choice(CONNECTOR_TYPES, rng.integers(1, 4), replace=False)).lower()
+            for _ in range(500)
+        ]
+        self.masks = connector_mask(self.values)
+
+    def test_filters_match_token_sets(self):
+        for names in (["J1772COMBO"], ["J1772COMBO", "TESLA"], ["CHADEMO", "J1772", "NEMA515"], []):
+            with self.subTest(names=names):
+                np.testing.assert_array_equal(has_all(self.masks, names),
+                                              [set(names) <= tokens(v) for v in self.values])
+                np.testing.assert_array_equal(has_any(self.masks, names),
+                                              [bool(set(names) & tokens(v)) for v in self.values])
+
+    def test_round_trip_and_unknown_tokens(self):
+        for value, mask in zip(self.values, self.masks):
+            self.assertEqual(set(connector_names(mask)), tokens(value))
+        self.assertEqual(self.masks.dtype, np.uint16)
+        other = connector_mask(["J1772 NACS_FUTURE", np.nan])
+        self.assertEqual(other.tolist(), [OTHER_BIT | 1 << CONNECTOR_TYPES.index("J1772"), 0])
+        self.assertEqual(connector_names(other[0]), ["J1772"])
+        self.assertEqual(present_types(connector_mask(["TESLA", "CHADEMO,TESLA"])), ["CHADEMO", "TESLA"])
+
+    def test_add_connector_mask_reads_either_column(self):
+        kaggle = add_connector_mask(pd.DataFrame({"EV Connector Types": ["CHADEMO J1772COMBO"]}))
+        afdc = add_connector_mask(pd.DataFrame({"ev_connector_types": ["CHADEMO,J1772COMBO"]}))
+        self.assertEqual(kaggle["connector_mask"].tolist(), afdc["connector_mask"].tolist())
+        self.assertEqual(add_connector_mask(pd.DataFrame({"x": [1, 2]}))["connector_mask"].tolist(), [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Energy model artifacts, lazy loading and micro-batched predictions.
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from evocharge.energy_model import (
+    FEATURES_FILE, MODEL_FILE, SCALER_FILE, EnergyPredictor, MicroBatcher, make_features, train_and_save,
+)
+from evocharge.session_analytics import SESSIONS_CSV
+
+SESSIONS = pd.DataFrame({
+    "duration_min": [30, 95, 240],
+    "session_type": ["Regular", "Emergency", "Occasional"],
+    "start_time": ["2024-01-01 08:15:00", "2024-01-06 17:40:00", "2024-01-03 23:05:00"],
+})
+FEATURES = list(make_features(SESSIONS).columns)
+
+
+class StubScaler:
+    def __init__(self, feature_names, delay=0.0):
+        self.feature_names_in_ = np.array(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+        self.delay = delay
+
+    def __setstate__(self, state):
+        # Slow unpickling stands in for a large artifact
+        time.sleep(state["delay"])
+        self.__dict__.update(state)
+
+    def transform(self, X):
+        return np.asarray(X, dtype=float)
+
+
+class StubModel:
+    """Predicts the session duration in minutes."""
+
+    n_features_in_ = len(FEATURES)
+
+    def predict(self, X):
+        return X[:, FEATURES.index("duration_min")]
+
+
+def write_artifacts(model_dir, feature_names=FEATURES, scaler=None):
+    joblib.dump(StubModel(), os.path.join(model_dir, MODEL_FILE))
+    joblib.dump(scaler or StubScaler(feature_names), os.path.join(model_dir, SCALER_FILE))
+    joblib.dump(feature_names, os.path.join(model_dir, FEATURES_FILE))
+
+
+class EnergyPredictorTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.model_dir = tmp.name
+
+    def test_predicts_with_stub_artifacts(self):
+        write_artifacts(self.model_dir)
+        predictor = EnergyPredictor(self.model_dir)
+        self.assertTrue(predictor.available())
+        np.testing.assert_array_equal(predictor.predict(SESSIONS), [30, 95, 240])
+        self.assertEqual(len(predictor.predict(SESSIONS.iloc[:0])), 0)
+
+    def test_feature_order_mismatch_is_rejected(self):
+        write_artifacts(self.model_dir, scaler=StubScaler(FEATURES[::-1]))
+        with self.assertRaisesRegex(ValueError, "scaler was fitted on features"):
+            EnergyPredictor(self.model_dir).load()
+
+    def test_feature_count_mismatch_is_rejected(self):
+        write_artifacts(self.model_dir, feature_names=FEATURES[:-1], scaler=StubScaler(FEATURES[:-1]))
+        with self.assertRaisesRegex(ValueError, "model expects"):
+            EnergyPredictor(self.model_dir).load()
+
+    def test_predict_waits_for_load_async(self):
+        write_artifacts(self.model_dir, scaler=StubScaler(FEATURES, delay=0.2))
+        predictor = EnergyPredictor(self.model_dir).load_async()
+        self.assertIsNone(predictor.model)
+        np.testing.assert_array_equal(predictor.predict(SESSIONS), [30, 95, 240])
+
+    def test_train_and_save(self):
+        sessions = pd.read_csv(SESSIONS_CSV).head(60)
+        train_and_save(sessions, self.model_dir)
+        predictor = EnergyPredictor(self.model_dir)
+        self.assertTrue(predictor.available())
+        self.assertEqual(predictor.load().feature_names, FEATURES)
+        predictions = predictor.predict(sessions)
+        self.assertEqual(predictions.shape, (60,))
+        self.assertTrue(np.isfinite(predictions).all())
+
+
+class RecordingPredictor:
+    """Duration as the prediction; records batch sizes, optionally fails."""
+
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    def predict(self, df):
+        self.batches.append(len(df))
+        if self.error is not None:
+            raise self.error
+        return df["duration_min"].to_numpy(dtype=float)
+
+
+class MicroBatcherTest(unittest.TestCase):
+    def test_every_future_gets_its_result(self):
+        predictor = RecordingPredictor()
+        batcher = MicroBatcher(predictor, max_wait=0.5)
+        futures = [batcher.submit({"duration_min": d}) for d in range(5)]
+        self.assertEqual([f.result(timeout=5) for f in futures], [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(predictor.batches, [5])
+
+    def test_requests_from_many_threads(self):
+        batcher = MicroBatcher(RecordingPredictor(), max_batch=4)
+        results = {}
+
+        def ask(d):
+            results[d] = batcher.predict_one({"duration_min": d}, timeout=5)
+
+        threads = [threading.Thread(target=ask, args=(d,)) for d in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {d: float(d) for d in range(10)})
+
+    def test_exception_reaches_every_future(self):
+        error = ValueError("Missing model features: ['hour']")
+        batcher = MicroBatcher(RecordingPredictor(error), max_wait=0.5)
+        futures = [batcher.submit({"duration_min": d}) for d in range(3)]
+        for future in futures:
+            self.assertIs(future.exception(timeout=5), error)
+        # The worker keeps serving after a failed batch
+        batcher.predictor.error = None
+        self.assertEqual(batcher.predict_one({"duration_min": 7}, timeout=5), 7.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
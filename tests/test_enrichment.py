@@ -0,0 +1,40 @@
+"""
+Station county/rate enrichment: normalized ZIPs next to the untouched source column.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.enrichment import enrich_chunk
+
+
+class FakeLookup:
+    """San Diego for 921xx ZIPs, nothing else."""
+
+    def lookup(self, zips, state=None):
+        zips = np.asarray(zips)
+        return np.where((zips >= 92100) & (zips < 92200), "San Diego", None)
+
+
+RATES = pd.DataFrame({"rate_per_kwh": [0.35], "rate_tier": ["High"]},
+                     index=pd.Index(["San Diego"], name="county_name"))
+
+
+class EnrichChunkTest(unittest.TestCase):
+    def test_source_zip_is_left_as_is(self):
+        chunk = pd.DataFrame({
+            "Station Name": ["A", "B", "C", "D", "E"],
+            "State": ["CA", "CA", "CA", "CA", "NV"],
+            "ZIP": ["92101.0", "9048", "G9N 0", "92101-1234", "89501"],
+        })
+        out = enrich_chunk(chunk, FakeLookup(), RATES)
+        self.assertEqual(out["ZIP"].tolist(), ["92101.0", "9048", "G9N 0", "92101-1234"])
+        self.assertEqual(out["zip_code"].tolist(), ["92101", pd.NA, pd.NA, "92101"])
+        self.assertEqual(out["county_name"].tolist(), ["San Diego", pd.NA, pd.NA, "San Diego"])
+        np.testing.assert_array_equal(out["electricity_rate_per_kwh"], [0.35, np.nan, np.nan, 0.35])
+
+
+if __name__ == "__main__":
+    unittest.main()
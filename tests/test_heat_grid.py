@@ -0,0 +1,72 @@
+"""
+Heatmap grid cells: incremental mask updates against a rebuild and a groupby.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.clustering import MAX_ZOOM, grid_cells
+from evocharge.heat_grid import HEAT_CELL_PX, HeatGrid
+
+
+def make_stations(n=4000, seed=5):
+    rng = np.random.default_rng(seed)
+    dc = rng.integers(0, 4, n) * (rng.random(n) < 0.3)
+    l2 = rng.integers(0, 10, n)
+    return pd.DataFrame({
+        "latitude": rng.normal(32.8, 0.2, n),
+        "longitude": rng.normal(-117.1, 0.2, n),
+        "capacity_proxy": rng.uniform(0, 20, n),
+        "ev_dc_fast_num": dc,
+        "total_ports": dc + l2,
+    })
+
+
+def sorted_cells(cells):
+    return cells.sort_values(["latitude", "longitude"]).reset_index(drop=True)
+
+
+class HeatGridTest(unittest.TestCase):
+    def setUp(self):
+        self.df = make_stations()
+        self.grid = HeatGrid(self.df)
+
+    def test_cells_match_groupby(self):
+        zoom = 11
+        mask = self.df["capacity_proxy"].to_numpy() > 5
+        rows, cols = grid_cells(self.df["latitude"], self.df["longitude"], MAX_ZOOM, HEAT_CELL_PX)
+        shift = MAX_ZOOM - zoom
+        shown = self.df[mask].assign(cell=((rows >> shift) << 32 | (cols >> shift))[mask],
+                                     dc=(self.df["ev_dc_fast_num"] > 0)[mask])
+        expected = shown.groupby("cell").agg(
+            latitude=("latitude", "mean"), longitude=("longitude", "mean"),
+            station_count=("latitude", "size"), capacity_sum=("capacity_proxy", "sum"),
+            capacity_mean=("capacity_proxy", "mean"), total_ports=("total_ports", "sum"),
+            dc_fast_share=("dc", "mean"),
+        )
+        got = self.grid.aggregate(zoom, mask).cells()
+        pd.testing.assert_frame_equal(sorted_cells(got), sorted_cells(expected.reset_index(drop=True)),
+                                      check_dtype=False)
+
+    def test_incremental_updates_match_a_rebuild(self):
+        rng = np.random.default_rng(6)
+        agg = self.grid.aggregate(12, np.zeros(len(self.df), dtype=bool))
+        mask = rng.random(len(self.df)) < 0.5
+        for step in range(12):
+            # Small toggles (incremental path) mixed with big jumps (rebuild path)
+            flip = rng.random(len(self.df)) < (0.01 if step % 3 else 0.9)
+            mask = mask ^ flip
+            agg.update(mask)
+            pd.testing.assert_frame_equal(sorted_cells(agg.cells()),
+                                          sorted_cells(self.grid.aggregate(12, mask).cells()))
+        self.assertEqual(agg.cells()["station_count"].sum(), mask.sum())
+
+    def test_zoom_is_clamped(self):
+        self.assertEqual(self.grid.aggregate(99).zoom, MAX_ZOOM)
+        self.assertEqual(self.grid.aggregate(MAX_ZOOM).cells()["station_count"].sum(), len(self.df))
+
+
+if __name__ == "__main__":
+    unittest.main()
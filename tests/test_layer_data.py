@@ -0,0 +1,41 @@
+"""
+Packed pydeck layer records and resolving map picks by station key.
+"""
+
+import unittest
+
+import numpy as np
+
+from evocharge.layer_data import pack_records, picked_index
+
+
+def pick(records, i, layer="stations"):
+    """Selection state as st.pydeck_chart reports a click on ``records[i]``."""
+    return {"indices": {layer: [i]}, "objects": {layer: [records[i]]}}
+
+
+class PickedIndexTest(unittest.TestCase):
+    def test_pick_resolves_by_key(self):
+        keys = np.array([4, 9, 2])
+        records = pack_records([1.0, 2.0, 3.0], [4.0, 5.0, 6.0], name=["a", "b", "c"], key=keys)
+        self.assertEqual(records[1], {"p": [2.0, 5.0], "n": "b", "k": 9})
+        self.assertEqual(picked_index(pick(records, 1), "stations", keys), 1)
+
+    def test_stale_pick_follows_the_station_or_clears(self):
+        before = pack_records([1.0, 2.0, 3.0], [4.0, 5.0, 6.0], key=[4, 9, 2])
+        selection = pick(before, 1)
+        # Filters changed: station 9 moved to position 0, position 1 is another station
+        self.assertEqual(picked_index(selection, "stations", np.array([9, 2])), 0)
+        # Station 9 is no longer shown, although index 1 is still in range
+        self.assertIsNone(picked_index(selection, "stations", np.array([4, 2, 7])))
+
+    def test_no_pick(self):
+        keys = np.array([0, 1])
+        self.assertIsNone(picked_index(None, "stations", keys))
+        self.assertIsNone(picked_index({"indices": {}, "objects": {}}, "stations", keys))
+        unkeyed = pack_records([1.0], [2.0])
+        self.assertIsNone(picked_index(pick(unkeyed, 0), "stations", keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Occupancy step function and weekly profile against hand-built intervals.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.occupancy import MINUTES_PER_WEEK, OccupancyTimeline, to_minutes, weekly_counts, week_slot
+
+MONDAY = pd.Timestamp("2024-11-11")  # a Monday
+
+
+def at(day, hour, minute=0):
+    return int(to_minutes(MONDAY + pd.Timedelta(days=day, hours=hour, minutes=minute))[0])
+
+
+# (station, start, end): overlapping, back-to-back, touching and overnight intervals
+INTERVALS = [
+    ("S1", at(0, 9), at(0, 11)),
+    ("S1", at(0, 10), at(0, 12)),
+    ("S1", at(0, 12), at(0, 13)),        # starts as the previous one ends
+    ("S1", at(6, 23), at(7, 1)),         # Sunday night into the next Monday
+    ("S2", at(0, 10, 30), at(0, 10, 45)),
+    ("S2", at(2, 8), at(2, 8)),          # empty, dropped
+    ("S3", at(1, 0), at(1, 0) + 2 * MINUTES_PER_WEEK + 60),  # longer than a week
+    (None, at(0, 10), at(0, 11)),        # no station id, dropped
+]
+
+
+def brute_force(station, minute):
+    return sum(s == station and start <= minute < end for s, start, end in INTERVALS)
+
+
+class OccupancyTimelineTest(unittest.TestCase):
+    def setUp(self):
+        stations, start, end = zip(*INTERVALS)
+        self.timeline = OccupancyTimeline(stations, start, end)
+
+    def test_step_function_matches_hand_count(self):
+        self.assertEqual(self.timeline.occupancy_at("S1", MONDAY + pd.Timedelta(hours=10, minutes=15))[0], 2)
+        self.assertEqual(self.timeline.occupancy_at("S1", MONDAY + pd.Timedelta(hours=12))[0], 1)
+        self.assertEqual(self.timeline.occupancy_at("S1", MONDAY + pd.Timedelta(hours=13))[0], 0)
+        minutes = np.arange(at(0, 8), at(7, 2), 7)
+        for station in ("S1", "S2", "S3", "S4"):
+            with self.subTest(station=station):
+                got = self.timeline.occupancy_at(station, pd.to_datetime(minutes, unit="m"))
+                np.testing.assert_array_equal(got, [brute_force(station, m) for m in minutes])
+
+    def test_weekly_counts_match_hand_count(self):
+        stations, start, end = zip(*INTERVALS)
+        named = [s is not None for s in stations]
+        rows = pd.Index(["S1", "S2", "S3"]).get_indexer(np.asarray(stations, dtype=object)[named])
+        counts = weekly_counts(rows, np.asarray(start)[named], np.asarray(end)[named], 3, bin_minutes=60)
+        # A slot is covered when an interval spans the slot's start minute
+        for row, station in enumerate(["S1", "S2", "S3"]):
+            expected = np.zeros(MINUTES_PER_WEEK // 60)
+            for s, a, b in INTERVALS:
+                if s == station:
+                    for m in range(a, b):
+                        if m % 60 == 0:
+                            expected[week_slot(m, 60)] += 1
+            np.testing.assert_array_equal(counts[row], expected)
+
+    def test_profile_averages_over_observed_weeks(self):
+        sunday_night = MONDAY + pd.Timedelta(days=6, hours=23, minutes=30)
+        seen = self.timeline.weeks_observed[week_slot(to_minutes(sunday_night), self.timeline.bin_minutes)[0]]
+        self.assertEqual(self.timeline.expected_at("S1", sunday_night)[0], np.float32(1 / seen))
+        self.assertEqual(self.timeline.expected_at("unknown", sunday_night)[0], 0.0)
+        with self.assertRaises(KeyError):
+            self.timeline.weekly_profile("unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+access_days_time parsing into weekly opening-hour bitmaps.
+"""
+
+import unittest
+
+import pandas as pd
+
+from evocharge.opening_hours import compile_hours, open_at, parse_hours
+
+# A Monday; day offsets below are Monday = 0
+MONDAY = pd.Timestamp("2026-10-19")
+
+
+def is_open(text, day, hour):
+    return bool(open_at(compile_hours([text]), MONDAY + pd.Timedelta(days=day, hours=hour))[0])
+
+
+class ParseHoursTest(unittest.TestCase):
+    def test_daily_and_per_day_lists(self):
+        self.assertTrue(is_open("24 hours daily", 6, 3))
+        text = "Mon: 6:00am-11:59pm; Tue: 6:00am-11:59pm; Sun: 9:00am-7:00pm"
+        self.assertTrue(is_open(text, 0, 23))
+        self.assertFalse(is_open(text, 0, 5))
+        self.assertFalse(is_open(text, 2, 12))
+        self.assertTrue(is_open(text, 6, 18))
+
+    def test_comma_separated_groups_with_single_letter_days(self):
+        text = "7:30am-6pm M-Th, 7:30am-5pm F"
+        self.assertTrue(is_open(text, 3, 17))
+        self.assertTrue(is_open(text, 4, 16))
+        self.assertFalse(is_open(text, 4, 17))
+        self.assertFalse(is_open(text, 5, 12))
+
+    def test_day_lists_share_times(self):
+        text = "Mon, Wed, Fri 8am-5pm"
+        self.assertTrue(is_open(text, 2, 9))
+        self.assertFalse(is_open(text, 1, 9))
+
+    def test_day_ranges_written_out(self):
+        for text in ["Monday through Friday 8am to 5pm", "Mon thru Fri 8am-5pm", "Mon to Fri 8am-5pm"]:
+            with self.subTest(text=text):
+                for day in range(5):
+                    self.assertTrue(is_open(text, day, 9))
+                self.assertFalse(is_open(text, 5, 9))
+                self.assertFalse(is_open(text, 2, 18))
+
+    def test_noon_and_midnight(self):
+        text = "Mon-Fri 7am-6pm; Sat 8am-noon"
+        self.assertTrue(is_open(text, 5, 11))
+        self.assertFalse(is_open(text, 5, 12))
+        self.assertTrue(is_open(text, 0, 17))
+        text = "Daily 6am to midnight"
+        self.assertTrue(is_open(text, 3, 23))
+        self.assertFalse(is_open(text, 4, 0))
+        self.assertTrue(is_open("Sun 12 noon-5pm", 6, 12))
+
+    def test_closed_days_and_overnight(self):
+        self.assertFalse(is_open("M-F 7am-7pm; Sat-Sun closed", 5, 12))
+        text = "9am-5pm; closed Sunday"
+        self.assertFalse(is_open(text, 6, 10))
+        self.assertTrue(is_open(text, 5, 10))
+        # An overnight span from Saturday still runs into the closed Sunday
+        self.assertTrue(is_open("Sat 8pm-2am; Sun closed", 6, 1))
+        self.assertTrue(is_open("10pm-2am Fri-Sat", 6, 1))
+
+    def test_partial_or_unreadable_hours_stay_open(self):
+        for text in ["Dealership business hours", "Mon-Fri", "8am-5pm m, w, f",
+                     "Monday until Friday 8am-5pm", None]:
+            with self.subTest(text=text):
+                if text is not None:
+                    self.assertIsNone(parse_hours(text))
+                self.assertTrue(is_open(text, 2, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
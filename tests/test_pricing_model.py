@@ -0,0 +1,96 @@
+"""
+Vectorized price estimates on a hand-built station table.
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from evocharge.pricing_model import CHARGER_TYPES, PricingEngine, station_modifiers
+from evocharge.zip_county import parse_zip5
+
+# AFDC column names; rates come from the ZIP -> county lookup
+STATIONS = pd.DataFrame({
+    "ev_network": ["ChargePoint Network", "Non-Networked", "Tesla"],
+    "access_code": ["public", "private", "public"],
+    "facility_type": ["PARKING_GARAGE", "MALL", np.nan],
+    "ev_dc_fast_num": [2, 0, 0],
+    "ev_level2_evse_num": [4, 2, 0],
+    "ev_level1_evse_num": [0, 0, 1],
+    "zip": ["92101", "90012-1234", "99999"],
+})
+REFERENCE_RATE = 0.30
+
+
+class FakeLookup:
+    """San Diego and Los Angeles for one ZIP each, nothing else."""
+
+    def lookup(self, zips, state=None):
+        counties = {92101: "San Diego", 90012: "Los Angeles"}
+        return np.array([counties.get(z) for z in parse_zip5(zips).tolist()], dtype=object)
+
+
+RATES = pd.DataFrame({"rate_per_kwh": [0.40, 0.20]}, index=pd.Index(["San Diego", "Los Angeles"], name="county_name"))
+
+
+class PricingEngineTest(unittest.TestCase):
+    def setUp(self):
+        for target, value in [("evocharge.zip_county.load_lookup", FakeLookup()),
+                              ("evocharge.enrichment.load_rates", RATES)]:
+            patcher = mock.patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.engine = PricingEngine(STATIONS, reference_rate=REFERENCE_RATE)
+
+    def test_modifiers_multiply(self):
+        modifiers = station_modifiers(STATIONS, reference_rate=REFERENCE_RATE)
+        np.testing.assert_allclose(modifiers["network_factor"], [1.125, 1.0, 1.125])
+        np.testing.assert_allclose(modifiers["access_factor"], [1.15, 1.0, 1.15])
+        np.testing.assert_allclose(modifiers["facility_factor"], [1.25, 1.0, 1.0])
+        # 99999 has no county, so no location adjustment
+        np.testing.assert_allclose(modifiers["location_factor"], [0.40 / 0.30, 0.20 / 0.30, 1.0])
+        np.testing.assert_allclose(modifiers["station_factor"],
+                                   modifiers.drop(columns="station_factor").prod(axis=1))
+
+    def test_base_price_by_charger_type(self):
+        np.testing.assert_array_equal(self.engine.base, [[0.50, 0.25, np.nan],
+                                                         [np.nan, 0.25, np.nan],
+                                                         [np.nan, np.nan, 0.125]])
+        self.assertTrue(np.isnan(self.engine.price_per_kwh(1, 12, "dc_fast")))
+        self.assertTrue(np.isnan(self.engine.price_per_kwh(0, 12, "level1")))
+
+    def test_default_charger_is_the_fastest_type(self):
+        self.assertEqual([CHARGER_TYPES[i] for i in self.engine.default_charger], ["dc_fast", "level2", "level1"])
+        no_ports = PricingEngine(STATIONS.assign(ev_dc_fast_num=0, ev_level2_evse_num=0, ev_level1_evse_num=0),
+                                 reference_rate=REFERENCE_RATE)
+        self.assertEqual([CHARGER_TYPES[i] for i in no_ports.default_charger], ["level2"] * 3)
+
+    def test_peak_and_off_peak(self):
+        factor = self.engine.station_factor[0]
+        # 3am off-peak, noon baseline, 5pm peak
+        np.testing.assert_allclose(self.engine.price_per_kwh(0, [3, 12, 17]),
+                                   [0.50 * factor * 0.9, 0.50 * factor, 0.50 * factor * 1.2])
+        self.assertEqual(self.engine.breakdown(0, 17)["time_of_day_factor"], 1.2)
+
+    def test_cost_broadcasts_scenarios(self):
+        kwh, hours = np.array([10.0, 20.0]), np.array([[3], [17]])
+        cost = self.engine.cost(2, kwh, hours)
+        self.assertEqual(cost.shape, (2, 2))
+        np.testing.assert_allclose(cost, kwh * self.engine.price_per_kwh(2, hours))
+
+    def test_rate_column_skips_the_zip_lookup(self):
+        kaggle = pd.DataFrame({
+            "EV Network": ["Blink Network", "Non-Networked"],
+            "EV DC Fast Count": [1, 0],
+            "EV Level2 EVSE Num": [0, 3],
+            "electricity_rate_per_kwh": [0.60, np.nan],
+        })
+        modifiers = station_modifiers(kaggle, reference_rate=REFERENCE_RATE)
+        np.testing.assert_allclose(modifiers["location_factor"], [2.0, 1.0])
+        np.testing.assert_allclose(modifiers["station_factor"], [1.125 * 1.15 * 2.0, 1.15])
+
+
+if __name__ == "__main__":
+    unittest.main()
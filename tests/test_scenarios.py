@@ -0,0 +1,106 @@
+"""
+Scenario comparator: per-date energy predictions and the Pareto front
+against a brute-force pairwise check.
+"""
+
+import threading
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge import scenarios
+from evocharge.pricing_model import CHARGER_TYPES
+from evocharge.scenarios import ScenarioComparator, pareto_front
+
+MONDAY = pd.Timestamp("2026-10-19")
+
+
+class FlatPricing:
+    """$0.40/kWh on every charger a station has ports for."""
+
+    def __init__(self, ports):
+        self.ports = np.asarray(ports)
+
+    def price_per_kwh(self, stations, hours, charger):
+        stations, hours, charger = np.broadcast_arrays(stations, hours, charger)
+        return np.where(self.ports[stations, charger] > 0, 0.40, np.nan)
+
+
+class WeekdayPredictor:
+    """kWh = day of week + 1, so every date of the week predicts differently."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, rows):
+        self.calls += 1
+        return pd.to_datetime(rows["start_time"]).dt.dayofweek.to_numpy() + 1.0
+
+
+def brute_force_front(cost, availability):
+    return np.array([not any(c2 <= c and a2 >= a and (c2 < c or a2 > a)
+                             for c2, a2 in zip(cost, availability))
+                     for c, a in zip(cost, availability)])
+
+
+class EnergyCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.predictor = WeekdayPredictor()
+        self.comparator = ScenarioComparator(FlatPricing([[0, 2, 0]]), predictor=self.predictor)
+
+    def energy(self, day):
+        result = self.comparator.compare([0], hours=[8, 9], chargers=["level2"], duration_min=600, day=day)
+        return result["energy_kWh"].to_numpy()
+
+    def test_each_weekday_has_its_own_prediction(self):
+        np.testing.assert_array_equal(self.energy(MONDAY), [1.0, 1.0])
+        np.testing.assert_array_equal(self.energy(MONDAY + pd.Timedelta(days=1)), [2.0, 2.0])
+        np.testing.assert_array_equal(self.energy(MONDAY + pd.Timedelta(days=6)), [7.0, 7.0])
+        self.energy(MONDAY)
+        self.assertEqual(self.predictor.calls, 3)
+
+    def test_cache_is_bounded(self):
+        for i in range(scenarios.ENERGY_CACHE_SIZE + 10):
+            self.energy(MONDAY + pd.Timedelta(days=i))
+        self.assertEqual(len(self.comparator._energy_cache), scenarios.ENERGY_CACHE_SIZE)
+
+    def test_concurrent_sessions_share_the_cache(self):
+        errors = []
+
+        def session(offset):
+            try:
+                for i in range(40):
+                    day = MONDAY + pd.Timedelta(days=(offset + i) % (scenarios.ENERGY_CACHE_SIZE + 20))
+                    np.testing.assert_array_equal(self.energy(day), [day.dayofweek + 1.0] * 2)
+            except Exception as e:  # surfaced on the main thread below
+                errors.append(e)
+
+        threads = [threading.Thread(target=session, args=(k * 37,)) for k in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(self.comparator._energy_cache), scenarios.ENERGY_CACHE_SIZE)
+
+
+class ParetoFrontTest(unittest.TestCase):
+    def test_matches_pairwise_dominance(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            # Coarse values so ties on one or both axes are common
+            cost = rng.integers(0, 8, 60) / 4
+            availability = rng.integers(0, 5, 60) / 4
+            np.testing.assert_array_equal(pareto_front(cost, availability),
+                                          brute_force_front(cost, availability))
+
+    def test_compare_drops_chargers_a_station_lacks(self):
+        comparator = ScenarioComparator(FlatPricing([[1, 0, 0], [0, 2, 1]]))
+        result = comparator.compare([0, 1], hours=[10], day=MONDAY)
+        self.assertEqual(list(zip(result["station"], result["charger"])),
+                         [(0, CHARGER_TYPES[0]), (1, CHARGER_TYPES[1]), (1, CHARGER_TYPES[2])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Session cubes over the bundled sessions sample against pandas groupbys.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.session_analytics import SESSIONS_CSV, SessionAnalytics, Vocabulary
+
+
+class SessionAnalyticsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.sessions = pd.read_csv(SESSIONS_CSV)
+        cls.sessions["hour"] = pd.to_datetime(cls.sessions["start_time"]).dt.hour
+        # Small chunks so stations and users keep appearing across updates
+        cls.analytics = SessionAnalytics.from_csv(SESSIONS_CSV, chunksize=500)
+
+    def test_cube_matches_groupby(self):
+        expected = self.sessions.groupby(["station_id", "hour", "session_day"]).agg(
+            sessions=("session_id", "size"), energy_kWh=("energy_kWh", "sum"),
+            mean_duration_min=("duration_min", "mean"))
+        got = self.analytics.to_frame().set_index(["station_id", "hour", "session_day"])
+        got = got.reindex(expected.index)
+        np.testing.assert_array_equal(got["sessions"], expected["sessions"])
+        np.testing.assert_allclose(got["energy_kWh"], expected["energy_kWh"])
+        np.testing.assert_allclose(got["mean_duration_min"], expected["mean_duration_min"])
+        self.assertEqual(self.analytics.n_sessions, len(self.sessions))
+
+    def test_slices_match_filters(self):
+        station = self.sessions["station_id"].iloc[0]
+        sub = self.sessions[(self.sessions["station_id"] == station)
+                            & (self.sessions["session_day"] == "Weekend")]
+        hourly = self.analytics.hourly(station, "Weekend")
+        np.testing.assert_array_equal(hourly["sessions"],
+                                      sub.groupby("hour").size().reindex(range(24), fill_value=0))
+        hour = int(sub["hour"].iloc[0])
+        cell = self.analytics.cell(station, hour, "Weekend")
+        self.assertEqual(cell["sessions"], (sub["hour"] == hour).sum())
+        self.assertAlmostEqual(cell["energy_kWh"], sub.loc[sub["hour"] == hour, "energy_kWh"].sum())
+        with self.assertRaises(KeyError):
+            self.analytics.hourly("no such station")
+
+    def test_users_match_groupby(self):
+        by_user = self.analytics.by_user().sort_index()
+        expected = self.sessions.groupby("user_id").agg(
+            sessions=("session_id", "size"), energy_kWh=("energy_kWh", "sum"))
+        np.testing.assert_array_equal(by_user["sessions"], expected["sessions"])
+        np.testing.assert_allclose(by_user["energy_kWh"], expected["energy_kWh"])
+        counts = self.sessions.groupby(["user_id", "session_type"]).size().unstack(fill_value=0)
+        top = counts.max(axis=1)
+        for user, preferred in by_user["preferred_session_type"].items():
+            self.assertEqual(counts.loc[user, preferred], top[user])
+
+    def test_chunking_does_not_change_the_cubes(self):
+        whole = SessionAnalytics.from_frame(self.sessions)
+        pd.testing.assert_frame_equal(whole.by_station().sort_index(),
+                                      self.analytics.by_station().sort_index())
+
+    def test_missing_ids_are_not_counted_under_other_ids(self):
+        np.testing.assert_array_equal(Vocabulary().encode(["a", "b", None, "a", np.nan]), [0, 1, -1, 0, -1])
+        rows = self.sessions.head(6).copy()
+        rows.loc[rows.index[1], "station_id"] = None
+        rows.loc[rows.index[2], "user_id"] = np.nan
+        analytics = SessionAnalytics.from_frame(rows)
+        kept = rows.drop(rows.index[[1, 2]])
+        self.assertEqual(analytics.n_sessions, 4)
+        self.assertEqual(sorted(analytics.stations.index), sorted(kept["station_id"].unique()))
+        self.assertEqual(sorted(analytics.users.index), sorted(kept["user_id"].unique()))
+        self.assertEqual(analytics.by_station()["sessions"].sum(), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
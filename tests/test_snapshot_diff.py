@@ -0,0 +1,83 @@
+"""
+Station snapshot diff: id and name/address/ZIP matching on hand-built snapshots.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge.snapshot_diff import diff_snapshots, station_keys
+
+OLD = pd.DataFrame({
+    "id": [1, 2, 3, 4],
+    "station_name": ["Alpha", "Beta", "Gamma", "Delta"],
+    "ev_network": ["ChargePoint", "Tesla", "Blink", "EVgo"],
+    "ev_dc_fast_num": [0, 4, 2, np.nan],
+    "latitude": [32.7, 32.8, 32.9, 33.0],
+})
+
+
+class DiffSnapshotsTest(unittest.TestCase):
+    def test_id_join(self):
+        new = pd.DataFrame({
+            "id": [4, 2, 3, 5],
+            "station_name": ["Delta", "Beta", "Gamma", "Epsilon"],
+            "ev_network": ["EVgo", "Tesla", "Blink Network", "Shell"],
+            "ev_dc_fast_num": [np.nan, 4.0, 6, 1],  # NaN == NaN and 4 == 4.0
+            "latitude": [33.0, 32.8, 32.9, 33.1],
+        })
+        diff = diff_snapshots(OLD, new)
+        self.assertEqual(diff.key_type, "id")
+        self.assertEqual(diff.added["station_name"].tolist(), ["Epsilon"])
+        self.assertEqual(diff.removed["station_name"].tolist(), ["Alpha"])
+        self.assertEqual(diff.modified["key"].tolist(), ["3"])
+        self.assertEqual(diff.modified["changed_columns"].tolist(), ["ev_network,ev_dc_fast_num"])
+        self.assertEqual(diff.modified[["old_ev_dc_fast_num", "new_ev_dc_fast_num"]].iloc[0].tolist(), [2, 6])
+        self.assertEqual(diff.summary()["unchanged"], 2)
+        self.assertEqual(diff.summary()["changed_columns"], {"ev_network": 1, "ev_dc_fast_num": 1})
+
+    def test_matches_kaggle_rows_by_name_address_zip(self):
+        old = pd.DataFrame({
+            "Station Name": ["Mission Valley Mall", "City Hall", "Old Town"],
+            "Street Address": ["1640 Camino del Rio N.", "202 C St", "1 Main St"],
+            "ZIP": ["92108", "92101", "92110"],
+            "EV Level2 EVSE Num": [4, 2, 1],
+        })
+        new = pd.DataFrame({
+            "Station Name": ["MISSION VALLEY  MALL", "City Hall", "New Place"],
+            "Street Address": ["1640 Camino Del Rio N", "202 C St", "9 Elm St"],
+            "ZIP": [92108.0, "92101-1234", "92103"],
+            "EV Level2 EVSE Num": [4, 3, 2],
+        })
+        diff = diff_snapshots(old, new)
+        self.assertEqual(diff.key_type, "name_address_zip")
+        self.assertEqual(station_keys(new).iloc[0], "mission valley mall|1640 camino del rio n|92108")
+        self.assertEqual(diff.added["Station Name"].tolist(), ["New Place"])
+        self.assertEqual(diff.removed["Station Name"].tolist(), ["Old Town"])
+        # Matched despite the respelled name, which still shows up as a change
+        self.assertEqual(diff.modified["changed_columns"].tolist(), ["Station Name", "EV Level2 EVSE Num"])
+
+    def test_duplicate_keys_keep_the_last_row(self):
+        new = pd.concat([OLD, OLD.iloc[[1]].assign(ev_network="Blink")], ignore_index=True)
+        diff = diff_snapshots(OLD, new)
+        self.assertEqual(diff.duplicates, 1)
+        self.assertEqual(diff.modified["key"].tolist(), ["2"])
+        self.assertEqual(len(diff.added) + len(diff.removed), 0)
+
+    def test_int_and_float_ids_match(self):
+        new = OLD.assign(id=OLD["id"].astype(float), facility_type=["MALL", "HOTEL", "PARK", "LIBRARY"])
+        diff = diff_snapshots(OLD.assign(facility_type=["MALL", "HOTEL", "PARKING_LOT", "LIBRARY"]), new)
+        self.assertEqual(station_keys(new).tolist(), ["1", "2", "3", "4"])
+        self.assertEqual(len(diff.added) + len(diff.removed), 0)
+        self.assertEqual(diff.modified["changed_columns"].tolist(), ["facility_type"])
+
+    def test_missing_ids_fall_back_to_names(self):
+        new = OLD.drop(columns="id")
+        diff = diff_snapshots(OLD, new)
+        self.assertEqual(diff.key_type, "name_address_zip")
+        self.assertEqual(len(diff.modified) + len(diff.added) + len(diff.removed), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
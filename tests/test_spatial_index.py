@@ -0,0 +1,55 @@
+"""
+Grid spatial index: bbox, radius and k-nearest queries against brute force.
+"""
+
+import unittest
+
+import numpy as np
+
+from evocharge.spatial_index import StationGridIndex, haversine_km, viewport_bounds
+
+
+class StationGridIndexTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        # Dense around San Diego plus a sparse scatter across the state
+        self.lat = np.concatenate([rng.normal(32.8, 0.1, 2000), rng.uniform(32.5, 42.0, 300)])
+        self.lon = np.concatenate([rng.normal(-117.1, 0.1, 2000), rng.uniform(-124.4, -114.1, 300)])
+        self.index = StationGridIndex(self.lat, self.lon, cell_deg=0.05)
+        self.queries = [(32.8, -117.1), (32.71, -117.16), (34.05, -118.24), (41.0, -124.0), (30.0, -110.0)]
+
+    def test_bbox_matches_brute_force(self):
+        for lat, lon in self.queries:
+            for zoom in (8, 11, 14):
+                south, west, north, east = viewport_bounds(lat, lon, zoom)
+                expected = np.flatnonzero((self.lat >= south) & (self.lat <= north)
+                                          & (self.lon >= west) & (self.lon <= east))
+                np.testing.assert_array_equal(np.sort(self.index.bbox(south, west, north, east)), expected)
+
+    def test_within_radius_matches_brute_force(self):
+        for lat, lon in self.queries:
+            dist = haversine_km(lat, lon, self.lat, self.lon)
+            for radius in (0.5, 5.0, 50.0):
+                idx, got = self.index.within_radius(lat, lon, radius, return_distances=True)
+                expected = np.flatnonzero(dist <= radius)
+                np.testing.assert_array_equal(np.sort(idx), expected)
+                self.assertTrue(np.all(np.diff(got) >= 0))
+                np.testing.assert_allclose(got, dist[idx])
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in self.queries:
+            dist = haversine_km(lat, lon, self.lat, self.lon)
+            for k in (1, 10, 100):
+                idx = self.index.nearest(lat, lon, k=k)
+                np.testing.assert_array_equal(idx, np.argsort(dist, kind="stable")[:k])
+
+    def test_empty_and_oversized_queries(self):
+        self.assertEqual(len(self.index.bbox(0.0, 0.0, 1.0, 1.0)), 0)
+        self.assertEqual(len(self.index.nearest(32.8, -117.1, k=0)), 0)
+        self.assertEqual(len(self.index.nearest(32.8, -117.1, k=10000)), len(self.lat))
+        empty = StationGridIndex([], [])
+        self.assertEqual(len(empty.within_radius(32.8, -117.1, 10.0)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
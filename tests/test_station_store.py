@@ -0,0 +1,122 @@
+"""
+Frozen station tables shared across dashboard sessions, and their Arrow snapshots.
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from evocharge import station_store
+from evocharge.station_store import (
+    build_snapshot, compact_stations, freeze_stations, load_station_frame, prepare_stations,
+    read_snapshot, snapshot_is_fresh, snapshot_path, station_view, write_snapshot,
+)
+
+STATIONS_CSV = """\
+id,station_name,ev_network,latitude,longitude,ev_dc_fast_num,ev_level2_evse_num,ev_connector_types,access_days_time,facility_type
+1,Alpha,ChargePoint Network,32.71,-117.16,,2,J1772,24 hours daily,PARKING_LOT
+2,Beta,Tesla,32.75,-117.12,8,,TESLA,,
+3,Gamma,Electrify America,32.80,-117.20,4,1,CHADEMO J1772COMBO,Mon-Fri 8am-6pm,MALL
+4,No Coordinates,Blink Network,,,1,1,J1772,,
+"""
+
+
+def shared_stations():
+    return freeze_stations(compact_stations(pd.DataFrame({
+        "station_name": ["A", "B", "C"],
+        "ev_network": ["ChargePoint", "Tesla", "ChargePoint"],
+        "ev_dc_fast_num": [0, 4, 2],
+        "capacity_proxy": [1.0, 5.0, 3.0],
+    })))
+
+
+def assert_unchanged(test, shared):
+    test.assertEqual(shared["capacity_proxy"].tolist(), [1.0, 5.0, 3.0])
+    test.assertEqual(shared["ev_network"].tolist(), ["ChargePoint", "Tesla", "ChargePoint"])
+    test.assertEqual(shared["ev_dc_fast_num"].tolist(), [0, 4, 2])
+
+
+class FreezeStationsTest(unittest.TestCase):
+    def test_shared_arrays_are_read_only(self):
+        shared = shared_stations()
+        for frame in (shared, station_view(shared)):
+            with self.assertRaises(ValueError):
+                frame["capacity_proxy"].to_numpy()[0] = 9.0
+        assert_unchanged(self, shared)
+
+    def test_view_cell_writes_do_not_leak(self):
+        # pandas 2 raises on the read-only block; pandas 3 copies it into the view
+        shared = shared_stations()
+        view = station_view(shared)
+        writes = [("capacity_proxy", 9.0), ("ev_network", "Tesla"), ("ev_dc_fast_num", 7)]
+        for col, value in writes:
+            try:
+                view.loc[0, col] = value
+            except ValueError:
+                continue
+            self.assertEqual(view.loc[0, col], value)
+        try:
+            view["capacity_proxy"] += 1
+        except ValueError:
+            pass
+        assert_unchanged(self, shared)
+        assert_unchanged(self, station_view(shared))
+
+    def test_view_columns_do_not_leak(self):
+        shared = shared_stations()
+        view = station_view(shared)
+        view["new"] = 1
+        view["capacity_proxy"] = view["capacity_proxy"] + 1
+        self.assertEqual(view["capacity_proxy"].tolist(), [2.0, 6.0, 4.0])
+        self.assertNotIn("new", shared.columns)
+        assert_unchanged(self, shared)
+        self.assertNotIn("new", station_view(shared).columns)
+
+    def test_view_shares_the_data(self):
+        shared = shared_stations()
+        self.assertTrue(np.shares_memory(station_view(shared)["capacity_proxy"].to_numpy(),
+                                         shared["capacity_proxy"].to_numpy()))
+
+
+@unittest.skipIf(station_store.pa is None, "pyarrow is not installed")
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.csv_path = os.path.join(tmp.name, "stations.csv")
+        with open(self.csv_path, "w") as f:
+            f.write(STATIONS_CSV)
+        self.expected = prepare_stations(pd.read_csv(self.csv_path))
+
+    def test_round_trip(self):
+        path = write_snapshot(self.expected, os.path.join(os.path.dirname(self.csv_path), "out.arrow"))
+        pd.testing.assert_frame_equal(read_snapshot(path), self.expected)
+
+    def test_snapshot_goes_stale_when_the_csv_is_newer(self):
+        self.assertFalse(snapshot_is_fresh(self.csv_path))
+        build_snapshot(self.csv_path)
+        self.assertTrue(snapshot_is_fresh(self.csv_path))
+        snap_mtime = os.path.getmtime(snapshot_path(self.csv_path))
+        os.utime(self.csv_path, (snap_mtime + 10, snap_mtime + 10))
+        self.assertFalse(snapshot_is_fresh(self.csv_path))
+
+    def test_load_prefers_a_fresh_snapshot(self):
+        # A marker column only the snapshot has shows which source was read
+        write_snapshot(self.expected.assign(from_snapshot=True), snapshot_path(self.csv_path))
+        loaded = load_station_frame(self.csv_path)
+        self.assertTrue(loaded["from_snapshot"].all())
+        pd.testing.assert_frame_equal(loaded.drop(columns="from_snapshot"), self.expected)
+
+    def test_load_falls_back_to_the_csv(self):
+        pd.testing.assert_frame_equal(load_station_frame(self.csv_path), self.expected)
+        write_snapshot(self.expected.assign(from_snapshot=True), snapshot_path(self.csv_path))
+        snap_mtime = os.path.getmtime(snapshot_path(self.csv_path))
+        os.utime(self.csv_path, (snap_mtime + 10, snap_mtime + 10))
+        pd.testing.assert_frame_equal(load_station_frame(self.csv_path), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
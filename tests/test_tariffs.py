@@ -0,0 +1,60 @@
+"""
+ev_pricing parsing: session-length tiers and text that must fall back.
+"""
+
+import unittest
+
+import numpy as np
+
+from evocharge.tariffs import TariffTable, parse_tariff
+
+COUNTY_RATE = 0.30
+
+
+def session_cost(text, kwh=10, minutes=60, hour=10):
+    return float(TariffTable([text], [COUNTY_RATE]).cost(0, kwh, minutes, hour))
+
+
+class ParseTariffTest(unittest.TestCase):
+    def test_flat_prices(self):
+        self.assertAlmostEqual(session_cost("$0.26 per kWh"), 2.6)
+        self.assertAlmostEqual(session_cost("$1 session fee + $0.35/kWh"), 4.5)
+        self.assertAlmostEqual(session_cost("$0.25 per kWh plus $1 session fee"), 3.5)
+        self.assertAlmostEqual(session_cost("$0.25/kWh with a $1 session fee"), 3.5)
+        self.assertAlmostEqual(session_cost("$2.00 per hour", minutes=90), 3.0)
+        self.assertAlmostEqual(session_cost("Free"), 0.0)
+
+    def test_day_qualified_prices(self):
+        text = "Public charging: $0.50 per kWh M-F, $0.40 per kWh Sat-Sun; Charge club: $0.30 per kWh"
+        self.assertAlmostEqual(session_cost(text, hour=10), 5.0)           # Monday
+        self.assertAlmostEqual(session_cost(text, hour=5 * 24 + 10), 4.0)  # Saturday
+
+    def test_member_prices_are_skipped(self):
+        self.assertAlmostEqual(session_cost("$0.45 per kWh, $0.40 per kWh for members"), 4.5)
+        self.assertAlmostEqual(session_cost("$0.49/kWh for non-members, $0.39/kWh for members"), 4.9)
+        self.assertAlmostEqual(session_cost("$0.35/kWh; Club members: $0.25/kWh"), 3.5)
+
+    def test_session_length_tiers(self):
+        text = "$1.50/hr for first 4 hours, then $5/hr"
+        self.assertAlmostEqual(session_cost(text, minutes=60), 1.5)
+        self.assertAlmostEqual(session_cost(text, minutes=300), 4 * 1.5 + 5.0)
+        text = "Free for first 2 hours, $1/hr after"
+        self.assertAlmostEqual(session_cost(text, minutes=60), 0.0)
+        self.assertAlmostEqual(session_cost(text, minutes=180), 1.0)
+        self.assertAlmostEqual(session_cost("$0.40/hr after 4 hours", minutes=300), 0.4)
+
+    def test_unmodelled_text_falls_back(self):
+        for text in ["$0.31-$0.43/kWh", "Price varies by time of day", "$15 monthly service fee",
+                     "$1/hr M-F first 2 hours", "$2/hr then", "$0.45 per kWh, $0.40 per kWh"]:
+            with self.subTest(text=text):
+                self.assertIsNone(parse_tariff(text))
+                self.assertAlmostEqual(session_cost(text), 10 * COUNTY_RATE)
+
+    def test_deduplicates_tariffs(self):
+        table = TariffTable(["Free", "FREE", "$0.26 per kWh", None, "n/a"], np.full(5, COUNTY_RATE))
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.ids.tolist(), [0, 0, 1, -1, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Compiled ZIP -> county lookup built from small FIPS snapshots.
+"""
+
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from evocharge.zip_county import load_lookup
+
+SNAPSHOTS = {
+    "2020_03": [
+        ("92101", "06073", "CA", "San Diego County"),
+        # 96107 crosses the CA/NV line and is listed in Nevada first
+        ("96107", "32005", "NV", "Douglas County"),
+        ("96107", "06051", "CA", "Mono County"),
+        ("96107", "06003", "CA", "Alpine County"),
+        ("89501", "32031", "NV", "Washoe County"),
+    ],
+    "2021_03": [
+        ("92101", "06073", "CA", "San Diego County"),
+        ("96107", "06003", "CA", "Alpine County"),
+    ],
+}
+
+
+class ZipCountyLookupTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        fips_dir = os.path.join(cls.tmp.name, "fips")
+        os.makedirs(fips_dir)
+        for date, rows in SNAPSHOTS.items():
+            pd.DataFrame(rows, columns=["zip", "stcountyfp", "state", "countyname"]).to_csv(
+                os.path.join(fips_dir, f"zip_county_fips_{date}.csv"), index=False)
+        cls.lookup = load_lookup(os.path.join(cls.tmp.name, "lookup"), fips_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_first_listing_wins_without_a_state(self):
+        self.assertEqual(self.lookup.county("96107", as_of="2020-06"), "Douglas")
+        self.assertEqual(self.lookup.county(92101), "San Diego")
+
+    def test_cross_state_zip_keeps_its_county_in_state(self):
+        self.assertEqual(self.lookup.county("96107", as_of="2020-06", state="CA"), "Mono")
+        self.assertEqual(self.lookup.county("96107", as_of="2020-06", state="NV"), "Douglas")
+        self.assertIsNone(self.lookup.county("89501", as_of="2020-06", state="CA"))
+        frame = self.lookup.to_frame(as_of="2020-06", state="CA")
+        self.assertEqual(dict(zip(frame["zip_code"], frame["county_name"])), {92101: "San Diego", 96107: "Mono"})
+
+    def test_point_in_time_snapshots(self):
+        self.assertEqual(self.lookup.county("96107", state="CA"), "Alpine")
+        self.assertIsNone(self.lookup.county("89501"))
+        self.assertEqual(self.lookup.county("89501", as_of="2021-01"), "Washoe")
+
+    def test_rebuilds_lookups_without_cross_state_table(self):
+        lookup_dir = os.path.join(self.tmp.name, "lookup")
+        os.remove(os.path.join(lookup_dir, "cross_state.npy"))
+        load_lookup(lookup_dir, os.path.join(self.tmp.name, "fips"))
+        self.assertTrue(os.path.exists(os.path.join(lookup_dir, "cross_state.npy")))
+
+
+if __name__ == "__main__":
+    unittest.main()